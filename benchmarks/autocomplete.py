@@ -0,0 +1,63 @@
+'''Time AutocompleteIndex lookups against the linear scan it replaced.
+
+python -m benchmarks.autocomplete --labels 500 --queries 20000
+'''
+
+import argparse
+import random
+import string
+from time import perf_counter
+
+from src.utils.autocomplete import MAX_CHOICES, AutocompleteIndex
+
+
+def _labels(count: int, rng: random.Random) -> list[str]:
+    def word() -> str:
+        return ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+
+    return [
+        ' '.join(word() for _ in range(rng.randint(1, 3))).title() for _ in range(count)
+    ]
+
+
+def _linear(labels: list[str], current: str) -> list[str]:
+    cur = current.lower()
+    return [n for n in labels if cur in n.lower()][:MAX_CHOICES]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--labels', type=int, default=500)
+    parser.add_argument('--queries', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    labels = _labels(args.labels, rng)
+    queries = []
+    for _ in range(args.queries):
+        label = rng.choice(labels).lower()
+        start = rng.randrange(len(label))
+        queries.append(label[start : start + rng.randint(1, 6)])
+
+    t0 = perf_counter()
+    index = AutocompleteIndex(labels)
+    build = perf_counter() - t0
+
+    results = {}
+    for name, lookup in (
+        ('linear scan', lambda q: _linear(labels, q)),
+        ('AutocompleteIndex', index.search),
+    ):
+        t0 = perf_counter()
+        for q in queries:
+            lookup(q)
+        results[name] = (perf_counter() - t0) / len(queries)
+
+    print(f'{args.labels:,} labels, index built in {build * 1000:.2f} ms')
+    for name, per_query in results.items():
+        print(f'  {name:<20} {per_query * 1e6:8.1f} µs/query')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+'''Plan and time "records created on day D" as a cast vs a half-open range.
+
+Fills a temporary table shaped like activity_records (with the same
+(user_id, created_at DESC, id DESC) index as idx_activity_records_user_created_id)
+and compares ``created_at::date = D`` with ``created_at >= D AND created_at < D+1``.
+The cast can only use the index to find the user, then filters every row they
+ever created; the range seeks straight to the day. Needs DATABASE_URL:
+
+    python -m benchmarks.created_date_queries --rows 5000000 --users 20000
+'''
+
+import argparse
+import random
+from datetime import date, timedelta
+from time import perf_counter
+from typing import Any
+
+from src.database.db_manager import DBManager
+from src.models.activity_record import utc_day_bounds
+
+TABLE = 'bench_activity_records'
+
+QUERIES = {
+    'cast (created_at::date = %s)': (
+        f'SELECT COUNT(*) AS cnt FROM {TABLE} '
+        'WHERE user_id = %s AND created_at::date = %s'
+    ),
+    'range (created_at >= %s AND < %s)': (
+        f'SELECT COUNT(*) AS cnt FROM {TABLE} '
+        'WHERE user_id = %s AND created_at >= %s AND created_at < %s'
+    ),
+}
+
+
+def _fill(db: DBManager, rows: int, users: int, days: int) -> None:
+    db.execute(f'''
+        CREATE TEMP TABLE {TABLE} (
+            id INTEGER NOT NULL,
+            user_id BIGINT NOT NULL,
+            activity_id INTEGER NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL
+        )
+        ''')
+    db.execute(
+        f'INSERT INTO {TABLE} (id, user_id, activity_id, created_at) '
+        'SELECT g, (random() * %s)::bigint, (random() * 200)::int, '
+        'NOW() - random() * make_interval(days => %s) '
+        'FROM generate_series(1, %s) AS g',
+        (users, days, rows),
+    )
+    db.execute(f'CREATE INDEX ON {TABLE} (user_id, created_at DESC, id DESC)')
+    db.execute(f'ANALYZE {TABLE}')
+
+
+def _params(name: str, user_id: int, day: date) -> tuple[Any, ...]:
+    if name.startswith('cast'):
+        return (user_id, day)
+    return (user_id, *utc_day_bounds(day))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--users', type=int, default=20_000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    today = date.today()
+    probes = [
+        (rng.randrange(args.users), today - timedelta(days=rng.randrange(args.days)))
+        for _ in range(args.queries)
+    ]
+
+    with DBManager() as db:
+        db.execute("SET TIME ZONE 'UTC'")
+        start = perf_counter()
+        _fill(db, args.rows, args.users, args.days)
+        print(
+            f'{args.rows:,} rows for {args.users:,} users over {args.days} days '
+            f'(filled in {perf_counter() - start:.1f}s)'
+        )
+
+        for name, sql in QUERIES.items():
+            print(f'\n{name}')
+            plan = db.explain(sql, _params(name, *probes[0]), analyze=True)
+            for line in plan:
+                if any(
+                    key in line
+                    for key in ('Scan', 'Index Cond', 'Filter', 'Buffers', 'Execution')
+                ):
+                    print(f'  {line.strip()}')
+
+            start = perf_counter()
+            for user_id, day in probes:
+                db.fetchone(sql, _params(name, user_id, day))
+            elapsed = perf_counter() - start
+            print(
+                f'  {args.queries} lookups: {elapsed / args.queries * 1000:.3f} ms each'
+            )
+
+
+if __name__ == '__main__':
+    main()
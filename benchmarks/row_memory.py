@@ -0,0 +1,86 @@
+'''Compare memory held by dict rows vs slotted rows for activity_records.
+
+Builds rows the same way psycopg's dict_row / class_row / namedtuple_row factories
+do, without needing a database:
+
+    python -m benchmarks.row_memory --rows 100000
+'''
+
+import argparse
+import gc
+import tracemalloc
+from collections import namedtuple
+from dataclasses import fields
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable
+
+from src.models.activity_record import ActivityRecordRow
+
+COLUMNS = tuple(f.name for f in fields(ActivityRecordRow))
+_RecordTuple = namedtuple('_RecordTuple', COLUMNS)  # type: ignore[misc]
+
+
+def _raw_values(count: int) -> list[tuple[Any, ...]]:
+    base_day = date(2025, 1, 1)
+    base_ts = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        (
+            i,
+            100_000_000_000_000_000 + i % 500,
+            i % 60,
+            'Felt great today' if i % 3 == 0 else None,
+            base_day + timedelta(days=i % 365),
+            base_ts + timedelta(minutes=i),
+            base_ts + timedelta(minutes=i),
+            None,
+        )
+        for i in range(count)
+    ]
+
+
+def _as_dict(values: tuple[Any, ...]) -> Any:
+    return dict(zip(COLUMNS, values))
+
+
+def _as_slots(values: tuple[Any, ...]) -> Any:
+    return ActivityRecordRow(**dict(zip(COLUMNS, values)))
+
+
+def _as_namedtuple(values: tuple[Any, ...]) -> Any:
+    return _RecordTuple._make(values)
+
+
+def measure(build: Callable[[tuple[Any, ...]], Any], raw: list[tuple]) -> int:
+    '''Return bytes allocated by the row containers (values are shared).'''
+    gc.collect()
+    tracemalloc.start()
+    rows = [build(v) for v in raw]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    raw = _raw_values(args.rows)
+    results = {
+        'dict_row': measure(_as_dict, raw),
+        'class_row (slots dataclass)': measure(_as_slots, raw),
+        'namedtuple_row': measure(_as_namedtuple, raw),
+    }
+
+    baseline = results['dict_row']
+    print(f'{args.rows:,} activity_records rows')
+    for name, size in results.items():
+        print(
+            f'  {name:<28} {size / 1024 / 1024:8.2f} MiB '
+            f'({size / args.rows:6.1f} B/row, {size / baseline:5.1%} of dict)'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,6 @@
-import asyncio
 import logging
 
-from src.bot import main as run
+from src.bot import run
 from src.database import start_db
 from src.database.db_manager import DBManager
 from src.utils.env import load_env
@@ -15,5 +14,5 @@ if __name__ == '__main__':
         # Run full DB setup (schema + migrations)
         start_db.run(db)
 
-    # Start the bot
-    asyncio.run(run())
+    # Start the bot (as BOT_WORKERS shard processes when set)
+    raise SystemExit(run())
@@ -1,5 +1,12 @@
-# Initialize achievements package and register built-in rules
-# Importing rules modules will register them into the global registry
-from .rules import diversity  # noqa: F401
-from .rules import rank_up  # noqa: F401
-from .rules import streaks  # noqa: F401
+# Built-in rules register themselves into the global registry when their
+# modules are imported. That is deferred to load_rules() so importing the
+# package (e.g. via the engine) stays cheap at startup.
+import importlib
+
+_RULE_MODULES = ('diversity', 'rank_up', 'streaks')
+
+
+def load_rules() -> None:
+    '''Import the built-in rule modules (idempotent).'''
+    for name in _RULE_MODULES:
+        importlib.import_module(f'{__name__}.rules.{name}')
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-import src.achievements  # noqa: F401
+from src.achievements import load_rules
 from src.achievements.events import ActivityRecordedEvent, RankChangedEvent
+from src.achievements.interface import AchievementRule
 from src.achievements.registry import registry
 from src.models.achievement import Achievement
 from src.models.user import User
@@ -16,7 +17,9 @@ class AchievementsEngine:
             'achievements.dispatch',
             {'event_type': type(event).__name__, 'user_id': event.user_id},
         ):
+            load_rules()
             earned_list: list[dict] = []
+            earned_rules: list[tuple[AchievementRule, dict | None]] = []
             for rule in registry.all():
                 if not rule.handles(event):
                     continue
@@ -30,70 +33,82 @@ class AchievementsEngine:
                     except Exception:
                         # Fail-safe: do not break recording flow
                         continue
-                    if not earned:
-                        continue
+                    if earned:
+                        earned_rules.append((rule, metadata))
+
+            if not earned_rules:
+                return earned_list
 
-                    with trace_span(
-                        'achievements.achievement_creation', {'rule_code': rule.code}
-                    ):
-                        # Persist if not already earned
-                        ach = Achievement.get_one('code = %s', (rule.code,))
-                        if not ach:
-                            ach = Achievement.create(
-                                {
-                                    'code': rule.code,
-                                    'name': rule.name,
-                                    'description': rule.description,
-                                    'is_active': True,
-                                    'xp_value': getattr(rule, 'xp_value', 0),
-                                }
-                            )
-                        # Capture pre-insert level/rank (for post-award comparison)
-                        before_profile = User.get_profile(event.user_id)
-                        old_level = (
-                            int(before_profile['level'])
-                            if before_profile and 'level' in before_profile
-                            else 1
+            with trace_span(
+                'achievements.achievement_creation',
+                {'rule_count': len(earned_rules)},
+            ):
+                # One lookup for every earned rule instead of one per code
+                achs = Achievement.get_by_codes(rule.code for rule, _ in earned_rules)
+                for rule, _ in earned_rules:
+                    if rule.code not in achs:
+                        achs[rule.code] = Achievement.create(
+                            {
+                                'code': rule.code,
+                                'name': rule.name,
+                                'description': rule.description,
+                                'is_active': True,
+                                'xp_value': getattr(rule, 'xp_value', 0),
+                            }
                         )
-                        old_rank = level_to_rank(old_level)
+                already_earned = UserAchievement.earned_ids(
+                    event.user_id, (a['id'] for a in achs.values())
+                )
 
-                        if not UserAchievement.exists(
-                            'user_id = %s AND achievement_id = %s',
-                            (event.user_id, ach['id']),
-                        ):
-                            UserAchievement.create(
-                                {
-                                    'user_id': event.user_id,
-                                    'achievement_id': ach['id'],
-                                    'metadata': metadata or {},
-                                }
-                            )
-                            earned_list.append(
-                                {
-                                    'code': ach.get('code'),
-                                    'name': ach.get('name'),
-                                    'description': ach.get('description'),
-                                    'xp_value': int(ach.get('xp_value', 0)),
-                                }
-                            )
+                # Capture pre-insert level/rank (for post-award comparison)
+                before_profile = User.get_profile(event.user_id)
+                old_level = (
+                    int(before_profile['level'])
+                    if before_profile and 'level' in before_profile
+                    else 1
+                )
+                old_rank = level_to_rank(old_level)
+
+                for rule, metadata in earned_rules:
+                    ach = achs[rule.code]
+                    if ach['id'] in already_earned:
+                        continue
 
-                            # Post-award: DB trigger may have increased xp & updated lvl
-                            try:
-                                after_profile = User.get_profile(event.user_id)
-                                if after_profile and 'level' in after_profile:
-                                    new_level = int(after_profile['level'])
-                                    new_rank = level_to_rank(new_level)
-                                    if old_rank != new_rank:
-                                        chained = self.dispatch(
-                                            RankChangedEvent(
-                                                user_id=event.user_id,
-                                                new_rank=new_rank,
-                                            )
-                                        )
-                                        if chained:
-                                            earned_list.extend(chained)
-                            except Exception:
-                                pass
+                    UserAchievement.create(
+                        {
+                            'user_id': event.user_id,
+                            'achievement_id': ach['id'],
+                            'metadata': metadata or {},
+                        }
+                    )
+                    already_earned.add(ach['id'])
+                    earned_list.append(
+                        {
+                            'code': ach.get('code'),
+                            'name': ach.get('name'),
+                            'description': ach.get('description'),
+                            'xp_value': int(ach.get('xp_value', 0)),
+                        }
+                    )
+
+                    # Post-award: DB trigger may have increased xp & updated lvl
+                    try:
+                        after_profile = User.get_profile(event.user_id)
+                        if after_profile and 'level' in after_profile:
+                            new_level = int(after_profile['level'])
+                            new_rank = level_to_rank(new_level)
+                            if old_rank != new_rank:
+                                old_rank = new_rank
+                                chained = self.dispatch(
+                                    RankChangedEvent(
+                                        user_id=event.user_id,
+                                        new_rank=new_rank,
+                                    )
+                                )
+                                if chained:
+                                    earned_list.extend(chained)
+                    except Exception:
+                        pass
 
             return earned_list
 
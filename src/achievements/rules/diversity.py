@@ -31,7 +31,7 @@ class BaseDiverseActivitiesAchievementRule(AchievementRule):
             row = db.fetchone(
                 '''
                 SELECT COUNT(DISTINCT ar.activity_id) AS cnt
-                FROM activity_records ar
+                FROM activity_history ar
                 JOIN activities a ON a.id = ar.activity_id
                 WHERE ar.user_id = %s
                   AND (a.is_archived = FALSE OR a.is_archived IS NULL)
@@ -87,7 +87,7 @@ class AllActivitiesAchievementRule(AchievementRule):
             user_row = db.fetchone(
                 '''
                 SELECT COUNT(DISTINCT ar.activity_id) AS user_count
-                FROM activity_records ar
+                FROM activity_history ar
                 JOIN activities a ON a.id = ar.activity_id
                 WHERE ar.user_id = %s AND a.is_archived = FALSE
                 ''',
@@ -138,7 +138,7 @@ class FiveCategoriesAchievementRule(AchievementRule):
             row = db.fetchone(
                 '''
                 SELECT COUNT(DISTINCT a.category) AS cnt
-                FROM activity_records ar
+                FROM activity_history ar
                 JOIN activities a ON a.id = ar.activity_id
                 WHERE ar.user_id = %s
                 ''',
@@ -168,7 +168,7 @@ class AllCategoriesAchievementRule(AchievementRule):
             user_row = db.fetchone(
                 '''
                 SELECT COUNT(DISTINCT a.category) AS user_count
-                FROM activity_records ar
+                FROM activity_history ar
                 JOIN activities a ON a.id = ar.activity_id
                 WHERE ar.user_id = %s
                 ''',
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-from datetime import date, timedelta
+from datetime import date
 from typing import Any
 
 from src.achievements.events import ActivityRecordedEvent, RankChangedEvent
 from src.achievements.interface import AchievementRule
 from src.achievements.registry import registry
-from src.database.db_manager import DBManager
+from src.models.activity_calendar import activity_calendar
 
 
 class BaseStreakAchievementRule(AchievementRule):
@@ -44,36 +44,17 @@ class BaseStreakAchievementRule(AchievementRule):
     def _check_daily_streak(
         self, user_id: int | str, end_date: date, required_length: int | None = None
     ) -> tuple[bool, dict[str, Any] | None]:
-        # Count back from end_date while each day has at least one record
-        # Optimization: fetch a window of dates once, then scan in Python
-        streak = 0
+        # Count back from end_date while each day has at least one record,
+        # read from the user's day bitmap a word (64 days) at a time
         req_len = (
             int(required_length)
             if required_length is not None
             else int(self.length or 0)
         )
         if req_len <= 0:
-            return False, {'streak': streak, 'unit': 'day'}
-        start_date = end_date - timedelta(days=req_len - 1)
-        with DBManager() as db:
-            rows = db.fetchall(
-                '''
-                SELECT DISTINCT date_occurred
-                FROM activity_records
-                WHERE user_id = %s AND date_occurred BETWEEN %s AND %s
-                ''',
-                (user_id, start_date, end_date),
-            )
-        dates_with_activity = {r['date_occurred'] for r in rows}
-        cur = end_date
-        while True:
-            if cur not in dates_with_activity:
-                break
-            streak += 1
-            if streak >= req_len:
-                return True, {'streak': streak, 'unit': 'day'}
-            cur = cur - timedelta(days=1)
-        return False, {'streak': streak, 'unit': 'day'}
+            return False, {'streak': 0, 'unit': 'day'}
+        streak = min(activity_calendar.run_ending(user_id, end_date), req_len)
+        return streak >= req_len, {'streak': streak, 'unit': 'day'}
 
 
 class DailyStreak1(BaseStreakAchievementRule):
@@ -1,14 +1,31 @@
 import asyncio
+import contextlib
 import logging
+import multiprocessing
 import os
 import pathlib
+from multiprocessing.connection import wait
+from typing import Optional
 
 import discord
 from discord.ext import commands
 
-from src.database.db_manager import DBManager
+from src.achievements import load_rules
+from src.database.db_manager import DBManager, PoolConfig
+from src.database.notifications import listener
+from src.database.query_stats import query_stats
+from src.models.activity_calendar import activity_calendar
+from src.models.activity_catalog import catalog
+from src.models.recent_activities import recent_activities
+from src.utils.command_sync import dev_guild, sync_command_tree
+from src.utils.command_tree import TracedCommandTree
 from src.utils.env import load_env
-from src.utils.tracing import trace_span
+from src.utils.import_profiler import profile_imports
+from src.utils.logs import setup_logging
+from src.utils.loop_lag import loop_lag
+from src.utils.sharding import ShardPlan
+from src.utils.trace_exporters import configure_tracing
+from src.utils.tracing import set_exporters, trace_span
 
 # Logger
 logger = logging.getLogger(__name__)
@@ -21,12 +38,37 @@ def get_intents() -> discord.Intents:
     return intents
 
 
-class LiftedLeaderboardBot(commands.Bot):
-    def __init__(self):
-        super().__init__(command_prefix='/', intents=get_intents())
+def _import_deferred_modules() -> None:
+    '''Import what the cogs defer, so the first command does not pay for it.'''
+    load_rules()
+    import pendulum  # noqa: F401
+
+
+class LiftedLeaderboardBot(commands.AutoShardedBot):
+    def __init__(self, plan: Optional[ShardPlan] = None):
+        self.plan = plan or ShardPlan()
+        super().__init__(
+            command_prefix='/',
+            intents=get_intents(),
+            tree_cls=TracedCommandTree,
+            shard_count=self.plan.shard_count,
+            shard_ids=list(self.plan.shard_ids) if self.plan.shard_ids else None,
+        )
+        self._deferred_imports: asyncio.Task | None = None
+        self._commands_checked = False
 
     async def setup_hook(self):
-        with trace_span('bot.cog_loading'):
+        loop_lag.start()
+
+        with trace_span('bot.catalog_warm'):
+            await asyncio.to_thread(catalog.ensure_loaded)
+
+        # STARTUP_IMPORT_PROFILE=1 adds an import.<module> span per module
+        profiling = os.getenv('STARTUP_IMPORT_PROFILE', '').lower() in {'1', 'true'}
+        with (
+            trace_span('bot.cog_loading'),
+            profile_imports() if profiling else contextlib.nullcontext(),
+        ):
             cogs_path = pathlib.Path(__file__).parent / 'cogs'
             for file in cogs_path.glob('*_cog.py'):
                 module = f'src.cogs.{file.stem}'
@@ -36,40 +78,121 @@ class LiftedLeaderboardBot(commands.Bot):
                 except Exception:
                     logger.error(f'Failed to load {module}', exc_info=True)
 
-    async def on_ready(self):
-        with trace_span('bot.command_sync'):
-            guild_id = os.getenv('GUILD_ID')
-            if not guild_id:
-                raise RuntimeError('GUILD_ID not set in environment or .env')
+        # Not awaited: commands are usable while these load in a worker thread
+        self._deferred_imports = asyncio.create_task(self._warm_deferred_imports())
 
-            guild = discord.Object(id=int(guild_id))
-            self.tree.copy_global_to(guild=guild)
-            await self.tree.sync(guild=guild)
-            logger.info(f'Bot ready! Synced commands to guild {guild_id}')
+    async def _warm_deferred_imports(self):
+        with trace_span('bot.deferred_imports'):
+            await asyncio.to_thread(_import_deferred_modules)
 
+    async def close(self):
+        await loop_lag.stop()
+        await super().close()
 
-async def main():
+    async def on_ready(self):
+        # on_ready fires again on every gateway reconnect; the tree cannot
+        # have changed since this process checked it
+        if self._commands_checked:
+            return
+        # Every worker registers the same tree; one sync covers them all
+        if self.plan.owns_command_sync:
+            guild = dev_guild()
+            if guild is not None:
+                self.tree.copy_global_to(guild=guild)
+            await sync_command_tree(self.tree, guild)
+        self._commands_checked = True
+        logger.info(f'Bot ready in {len(self.guilds)} guild(s) ({self.plan.label})')
+
+
+async def main(plan: Optional[ShardPlan] = None):
+    load_env()
+    plan = plan or ShardPlan.from_env()
+    configure_tracing()
+    query_stats.configure()
+    loop_lag.configure()
+
+    # Startup is its own trace; the bot's run must not be nested under it, or
+    # every span of the process would share one root (and sampling decision)
     with trace_span('bot.startup'):
-        load_env()
         token = os.getenv('DISCORD_TOKEN')
         if not token:
             raise RuntimeError('DISCORD_TOKEN not set in environment or .env')
 
         # Initialize the Postgres connection pool once for the process
-        with trace_span('bot.db_pool_init'):
-            DBManager.init_pool()
-
-        bot = LiftedLeaderboardBot()
-        try:
-            async with bot:
-                await bot.start(token)
-        except Exception:
-            logger.error('Bot failed due to an exception', exc_info=True)
-        finally:
-            # Ensure DB connections are cleaned up on shutdown
-            with trace_span('bot.db_pool_close'):
-                DBManager.close_pool()
+        # DB_POOL_* sizes are shared out between the worker processes
+        with trace_span('bot.db_pool_init', {'workers': plan.workers}):
+            DBManager.init_pool(config=PoolConfig.from_env().for_workers(plan.workers))
+
+        # Keep this process's caches in step with writes made by any process
+        catalog.attach(listener)
+        recent_activities.attach(listener)
+        activity_calendar.attach(listener)
+        listener.start()
+
+    bot = LiftedLeaderboardBot(plan)
+    try:
+        async with bot:
+            await bot.start(token)
+    except Exception:
+        logger.error('Bot failed due to an exception', exc_info=True)
+    finally:
+        listener.stop()
+        # Ensure DB connections are cleaned up on shutdown
+        with trace_span('bot.db_pool_close'):
+            DBManager.close_pool()
+        # Flush file exporters
+        set_exporters(())
+
+
+def _run_worker(plan: ShardPlan) -> None:
+    setup_logging(logging.INFO)
+    asyncio.run(main(plan))
+
+
+def run_workers(plan: ShardPlan) -> int:
+    '''Run one bot process per slice of ``plan``'s shards until any exits.
+
+    Each worker has its own event loop, pool share and caches; the caches
+    stay coherent through Postgres NOTIFY. When a worker dies the rest are
+    stopped, so a process supervisor can restart the whole group.
+    '''
+    ctx = multiprocessing.get_context('spawn')
+    workers = [
+        ctx.Process(
+            target=_run_worker,
+            args=(worker_plan,),
+            name=f'bot-{worker_plan.label.replace(" ", "-")}',
+        )
+        for worker_plan in plan.worker_plans()
+    ]
+    for process in workers:
+        process.start()
+        logger.info(f'Started {process.name} (pid {process.pid})')
+    try:
+        wait([process.sentinel for process in workers])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+        for process in workers:
+            process.join()
+    failed = [p for p in workers if p.exitcode not in (0, None)]
+    for process in failed:
+        logger.error(f'{process.name} exited with code {process.exitcode}')
+    return 1 if failed else 0
+
+
+def run(plan: Optional[ShardPlan] = None) -> int:
+    '''Run the bot in this process, or as BOT_WORKERS shard processes.'''
+    load_env()
+    plan = plan or ShardPlan.from_env()
+    if plan.workers > 1:
+        return run_workers(plan)
+    asyncio.run(main(plan))
+    return 0
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    raise SystemExit(run())
@@ -1,10 +1,11 @@
+import asyncio
 import logging
 
 import discord
 from discord import Interaction, app_commands
 from discord.ext import commands
 
-import src.achievements  # noqa: F401 ensure rules register
+from src.achievements import load_rules
 from src.achievements.registry import registry
 from src.models.achievement import Achievement
 from src.models.user import User
@@ -13,6 +14,34 @@ from src.models.user_achievement import UserAchievement
 logger = logging.getLogger(__name__)
 
 
+def _load_achievements(
+    user_id: int, display_name: str
+) -> tuple[list[dict], dict[int, dict]]:
+    '''All achievements and the user's earned rows keyed by achievement id.'''
+    # Ensure user exists
+    User.upsert_user(user_id, display_name)
+
+    # Seed achievements table from registered rules (idempotent)
+    load_rules()
+    try:
+        for rule in registry.all():
+            Achievement.upsert_code(
+                code=rule.code,
+                name=rule.name,
+                description=rule.description,
+                xp_value=getattr(rule, 'xp_value', 0),
+            )
+    except Exception:
+        # Non-fatal: viewing should still work with existing rows
+        pass
+
+    # Fetch achievements and user's earned set
+    all_achs = Achievement.get_many(order_by='name ASC')
+    earned_rows = UserAchievement.get_many(where='user_id = %s', params=(user_id,))
+    earned_by_id: dict[int, dict] = {int(r['achievement_id']): r for r in earned_rows}
+    return all_achs, earned_by_id
+
+
 class AchievementsCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
@@ -32,28 +61,9 @@ class AchievementsCog(commands.Cog):
     ):
         await interaction.response.defer(thinking=True, ephemeral=True)
         user_id = interaction.user.id
-        # Ensure user exists
-        User.upsert_user(user_id, interaction.user.display_name)
-
-        # Seed achievements table from registered rules (idempotent)
-        try:
-            for rule in registry.all():
-                Achievement.upsert_code(
-                    code=rule.code,
-                    name=rule.name,
-                    description=rule.description,
-                    xp_value=getattr(rule, 'xp_value', 0),
-                )
-        except Exception:
-            # Non-fatal: viewing should still work with existing rows
-            pass
-
-        # Fetch achievements and user's earned set
-        all_achs = Achievement.get_many(order_by='name ASC')
-        earned_rows = UserAchievement.get_many(where='user_id = %s', params=(user_id,))
-        earned_by_id: dict[int, dict] = {
-            int(r['achievement_id']): r for r in earned_rows
-        }
+        all_achs, earned_by_id = await asyncio.to_thread(
+            _load_achievements, user_id, interaction.user.display_name
+        )
 
         earned_lines: list[str] = []
         locked_lines: list[str] = []
@@ -3,79 +3,28 @@ import logging
 import pathlib
 from datetime import date, datetime, timezone
 from time import perf_counter
-from typing import Literal, TypedDict, cast
+from typing import Literal, cast
 
 import discord
-import pendulum
 from discord import Interaction, app_commands
 from discord.ext import commands
 
 from src.achievements.engine import engine
 from src.achievements.events import ActivityRecordedEvent, RankChangedEvent
-from src.components.activity_records import RecentRecordsView
+from src.components.activity_records import RecentRecordsView, find_duplicate
 from src.models.activity import Activity
+from src.models.activity_calendar import activity_calendar
+from src.models.activity_catalog import catalog, ensure_catalog_loaded
 from src.models.activity_record import ActivityRecord
 from src.models.quest import Quest
+from src.models.recent_activities import recent_activities
 from src.models.user import User
 from src.utils.helper import level_to_rank
 
 logger = logging.getLogger(__name__)
 
-
-# =========================================================
-# Caching
-# =========================================================
-class _CategoryCache(TypedDict):
-    expires_at: float
-    data: list[str]
-
-
-class _ActivityCacheEntry(TypedDict):
-    expires_at: float
-    data: list[str]
-
-
-_CACHE_TTL_SECONDS = 604800  # 1 week
-_category_cache: _CategoryCache = {'expires_at': 0.0, 'data': []}
-_activity_cache: dict[str, _ActivityCacheEntry] = {}
-_activity_cache_warmed = False
-
-
-async def _get_categories_cached(now: float) -> list[str]:
-    if _category_cache['data'] and _category_cache['expires_at'] > now:
-        return _category_cache['data']
-
-    categories = await asyncio.to_thread(Activity.list_categories, active_only=True)
-    _category_cache.update({'data': categories, 'expires_at': now + _CACHE_TTL_SECONDS})
-    return categories
-
-
-async def _get_activities_cached(category: str, now: float) -> list[str]:
-    entry = _activity_cache.get(category)
-    if entry and entry['expires_at'] > now:
-        return entry['data']
-
-    rows = await asyncio.to_thread(
-        Activity.list_by_category, category, active_only=True
-    )
-    names = [a['name'] for a in rows]
-    _activity_cache[category] = {'data': names, 'expires_at': now + _CACHE_TTL_SECONDS}
-    return names
-
-
-async def _warm_activity_cache_if_needed(now: float) -> None:
-    global _activity_cache_warmed
-    if _activity_cache_warmed:
-        return
-
-    categories = await _get_categories_cached(now)
-    for cat in categories:
-        try:
-            await _get_activities_cached(cat, now)
-        except Exception:
-            logger.debug('Failed warming cache for category %s', cat)
-
-    _activity_cache_warmed = True
+# Seconds an autocomplete may wait on a cold catalog (Discord allows 3)
+_AUTOCOMPLETE_LOAD_TIMEOUT = 2.0
 
 
 # =========================================================
@@ -88,6 +37,9 @@ def _parse_activity_date(date_input: str | None) -> date:
     if not date_input:
         return datetime.now(timezone.utc).date()
 
+    # Deferred: pendulum is slow to import and only needed for typed dates
+    import pendulum
+
     cleaned = date_input.strip().lower()
 
     if cleaned == 'yesterday':
@@ -100,6 +52,38 @@ def _parse_activity_date(date_input: str | None) -> date:
         raise ValueError
 
 
+async def _catalog_ready() -> bool:
+    '''
+    Load the activity catalog, giving up before Discord's 3s autocomplete
+    deadline. The load keeps running in its thread for the next keystroke.
+    '''
+    try:
+        await asyncio.wait_for(
+            ensure_catalog_loaded(), timeout=_AUTOCOMPLETE_LOAD_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        logger.warning('Activity catalog not loaded in time for autocomplete')
+        return False
+    return True
+
+
+async def _recent_boost(user_id: int, category: str | None) -> dict[str, float]:
+    '''
+    Rank the member's recent activities first. Seeding a member costs one query,
+    once; if it can't finish before the deadline the choices go unranked.
+    '''
+    if user_id not in recent_activities:
+        try:
+            await asyncio.wait_for(
+                asyncio.to_thread(recent_activities.load, user_id),
+                timeout=_AUTOCOMPLETE_LOAD_TIMEOUT,
+            )
+        except Exception:
+            logger.debug('Could not seed recent activities for %s', user_id)
+            return {}
+    return recent_activities.boost(user_id, category)
+
+
 def _format_achievement_lines(unlocked: list[dict]) -> list[str]:
     unique = {a.get('code'): a for a in unlocked}.values()
     lines = ['\n🏆 Achievements unlocked:']
@@ -128,11 +112,12 @@ class ActivityRecordsCog(commands.Cog):
     # ---------------- Autocomplete ----------------
 
     async def category_autocomplete(self, interaction: Interaction, current: str):
-        now = perf_counter()
-        categories = await _get_categories_cached(now)
-        cur = (current or '').lower()
+        if not await _catalog_ready():
+            return []
+        boost = await _recent_boost(interaction.user.id, None)
         return [
-            app_commands.Choice(name=c, value=c) for c in categories if cur in c.lower()
+            app_commands.Choice(name=c, value=c)
+            for c in catalog.category_index().search(current, boost=boost)
         ]
 
     async def activity_autocomplete(self, interaction: Interaction, current: str):
@@ -140,12 +125,13 @@ class ActivityRecordsCog(commands.Cog):
         if not category:
             return []
 
-        now = perf_counter()
-        await _warm_activity_cache_if_needed(now)
-        names = await _get_activities_cached(category, now)
-
-        cur = (current or '').lower()
-        return [app_commands.Choice(name=n, value=n) for n in names if cur in n.lower()]
+        if not await _catalog_ready():
+            return []
+        boost = await _recent_boost(interaction.user.id, category)
+        return [
+            app_commands.Choice(name=n, value=n)
+            for n in catalog.activity_index(category).search(current, boost=boost)
+        ]
 
     # =========================================================
 
@@ -199,75 +185,6 @@ class ActivityRecordsCog(commands.Cog):
         xp_value = int(activity_row['xp_value'])
         activity_id = activity_row['id']
 
-        # Duplicate validation
-        activity_name = str(activity_row.get('name', activity))
-        group_key = ActivityRecord._activity_group_key(category, activity_name)
-
-        # Handle daily group activities (like Daily Steps)
-        if group_key == 'steps_daily':
-            dup = await asyncio.to_thread(
-                ActivityRecord.has_group_activity_on_date,
-                user_id,
-                group_key,
-                date_iso,
-            )
-            if dup:
-                await interaction.response.send_message(
-                    '❌ You already recorded a Daily Steps activity for that day.',
-                    ephemeral=True,
-                )
-                return
-
-        # Handle weekly group activities
-        elif group_key in {
-            'steps_weekly',
-            'recovery_weekly_sleep',
-            'diet_weekly_no_alcohol',
-        }:
-            # Check for weekly duplicates first
-            weekly_dup = await asyncio.to_thread(
-                ActivityRecord.has_group_activity_in_week,
-                user_id,
-                group_key,
-                date_iso,
-            )
-            if weekly_dup:
-                await interaction.response.send_message(
-                    '❌ You already recorded a weekly version of that activity '
-                    'in last 7 days.',
-                    ephemeral=True,
-                )
-                return
-
-            # Also check for same-day duplicates for weekly activities
-            dup = await asyncio.to_thread(
-                ActivityRecord.has_activity_on_date,
-                user_id,
-                activity_id,
-                date_iso,
-            )
-            if dup:
-                await interaction.response.send_message(
-                    '❌ You already recorded that activity for that day.',
-                    ephemeral=True,
-                )
-                return
-
-        # Handle regular activities (no group key)
-        else:
-            dup = await asyncio.to_thread(
-                ActivityRecord.has_activity_on_date,
-                user_id,
-                activity_id,
-                date_iso,
-            )
-            if dup:
-                await interaction.response.send_message(
-                    '❌ You already recorded that activity for that day.',
-                    ephemeral=True,
-                )
-                return
-
         if not interaction.response.is_done():
             await interaction.response.defer(thinking=True)
 
@@ -275,20 +192,32 @@ class ActivityRecordsCog(commands.Cog):
             '⏳ Recording your activity...', wait=True
         )
 
-        # Daily bonus - check BEFORE inserting to see if this is first activity
-        has_today = await asyncio.to_thread(
-            ActivityRecord.has_record_on_date, user_id, today_iso
-        )
-        should_give_daily_bonus = not has_today
-
-        await asyncio.to_thread(
+        # The unique index and group claims reject duplicates, so the insert
+        # is the check; only a rejected record pays for explaining why
+        inserted = await asyncio.to_thread(
             ActivityRecord.insert,
             user_id=user_id,
             activity_id=activity_id,
             note=note,
             date_occurred=date_iso,
             message_id=status_msg.id,
+            guild_id=interaction.guild_id,
         )
+        if not inserted:
+            duplicate = await asyncio.to_thread(
+                find_duplicate, user_id, activity_id, date_iso
+            )
+            try:
+                await status_msg.delete()
+            except discord.HTTPException:
+                pass
+            await interaction.followup.send(
+                duplicate or '❌ You already recorded that activity for that day.',
+                ephemeral=True,
+            )
+            return
+        recent_activities.record(user_id, activity_id)
+        activity_calendar.mark(user_id, date_obj)
 
         message_lines = [
             f'✅ Recorded: **{activity}** (+{xp_value} XP)',
@@ -299,37 +228,30 @@ class ActivityRecordsCog(commands.Cog):
         if date_iso != today_iso:
             message_lines.append(f'📅 Date: {date_iso}')
 
-        # Add daily bonus if this was the first activity of the day
-        if should_give_daily_bonus:
-            await asyncio.to_thread(User.add_daily_bonus, user_id)
+        # Paid once per (UTC) day, by the first record that claims it
+        if await asyncio.to_thread(
+            User.add_daily_bonus, user_id, date.fromisoformat(today_iso)
+        ):
             message_lines.append('🎁 Daily bonus: +10 XP')
 
-        # Check for active quest completion
-        active_quest = await asyncio.to_thread(Quest.get_active, user_id)
-        if active_quest and active_quest['activity_id'] == activity_id:
-            now = datetime.now(timezone.utc)
-            if active_quest['deadline'] > now:
-                bonus_xp = 50 + (100 if active_quest['is_new_bonus'] else 0)
-                await asyncio.to_thread(User.add_daily_bonus, user_id, bonus_xp)
-                await asyncio.to_thread(Quest.delete_quest, active_quest['id'])
-
-                quest_msg = f'⚔️ **Quest Completed!** (+{bonus_xp} XP)'
-                if active_quest['is_new_bonus']:
-                    quest_msg += ' (New Activity Bonus!)'
-                message_lines.append(quest_msg)
-
-            else:
-                await asyncio.to_thread(Quest.delete_quest, active_quest['id'])
+        # Complete a matching active quest and award its XP in one statement
+        completed = await asyncio.to_thread(Quest.complete, user_id, activity_id)
+        if completed:
+            quest_msg = f'⚔️ **Quest Completed!** (+{completed["bonus_xp"]} XP)'
+            if completed['is_new_bonus']:
+                quest_msg += ' (New Activity Bonus!)'
+            message_lines.append(quest_msg)
 
         unlocked: list[dict] = []
         try:
-            unlocked += engine.dispatch(
+            unlocked += await asyncio.to_thread(
+                engine.dispatch,
                 ActivityRecordedEvent(
                     user_id=user_id,
                     activity_id=activity_id,
                     category=activity_row['category'],
                     date_occurred=date_obj,
-                )
+                ),
             )
         except Exception:
             logger.exception('ActivityRecordedEvent dispatch failed')
@@ -347,8 +269,9 @@ class ActivityRecordsCog(commands.Cog):
             if new_rank != old_rank:
                 message_lines.append(f'🏅 Rank up! {old_rank} → {new_rank}')
                 try:
-                    unlocked += engine.dispatch(
-                        RankChangedEvent(user_id=user_id, new_rank=new_rank)
+                    unlocked += await asyncio.to_thread(
+                        engine.dispatch,
+                        RankChangedEvent(user_id=user_id, new_rank=new_rank),
                     )
                 except Exception:
                     logger.exception('RankChangedEvent dispatch failed')
@@ -2,7 +2,8 @@ from discord import Interaction, app_commands
 from discord.ext import commands
 
 from src.components.admin import ActivityEditView, CategorySelectView
-from src.database.db_manager import DBManager
+from src.models.activity_catalog import catalog, ensure_catalog_loaded
+from src.utils.command_sync import dev_guild, sync_command_tree
 
 
 class AdminCog(commands.Cog):
@@ -15,25 +16,22 @@ class AdminCog(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def add_activity(self, interaction: Interaction):
         '''Admin-only command to add new activity.'''
-        with DBManager() as db:
-            rows = db.fetchall(
-                'SELECT DISTINCT category FROM activities ORDER BY category ASC'
-            )
-            categories = [r['category'] for r in rows] if rows else []
-
-            if not categories:
-                await interaction.response.send_message(
-                    '⚠️ No categories found. Add a category manually in the DB first.',
-                    ephemeral=True,
-                )
-                return
+        await ensure_catalog_loaded()
+        categories = catalog.categories(active_only=False)
 
-            view = CategorySelectView(categories)
+        if not categories:
             await interaction.response.send_message(
-                'Select a category for the new activity:',
-                view=view,
+                '⚠️ No categories found. Add a category manually in the DB first.',
                 ephemeral=True,
             )
+            return
+
+        view = CategorySelectView(categories)
+        await interaction.response.send_message(
+            'Select a category for the new activity:',
+            view=view,
+            ephemeral=True,
+        )
 
     @app_commands.command(
         name='edit_activity',
@@ -43,29 +41,13 @@ class AdminCog(commands.Cog):
     async def edit_activity(self, interaction: Interaction):
         '''Admin-only command to edit or archive an existing activity.'''
         # Ensure we have categories and at least one unarchived activity
-        with DBManager() as db:
-            cat_rows = db.fetchall(
-                'SELECT DISTINCT category '
-                'FROM activities WHERE is_archived = %s LIMIT 25',
-                (False,),
-            )
-            if not cat_rows:
-                await interaction.response.send_message(
-                    '⚠️ No categories found with active activities. '
-                    'Add activities first.',
-                    ephemeral=True,
-                )
-                return
-            any_activity = db.fetchone(
-                'SELECT 1 FROM activities WHERE is_archived = %s LIMIT 1',
-                (False,),
+        await ensure_catalog_loaded()
+        if not catalog.categories(active_only=True):
+            await interaction.response.send_message(
+                '⚠️ No unarchived activities found. Add activities first.',
+                ephemeral=True,
             )
-            if not any_activity:
-                await interaction.response.send_message(
-                    '⚠️ No unarchived activities found. Add activities first.',
-                    ephemeral=True,
-                )
-                return
+            return
 
         view = ActivityEditView(requestor_id=interaction.user.id)
         await interaction.response.send_message(
@@ -75,6 +57,20 @@ class AdminCog(commands.Cog):
             ephemeral=True,
         )
 
+    @app_commands.command(
+        name='sync_commands',
+        description='Admin-only command to force a slash command sync.',
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def sync_commands(self, interaction: Interaction):
+        '''Admin-only command to force a slash command sync.'''
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        guild = dev_guild()
+        if guild is not None:
+            self.bot.tree.copy_global_to(guild=guild)
+        await sync_command_tree(self.bot.tree, guild, force=True)
+        await interaction.followup.send('✅ Slash commands synced.', ephemeral=True)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(AdminCog(bot))
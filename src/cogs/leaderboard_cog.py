@@ -1,8 +1,10 @@
+import asyncio
+
 from discord import Interaction, app_commands
 from discord.ext import commands
 
 from src.components.leaderboard import leaderboard_embed
-from src.database.db_manager import DBManager
+from src.models.user import User
 
 
 class LeaderboardCog(commands.Cog):
@@ -10,27 +12,21 @@ class LeaderboardCog(commands.Cog):
         self.bot = bot
 
     @app_commands.command(
-        name='leaderboard', description='Show the top users by total XP.'
+        name='leaderboard', description="Show this server's top users by total XP."
     )
     @app_commands.describe(
         top='How many users to show on the leaderboard (default 10, max 50)'
     )
     async def leaderboard(self, interaction: Interaction, top: int = 10):
-        '''Show the top users by total XP.'''
+        '''Show this server's top users by total XP.'''
         lim = max(3, min(50, top))  # enforce reasonable limits
 
-        with DBManager() as db:
-            rows = db.fetchall(
-                '''
-                SELECT display_name, level, total_xp
-                FROM users
-                ORDER BY total_xp DESC
-                LIMIT %s
-                ''',
-                (lim,),
-            )
+        # Ranked among this server's members; global when used in DMs
+        rows = await asyncio.to_thread(
+            User.leaderboard_top, lim, compact=True, guild_id=interaction.guild_id
+        )
 
-        entries = [(row['display_name'], row['level'], row['total_xp']) for row in rows]
+        entries = [(row.display_name, row.level, row.total_xp) for row in rows]
 
         if not entries:
             await interaction.response.send_message(
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+
+from discord.ext import commands, tasks
+
+from src.database import partitions
+from src.database.db_manager import DBManager
+
+logger = logging.getLogger(__name__)
+
+# Partitions are kept months ahead, so a few runs a day is plenty
+PARTITION_MAINTENANCE_HOURS = 6
+
+
+def _maintain_partitions() -> dict[str, list[str]]:
+    with DBManager() as db:
+        return partitions.maintain(db)
+
+
+class MaintenanceCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        self.maintain_partitions.start()
+
+    async def cog_unload(self):
+        self.maintain_partitions.cancel()
+
+    @tasks.loop(hours=PARTITION_MAINTENANCE_HOURS)
+    async def maintain_partitions(self):
+        '''Create upcoming activity_records partitions and archive cold ones.'''
+        try:
+            result = await asyncio.to_thread(_maintain_partitions)
+        except Exception:
+            # Keep the loop alive; partitions are created well ahead of need
+            logger.exception('Partition maintenance failed')
+            return
+        if result['created'] or result['archived']:
+            logger.info(
+                f'Partition maintenance: created {result["created"]}, '
+                f'archived {result["archived"]}'
+            )
+
+    @maintain_partitions.before_loop
+    async def _wait_until_ready(self):
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(MaintenanceCog(bot))
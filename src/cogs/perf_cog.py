@@ -0,0 +1,61 @@
+import time
+
+from discord import Interaction, app_commands
+from discord.ext import commands
+
+from src.components.perf import PERF_COMMANDS, perf_embed
+from src.database.db_manager import DBManager
+from src.models.activity_calendar import activity_calendar
+from src.models.activity_catalog import catalog
+from src.models.recent_activities import recent_activities
+from src.utils.command_tree import command_span_name
+from src.utils.loop_lag import loop_lag
+from src.utils.trace_exporters import span_stats
+
+
+class PerfCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        # (monotonic time, cumulative pool checkouts) at the previous /perf
+        self._last_checkouts = (time.monotonic(), self._checkouts())
+
+    @staticmethod
+    def _checkouts() -> int:
+        return DBManager.pool_stats().get('requests_num', 0)
+
+    def checkout_rate(self) -> float:
+        '''Pool checkouts per second since the previous call.'''
+        now, checkouts = time.monotonic(), self._checkouts()
+        last_time, last_checkouts = self._last_checkouts
+        self._last_checkouts = (now, checkouts)
+        elapsed = now - last_time
+        return max(0, checkouts - last_checkouts) / elapsed if elapsed > 0 else 0.0
+
+    @app_commands.command(
+        name='perf', description='Admin-only view of live latency and pool stats.'
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def perf(self, interaction: Interaction):
+        '''Admin-only view of live latency and pool stats.'''
+        # Everything below is an in-memory read; nothing touches the database
+        latencies = {}
+        for command in PERF_COMMANDS:
+            span_name = command_span_name(command)
+            latencies[command] = span_stats.summary(span_name).get(span_name, {})
+
+        embed = perf_embed(
+            pool=DBManager.pool_stats(),
+            checkouts_per_second=self.checkout_rate(),
+            latencies=latencies,
+            loop_lag=loop_lag.stats(),
+            caches={
+                'Activity catalog': catalog.stats(),
+                'Recent activities': recent_activities.stats(),
+                'Activity calendar': activity_calendar.stats(),
+            },
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(PerfCog(bot))
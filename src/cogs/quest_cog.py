@@ -5,15 +5,21 @@ from typing import TypedDict
 
 import discord
 from discord import Interaction, app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
+from src.components.base import BaseView
 from src.models.activity import Activity
 from src.models.activity_record import ActivityRecord
 from src.models.quest import Quest
 from src.models.quest_roll import QuestRoll
+from src.utils.constants import QUEST_NEW_ACTIVITY_BONUS_XP, QUEST_XP
+from src.utils.tracing import add_span_metadata, trace_span
 
 logger = logging.getLogger(__name__)
 
+# How often expired quests are swept and upcoming rolls generated
+SWEEP_INTERVAL_MINUTES = 15
+
 
 class QuestOption(TypedDict):
     activity_id: int
@@ -23,7 +29,11 @@ class QuestOption(TypedDict):
     is_new: bool
 
 
-class QuestSelectionView(discord.ui.View):
+def _quest_reward(is_new: bool) -> int:
+    return QUEST_XP + (QUEST_NEW_ACTIVITY_BONUS_XP if is_new else 0)
+
+
+class QuestSelectionView(BaseView):
     def __init__(self, user_id: int, options: list[QuestOption]):
         super().__init__(timeout=60)
         self.user_id = user_id
@@ -38,7 +48,7 @@ class QuestSelectionView(discord.ui.View):
             options=[
                 discord.SelectOption(
                     label=f'{opt["name"]} ({opt["category"]})',
-                    description=f'Reward: {50 + (100 if opt["is_new"] else 0)} XP'
+                    description=f'Reward: {_quest_reward(opt["is_new"])} XP'
                     + (' (New!)' if opt['is_new'] else ''),
                     value=str(opt['activity_id']),
                 )
@@ -61,12 +71,8 @@ class QuestSelectionView(discord.ui.View):
         )
 
         if self.selected_option:
-            # Check if user has already accepted a quest from this roll (double check)
-            # This is to prevent race conditions or if they somehow reused the view
-            # But QuestRoll.mark_accepted is called after, so we should check before.
-            # However, the view is ephemeral, so it's unlikely they can reuse it easily
-            # after the roll changes, but let's be safe?
-            # Actually, we'll rely on the command check mainly, but let's just mark it.
+            # Quest.accept re-checks the roll atomically, so a reused or
+            # double-clicked view cannot accept twice
             await interaction.response.defer()
             self.stop()
 
@@ -75,6 +81,35 @@ class QuestCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        plan = getattr(self.bot, 'plan', None)
+        if plan is None or plan.runs_global_tasks:
+            self.sweep_quests.start()
+
+    async def cog_unload(self):
+        self.sweep_quests.cancel()
+
+    # ---------------- Background sweeper ----------------
+
+    @tasks.loop(minutes=SWEEP_INTERVAL_MINUTES)
+    async def sweep_quests(self):
+        '''Delete expired quests and pre-roll quests for active users.'''
+        try:
+            with trace_span('quests.sweep'):
+                expired = await asyncio.to_thread(Quest.delete_expired)
+                rolled = await asyncio.to_thread(QuestRoll.pregenerate)
+                add_span_metadata('expired', expired)
+                add_span_metadata('rolled', rolled)
+        except Exception:
+            # Keep the loop alive; the next run picks up where this one failed
+            logger.exception('Quest sweep failed')
+            return
+        logger.info(f'Quest sweep: deleted {expired} expired, rolled {rolled}')
+
+    @sweep_quests.before_loop
+    async def _wait_until_ready(self):
+        await self.bot.wait_until_ready()
+
     @app_commands.command(
         name='quest',
         description='Roll 5 random activities and choose one as a quest for bonus XP',
@@ -86,24 +121,21 @@ class QuestCog(commands.Cog):
         # Check for existing active quest
         active_quest = await asyncio.to_thread(Quest.get_active, user_id)
         if active_quest:
-            now = datetime.now(timezone.utc)
             deadline = active_quest['deadline']
-            if deadline > now:
-                await interaction.followup.send(
-                    f'⚠️ You already have an active quest: '
-                    f'**{active_quest["activity_name"]}**\n'
-                    f"Deadline: {discord.utils.format_dt(deadline, 'R')}",
-                    ephemeral=True,
-                )
-                return
-            else:
-                # Clean up expired quest silently
-                await asyncio.to_thread(Quest.delete_quest, active_quest['id'])
+            await interaction.followup.send(
+                f'⚠️ You already have an active quest: '
+                f'**{active_quest["activity_name"]}**\n'
+                f"Deadline: {discord.utils.format_dt(deadline, 'R')}",
+                ephemeral=True,
+            )
+            return
+
+        # Get sticky roll; a fresh roll already knows which activities are new
+        rolled: list[dict] = []
 
-        # Get sticky roll
         def get_new_activity_ids():
-            activities = Activity.get_random(5)
-            return [a['id'] for a in activities]
+            rolled.extend(QuestRoll.sample_activities(user_id, 5))
+            return [a['id'] for a in rolled]
 
         quest_roll = await asyncio.to_thread(
             QuestRoll.get_or_create, user_id, get_new_activity_ids
@@ -136,7 +168,16 @@ class QuestCog(commands.Cog):
 
             activity_ids = json.loads(activity_ids)
 
-        activities = await asyncio.to_thread(Activity.get_by_ids, activity_ids)
+        if rolled:
+            activities = rolled
+        else:
+            activities = await asyncio.to_thread(Activity.get_by_ids, activity_ids)
+            # Check existing records to determine if "new" (one query for the roll)
+            done_ids = await asyncio.to_thread(
+                ActivityRecord.exists_many, user_id, [a['id'] for a in activities]
+            )
+            for act in activities:
+                act['is_new'] = act['id'] not in done_ids
 
         if not activities:
             await interaction.followup.send(
@@ -144,22 +185,16 @@ class QuestCog(commands.Cog):
             )
             return
 
-        # Check existing records to determine if "new"
-        quest_options: list[QuestOption] = []
-
-        for act in activities:
-            has_done = await asyncio.to_thread(
-                ActivityRecord.has_any_record, user_id, act['id']
-            )
-            quest_options.append(
-                {
-                    'activity_id': act['id'],
-                    'name': act['name'],
-                    'category': act['category'],
-                    'xp_value': act['xp_value'],
-                    'is_new': not has_done,
-                }
-            )
+        quest_options: list[QuestOption] = [
+            {
+                'activity_id': act['id'],
+                'name': act['name'],
+                'category': act['category'],
+                'xp_value': act['xp_value'],
+                'is_new': act['is_new'],
+            }
+            for act in activities
+        ]
 
         view = QuestSelectionView(user_id, quest_options)
         await interaction.followup.send(
@@ -180,18 +215,26 @@ class QuestCog(commands.Cog):
             opt = view.selected_option
             deadline = datetime.now(timezone.utc) + timedelta(days=7)
 
-            # Mark roll as accepted
-            await asyncio.to_thread(QuestRoll.mark_accepted, user_id)
-
-            await asyncio.to_thread(
-                Quest.create_new,
+            # Marks the roll accepted and creates the quest atomically
+            accepted = await asyncio.to_thread(
+                Quest.accept,
                 user_id=user_id,
                 activity_id=opt['activity_id'],
                 deadline=deadline,
                 is_new_bonus=opt['is_new'],
+                guild_id=interaction.guild_id,
             )
+            if not accepted:
+                await interaction.followup.send(
+                    '⚠️ You already accepted a quest from this roll.', ephemeral=True
+                )
+                return
 
-            bonus_text = ' +100 New Activity Bonus!' if opt['is_new'] else '!'
+            bonus_text = (
+                f' +{QUEST_NEW_ACTIVITY_BONUS_XP} New Activity Bonus!'
+                if opt['is_new']
+                else '!'
+            )
             # Announce in channel (publicly)
             try:
                 if interaction.channel:
@@ -200,7 +243,7 @@ class QuestCog(commands.Cog):
                         'accepted a new quest!\n'
                         f'Activity: **{opt["name"]}**\n'
                         f'Deadline: {discord.utils.format_dt(deadline, "R")}\n'
-                        f'Potential Reward: {opt["xp_value"]} XP + 50 Quest XP'
+                        f'Potential Reward: {opt["xp_value"]} XP + {QUEST_XP} Quest XP'
                         f'{bonus_text}',
                     )
             except discord.Forbidden:
@@ -210,7 +253,7 @@ class QuestCog(commands.Cog):
                     f'✅ **Quest Accepted!**\n'
                     f'Activity: **{opt["name"]}**\n'
                     f'Deadline: {discord.utils.format_dt(deadline, "R")}\n'
-                    f'Potential Reward: {opt["xp_value"]} XP + 50 Quest XP'
+                    f'Potential Reward: {opt["xp_value"]} XP + {QUEST_XP} Quest XP'
                     f'{bonus_text}',
                     ephemeral=True,
                 )
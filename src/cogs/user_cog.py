@@ -1,11 +1,48 @@
+import asyncio
+
 import discord
 from discord import Interaction, app_commands
 from discord.ext import commands
 
 from src.database.db_manager import DBManager
+from src.models.guild_member import GuildMember
+from src.models.user import User
+from src.utils.django_setup import ensure_django
 from src.utils.helper import level_to_rank
 
 
+def _register_dashboard_account(
+    user_id: str, display_name: str, email: str, password: str
+) -> None:
+    '''Hash the password with Django's hasher and store the dashboard login.'''
+    ensure_django()
+
+    from django.contrib.auth.hashers import make_password
+
+    hashed_password = make_password(password)
+
+    with DBManager() as db:
+        # Ensure user exists first
+        existing = db.fetchone('SELECT id, email FROM users WHERE id = %s', (user_id,))
+        if not existing:
+            db.execute(
+                '''
+                INSERT INTO users (id, display_name, email, password)
+                VALUES (%s, %s, %s, %s)
+                ''',
+                (user_id, display_name, email, hashed_password),
+            )
+        else:
+            db.execute(
+                '''
+                UPDATE users
+                SET email = %s, password = %s
+                WHERE id = %s
+                ''',
+                (email, hashed_password, user_id),
+            )
+
+
 class UserCog(commands.Cog):
     '''Cog for handling user registration and profile management.'''
 
@@ -20,25 +57,20 @@ class UserCog(commands.Cog):
         user_id = str(interaction.user.id)
         display_name = interaction.user.display_name
 
-        with DBManager() as db:
-            # Check if the user already exists
-            existing = db.fetchone('SELECT id FROM users WHERE id = %s', (user_id,))
-            if existing:
-                await interaction.response.send_message(
-                    f'✅ {interaction.user.mention}, you’re already registered!',
-                    ephemeral=True,
-                )
-                return
-
-            # Register the user
-            db.execute(
-                '''
-                INSERT INTO users (id, display_name)
-                VALUES (%s, %s)
-                ON CONFLICT(id) DO UPDATE SET display_name = excluded.display_name
-                ''',
-                (user_id, display_name),
+        # Check if the user already exists
+        existing = await asyncio.to_thread(User.get_profile, user_id)
+        if not existing:
+            await asyncio.to_thread(User.upsert_user, user_id, display_name)
+        # Users registered elsewhere still join this guild's leaderboard
+        if interaction.guild_id is not None:
+            await asyncio.to_thread(GuildMember.join, interaction.guild_id, user_id)
+
+        if existing:
+            await interaction.response.send_message(
+                f'✅ {interaction.user.mention}, you’re already registered!',
+                ephemeral=True,
             )
+            return
 
         await interaction.response.send_message(
             f'🎉 {interaction.user.mention}, you’ve been registered successfully!',
@@ -55,32 +87,26 @@ class UserCog(commands.Cog):
         target = member or interaction.user
         user_id = str(target.id)
 
-        with DBManager() as db:
-            user = db.fetchone(
-                'SELECT display_name, total_xp, level, updated_at '
-                'FROM users '
-                'WHERE id = %s',
-                (user_id,),
-            )
+        user = await asyncio.to_thread(User.get_profile, user_id)
 
-            if not user:
-                await interaction.response.send_message(
-                    f'⚠️ {target.mention} isn’t registered yet.', ephemeral=True
-                )
-                return
+        if not user:
+            await interaction.response.send_message(
+                f'⚠️ {target.mention} isn’t registered yet.', ephemeral=True
+            )
+            return
 
-            lvl = max(1, int(user['level']))
+        lvl = max(1, int(user['level']))
 
-            embed = discord.Embed(
-                title=f"{user['display_name']}'s Profile",
-                color=discord.Color.blurple(),
-            )
-            embed.add_field(name='Level', value=lvl)
-            embed.add_field(name='Rank', value=level_to_rank(lvl))
-            embed.add_field(name='Total XP', value=user['total_xp'])
-            embed.set_footer(text=f'Last Updated: {user["updated_at"]}')
+        embed = discord.Embed(
+            title=f"{user['display_name']}'s Profile",
+            color=discord.Color.blurple(),
+        )
+        embed.add_field(name='Level', value=lvl)
+        embed.add_field(name='Rank', value=level_to_rank(lvl))
+        embed.add_field(name='Total XP', value=user['total_xp'])
+        embed.set_footer(text=f'Last Updated: {user["updated_at"]}')
 
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @app_commands.command(
         name='dashboard_register',
@@ -96,49 +122,10 @@ class UserCog(commands.Cog):
         user_id = str(interaction.user.id)
         display_name = interaction.user.display_name
 
-        import os
-        import sys
-
-        import django
-        from django.conf import settings
-
-        # Add the 'web' directory to Python's path so Django can find 'dashboard'
-        web_dir = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'web'
+        # Password hashing is deliberately slow; keep it and the DB off the loop
+        await asyncio.to_thread(
+            _register_dashboard_account, user_id, display_name, email, password
         )
-        if web_dir not in sys.path:
-            sys.path.append(web_dir)
-
-        if not settings.configured:
-            os.environ['DJANGO_SETTINGS_MODULE'] = 'core.settings'
-            django.setup()
-
-        from django.contrib.auth.hashers import make_password
-
-        hashed_password = make_password(password)
-
-        with DBManager() as db:
-            # Ensure user exists first
-            existing = db.fetchone(
-                'SELECT id, email FROM users WHERE id = %s', (user_id,)
-            )
-            if not existing:
-                db.execute(
-                    '''
-                    INSERT INTO users (id, display_name, email, password)
-                    VALUES (%s, %s, %s, %s)
-                    ''',
-                    (user_id, display_name, email, hashed_password),
-                )
-            else:
-                db.execute(
-                    '''
-                    UPDATE users
-                    SET email = %s, password = %s
-                    WHERE id = %s
-                    ''',
-                    (email, hashed_password, user_id),
-                )
 
         await interaction.response.send_message(
             f'✅ {interaction.user.mention}, your dashboard account has been set up! '
@@ -2,17 +2,45 @@ import logging
 from datetime import date, datetime, timezone
 
 import discord
-import pendulum
 from discord import Interaction
 
+from src.components.base import BaseModal, BaseView
 from src.models.activity import Activity
-from src.models.activity_record import ActivityRecord
+from src.models.activity_record import ActivityRecord, DuplicateCheck
 from src.models.user import User
 
 logger = logging.getLogger(__name__)
 
 
-class RecentRecordsView(discord.ui.View):
+def duplicate_message(check: DuplicateCheck) -> str | None:
+    '''User-facing reason a record would be a duplicate, or None.'''
+    if check.group_taken:
+        if check.period == 'week':
+            return (
+                '❌ You already recorded a weekly version of that '
+                'activity in the last 7 days.'
+            )
+        return f'❌ You already recorded a {check.group_label} activity for that day.'
+    if check.same_day:
+        return '❌ You already recorded that activity for that day.'
+    return None
+
+
+def find_duplicate(
+    user_id: int | str,
+    activity_id: int,
+    date_iso: str,
+    exclude_record_id: int | None = None,
+) -> str | None:
+    '''Check every duplicate rule in one query; the message if one applies.'''
+    return duplicate_message(
+        ActivityRecord.check_duplicates(
+            user_id, activity_id, date_iso, exclude_record_id=exclude_record_id
+        )
+    )
+
+
+class RecentRecordsView(BaseView):
     def __init__(self, requestor_id: int, records: list[dict]):
         super().__init__(timeout=120)
         self.requestor_id = requestor_id
@@ -41,7 +69,7 @@ class RecentRecordsView(discord.ui.View):
         return True
 
 
-class RecordEditView(discord.ui.View):
+class RecordEditView(BaseView):
     def __init__(
         self, record: dict, requestor_id: int, interaction: Interaction | None = None
     ):
@@ -163,7 +191,7 @@ class ActivitySelect(discord.ui.Select):
         await interaction.response.defer()
 
 
-class RecordEditModal(discord.ui.Modal):
+class RecordEditModal(BaseModal):
     def __init__(
         self,
         record_id: int,
@@ -208,6 +236,8 @@ class RecordEditModal(discord.ui.Modal):
         date_val = str(self.date_occurred.value).strip()
 
         try:
+            import pendulum
+
             # Parse the date using pendulum for flexible input
             parsed_date = pendulum.parse(date_val, strict=False)
             if not parsed_date:
@@ -223,7 +253,7 @@ class RecordEditModal(discord.ui.Modal):
             return
 
         # Get the current record to ensure we have the latest data
-        record = ActivityRecord.get(self.record_id)
+        record = ActivityRecord.get(self.record_id, columns=('id', 'user_id'))
         if not record:
             await interaction.response.send_message(
                 '❌ Record not found.',
@@ -240,82 +270,25 @@ class RecordEditModal(discord.ui.Modal):
             )
             return
 
-        # Update the record in the database
-        group_key = ActivityRecord._activity_group_key(
-            self.staged_category, self.staged_activity_name
-        )
-
-        # Handle daily group activities (like Daily Steps)
-        if group_key == 'steps_daily':
-            dup = ActivityRecord.has_group_activity_on_date(
-                user_id=record['user_id'],
-                group_key=group_key,
-                date_iso=date_val,
-                exclude_record_id=self.record_id,
-            )
-            if dup:
-                await interaction.response.send_message(
-                    '❌ You already recorded a Daily Steps activity for that day.',
-                    ephemeral=True,
-                )
-                return
-
-        # Handle weekly group activities
-        elif group_key in {
-            'steps_weekly',
-            'recovery_weekly_sleep',
-            'diet_weekly_no_alcohol',
-        }:
-            # Check for weekly duplicates first
-            weekly_dup = ActivityRecord.has_group_activity_in_week(
-                user_id=record['user_id'],
-                group_key=group_key,
-                date_iso=date_val,
-                exclude_record_id=self.record_id,
-            )
-            if weekly_dup:
-                await interaction.response.send_message(
-                    '❌ You already recorded a weekly version of that '
-                    'activity in the last 7 days.',
-                    ephemeral=True,
-                )
-                return
-
-            # Also check for same-day duplicates for weekly activities
-            dup = ActivityRecord.has_activity_on_date(
-                user_id=record['user_id'],
-                activity_id=self.staged_activity_id,
-                date_iso=date_val,
-                exclude_record_id=self.record_id,
-            )
-            if dup:
-                await interaction.response.send_message(
-                    '❌ You already recorded that activity for that day.',
-                    ephemeral=True,
-                )
-                return
-
-        # Handle regular activities (no group key)
-        else:
-            dup = ActivityRecord.has_activity_on_date(
-                user_id=record['user_id'],
-                activity_id=self.staged_activity_id,
-                date_iso=date_val,
-                exclude_record_id=self.record_id,
-            )
-            if dup:
-                await interaction.response.send_message(
-                    '❌ You already recorded that activity for that day.',
-                    ephemeral=True,
-                )
-                return
-
-        ActivityRecord.update_record(
+        updated = ActivityRecord.update_record(
             record_id=self.record_id,
             activity_id=self.staged_activity_id,
             note=(note_val if note_val != '' else None),
             date_occurred=date_val,
         )
+        if not updated:
+            # Deleted meanwhile, or rejected as a duplicate by the database
+            await interaction.response.send_message(
+                find_duplicate(
+                    record['user_id'],
+                    self.staged_activity_id,
+                    date_val,
+                    exclude_record_id=self.record_id,
+                )
+                or '❌ Record not found.',
+                ephemeral=True,
+            )
+            return
 
         # Build the updated message content with the correct XP value
         xp_value = activity.get('xp_value', 0)
@@ -383,7 +356,7 @@ class RecordEditModal(discord.ui.Modal):
                 logger.error(f'Failed to send error message to user: {e2}')
 
 
-class DeleteConfirmModal(discord.ui.Modal):
+class DeleteConfirmModal(BaseModal):
     def __init__(self, record_id: int):
         super().__init__(title='Confirm Delete')
         self.record_id = record_id
@@ -404,7 +377,9 @@ class DeleteConfirmModal(discord.ui.Modal):
             return
 
         # Fetch record to inspect created_at and user_id
-        rec = ActivityRecord.get(self.record_id)
+        rec = ActivityRecord.get(
+            self.record_id, columns=('id', 'user_id', 'created_at', 'message_id')
+        )
         if not rec:
             await interaction.response.send_message(
                 '❌ Record not found or already deleted.', ephemeral=True
@@ -418,15 +393,17 @@ class DeleteConfirmModal(discord.ui.Modal):
         # If this record is the only one created today for the user, remove daily bonus
         try:
             today_iso = datetime.now(timezone.utc).date().isoformat()
-            if hasattr(created_at, 'date'):
-                created_date_iso = created_at.date().isoformat()
+            if hasattr(created_at, 'astimezone'):
+                created_date_iso = (
+                    created_at.astimezone(timezone.utc).date().isoformat()
+                )
             else:
                 created_date_iso = str(created_at)[:10]
 
             if created_date_iso == today_iso and user_id is not None:
                 cnt = ActivityRecord.count_on_created_date(user_id, today_iso)
                 if cnt == 1:
-                    User.remove_daily_bonus(user_id)
+                    User.remove_daily_bonus(user_id, date.fromisoformat(today_iso))
         except Exception:
             # Best-effort; proceed with deletion regardless
             pass
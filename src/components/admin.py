@@ -1,16 +1,26 @@
+import asyncio
+
 import discord
 from discord import Interaction
 
+from src.components.base import BaseModal, BaseView
 from src.models.activity import Activity
+from src.models.activity_catalog import ensure_catalog_loaded
 
 
-class CategorySelectView(discord.ui.View):
+class CategorySelectView(BaseView):
     def __init__(self, categories: list[str]):
         super().__init__(timeout=60)
         self.add_item(CategorySelect(categories))
 
 
-class ActivityEditView(discord.ui.View):
+class ActivityEditView(BaseView):
+    '''Category/activity picker for editing activities.
+
+    Reads only the in-memory activity catalog, so callers must have loaded it
+    (``await ensure_catalog_loaded()``) before constructing the view.
+    '''
+
     def __init__(self, requestor_id: int):
         super().__init__(timeout=180)
         self.requestor_id = requestor_id
@@ -18,6 +28,8 @@ class ActivityEditView(discord.ui.View):
         self.selected_activity: str = ''
         self.activity_id: int | None = None
         self.activity_is_archived: bool = False
+        # Rows of the selected category, reused instead of per-id lookups
+        self.activities: list[dict] = []
 
         categories = self._fetch_categories()
 
@@ -31,6 +43,7 @@ class ActivityEditView(discord.ui.View):
                 break
 
         self.selected_category = init_category
+        self.activities = init_activities
         if init_activities:
             self.activity_id = init_activities[0]['id']
             self.selected_activity = init_activities[0]['name']
@@ -75,6 +88,14 @@ class ActivityEditView(discord.ui.View):
         )
         return rows
 
+    async def _load_activities(self, category: str) -> list[dict]:
+        # An edit invalidates the catalog; reload it off the loop, not on read
+        await ensure_catalog_loaded()
+        return self._fetch_activities(category)
+
+    def _find_activity(self, activity_id: int | None) -> dict | None:
+        return next((a for a in self.activities if a['id'] == activity_id), None)
+
 
 class CategorySelect(discord.ui.Select):
     def __init__(self, categories: list[str]):
@@ -111,7 +132,8 @@ class ActivityCategorySelect(discord.ui.Select):
             return
 
         view.selected_category = self.values[0]
-        activities = view._fetch_activities(view.selected_category)
+        activities = await view._load_activities(view.selected_category)
+        view.activities = activities
 
         new_cat = ActivityCategorySelect([o.value for o in self.options])
         new_cat.options = [
@@ -187,11 +209,12 @@ class ActivityNameSelect(discord.ui.Select):
             )
             return
         view.activity_id = int(self.values[0])
-        row = Activity.get(view.activity_id)
+        acts = await view._load_activities(view.selected_category)
+        view.activities = acts
+        row = view._find_activity(view.activity_id)
         view.selected_activity = row['name'] if row else ''
         view.activity_is_archived = bool(row['is_archived']) if row else False
 
-        acts = view._fetch_activities(view.selected_category)
         new_act = ActivityNameSelect(acts, current_id=view.activity_id)
         view.remove_item(view.activity_select)
         view.activity_select = new_act
@@ -224,7 +247,7 @@ class NewCategorySelect(discord.ui.Select):
         await interaction.response.defer()
 
 
-class AddActivityModal(discord.ui.Modal):
+class AddActivityModal(BaseModal):
     activity_name = discord.ui.TextInput(
         label='Activity Name',
         placeholder='i.e. Hiking for N hours, Meditation, etc.',
@@ -257,7 +280,12 @@ class AddActivityModal(discord.ui.Modal):
             )
             return
 
-        Activity.upsert_activity(name=name, category=self.category, xp_value=xp_value)
+        await asyncio.to_thread(
+            Activity.upsert_activity,
+            name=name,
+            category=self.category,
+            xp_value=xp_value,
+        )
 
         await interaction.response.send_message(
             f'✅ Activity **{name}** (Category: **{self.category}**) '
@@ -266,7 +294,7 @@ class AddActivityModal(discord.ui.Modal):
         )
 
 
-class ActivityEditModal(discord.ui.Modal):
+class ActivityEditModal(BaseModal):
     def __init__(
         self,
         activity_id: int,
@@ -311,21 +339,7 @@ class ActivityEditModal(discord.ui.Modal):
             return
 
         try:
-            row = Activity.get(self.activity_id)
-            current_category = row['category'] if row else None
-            final_category = (
-                self.staged_new_category
-                if self.staged_new_category
-                else current_category
-            )
-            Activity.update(
-                self.activity_id,
-                {
-                    'name': name,
-                    'xp_value': xp_val,
-                    'category': final_category,
-                },
-            )
+            await asyncio.to_thread(self._save, name, xp_val)
         except Exception as e:
             await interaction.response.send_message(
                 f'❌ Failed to update activity: {e}', ephemeral=True
@@ -337,6 +351,21 @@ class ActivityEditModal(discord.ui.Modal):
             ephemeral=True,
         )
 
+    def _save(self, name: str, xp_value: int) -> None:
+        row = Activity.get(self.activity_id)
+        current_category = row['category'] if row else None
+        final_category = (
+            self.staged_new_category if self.staged_new_category else current_category
+        )
+        Activity.update(
+            self.activity_id,
+            {
+                'name': name,
+                'xp_value': xp_value,
+                'category': final_category,
+            },
+        )
+
 
 class ArchiveButton(discord.ui.Button):
     def __init__(self, parent_view: ActivityEditView):
@@ -363,7 +392,7 @@ class ArchiveButton(discord.ui.Button):
             return
 
         new_flag = not v.activity_is_archived
-        Activity.set_archived(v.activity_id, new_flag)
+        await asyncio.to_thread(Activity.set_archived, v.activity_id, new_flag)
 
         v.activity_is_archived = new_flag
         self.label = 'Unarchive' if v.activity_is_archived else 'Archive'
@@ -373,7 +402,8 @@ class ArchiveButton(discord.ui.Button):
             else discord.ButtonStyle.danger
         )
 
-        acts = v._fetch_activities(v.selected_category)
+        acts = await v._load_activities(v.selected_category)
+        v.activities = acts
         v.activity_select.options = [
             discord.SelectOption(
                 label=(f'[Archived] {a["name"]}' if a['is_archived'] else a['name']),
@@ -404,7 +434,7 @@ class ContinueEditButton(discord.ui.Button):
             )
             return
 
-        row = Activity.get(v.activity_id)
+        row = v._find_activity(v.activity_id)
         if not row:
             await interaction.response.send_message(
                 'Selected activity not found.', ephemeral=True
@@ -0,0 +1,29 @@
+from typing import Any
+
+import discord
+from discord import Interaction
+
+from src.database.db_manager import DatabaseBusyError
+from src.utils.command_tree import reply_busy
+
+
+class BaseView(discord.ui.View):
+    '''View whose callbacks answer DatabaseBusyError like slash commands do.'''
+
+    async def on_error(
+        self, interaction: Interaction, error: Exception, item: discord.ui.Item[Any]
+    ) -> None:
+        if isinstance(error, DatabaseBusyError):
+            await reply_busy(interaction)
+            return
+        await super().on_error(interaction, error, item)
+
+
+class BaseModal(discord.ui.Modal):
+    '''Modal whose on_submit answers DatabaseBusyError like slash commands do.'''
+
+    async def on_error(self, interaction: Interaction, error: Exception) -> None:
+        if isinstance(error, DatabaseBusyError):
+            await reply_busy(interaction)
+            return
+        await super().on_error(interaction, error)
@@ -0,0 +1,80 @@
+from typing import Any, Optional
+
+import discord
+
+# Slash commands whose latency percentiles /perf reports
+PERF_COMMANDS = ('record', 'leaderboard', 'quest')
+
+
+def _pct(rate: Optional[float]) -> str:
+    return 'n/a' if rate is None else f'{rate * 100:.1f}%'
+
+
+def perf_embed(
+    pool: dict[str, int],
+    checkouts_per_second: float,
+    latencies: dict[str, dict[str, float]],
+    loop_lag: dict[str, float],
+    caches: dict[str, dict[str, Any]],
+) -> discord.Embed:
+    '''
+    pool: psycopg_pool ``get_stats()`` counters ({} when there is no pool)
+    latencies: command name -> ``span_stats.summary()`` entry (ms)
+    loop_lag: ``{last, mean, max}`` in ms and the ``blocked`` count
+    caches: cache name -> stats with ``hit_rate`` and ``size``
+    '''
+    embed = discord.Embed(title='📈 Bot Performance', color=discord.Color.blue())
+
+    if pool:
+        # psycopg_pool omits counters that are still zero
+        embed.add_field(
+            name='🗄️ Connection Pool',
+            value=(
+                f'Size: **{pool.get("pool_size", 0)}**/{pool.get("pool_max", 0)} | '
+                f'Idle: **{pool.get("pool_available", 0)}** | '
+                f'Waiting: **{pool.get("requests_waiting", 0)}**\n'
+                f'Checkouts: **{checkouts_per_second:.2f}/s** | '
+                f'Timeouts: **{pool.get("requests_errors", 0)}**'
+            ),
+            inline=False,
+        )
+    else:
+        embed.add_field(
+            name='🗄️ Connection Pool', value='Pool not initialized.', inline=False
+        )
+
+    lines = []
+    for command in PERF_COMMANDS:
+        stats = latencies.get(command)
+        if not stats or not stats['count']:
+            lines.append(f'`/{command}` no data yet')
+            continue
+        lines.append(
+            f'`/{command}` p50 **{stats["p50"]:.0f}ms** · '
+            f'p95 **{stats["p95"]:.0f}ms** · p99 **{stats["p99"]:.0f}ms** '
+            f'(n={stats["count"]})'
+        )
+    embed.add_field(name='⏱️ Command Latency', value='\n'.join(lines), inline=False)
+
+    embed.add_field(
+        name='🔁 Event Loop Lag',
+        value=(
+            f'Last: **{loop_lag["last"]:.1f}ms** | '
+            f'Mean: **{loop_lag["mean"]:.1f}ms** | '
+            f'Max: **{loop_lag["max"]:.1f}ms** | '
+            f'Blocked: **{loop_lag.get("blocked", 0):.0f}**'
+        ),
+        inline=False,
+    )
+
+    embed.add_field(
+        name='🧠 Caches',
+        value='\n'.join(
+            f'{name}: **{_pct(stats.get("hit_rate"))}** hit rate '
+            f'({stats.get("size", 0)} entries)'
+            for name, stats in caches.items()
+        )
+        or 'No caches.',
+        inline=False,
+    )
+    return embed
@@ -1,12 +1,33 @@
+import itertools
 import logging
+import math
 import os
+import time
+from dataclasses import dataclass, replace
 from functools import wraps
-from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple, TypeVar
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
-from src.utils.tracing import trace_span
+from src.database.query_stats import fingerprint, query_stats
+from src.utils.tracing import add_span_metadata, trace_span
 
 T = TypeVar('T')
 
+# Unique suffixes for server-side (named) cursor names within the process
+_cursor_ids = itertools.count(1)
+
+# Statements EXPLAIN accepts; DDL and DO blocks are never explained
+_EXPLAINABLE = frozenset({'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH'})
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -17,9 +38,89 @@ except Exception:  # pragma: no cover
     dict_row = None  # type: ignore
 
 try:
-    from psycopg_pool import ConnectionPool  # type: ignore
+    from psycopg_pool import (  # type: ignore
+        ConnectionPool,
+        PoolTimeout,
+        TooManyRequests,
+    )
 except Exception:  # pragma: no cover
     ConnectionPool = None  # type: ignore
+    PoolTimeout = TooManyRequests = None  # type: ignore
+
+
+class DatabaseBusyError(RuntimeError):
+    '''No pooled connection could be had: the wait queue is full or timed out.
+
+    Raised instead of waiting further so an overloaded bot sheds requests
+    (callers answer with a "bot busy" message) rather than queueing threads.
+    '''
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    '''Connection pool settings; see ``from_env`` for the variables.'''
+
+    min_size: int = 2
+    max_size: int = 10
+    # Seconds a caller waits for a connection before DatabaseBusyError
+    timeout: float = 5.0
+    # Callers allowed to wait at once; more fail immediately (0 = unbounded)
+    max_waiting: int = 20
+    max_idle: float = 600.0
+    max_lifetime: float = 3600.0
+    # Validate each connection with a round trip when it is checked out
+    check: bool = True
+
+    @classmethod
+    def from_env(cls, env: Optional[dict[str, str]] = None) -> 'PoolConfig':
+        '''Read DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT,
+        DB_POOL_MAX_WAITING, DB_POOL_MAX_IDLE, DB_POOL_MAX_LIFETIME and
+        DB_POOL_CHECK, falling back to the defaults above.'''
+        env = dict(os.environ) if env is None else env
+        default = cls()
+
+        def read(name: str, cast_to: Callable[[str], Any], fallback: Any) -> Any:
+            value = env.get(f'DB_POOL_{name}')
+            return cast_to(value) if value else fallback
+
+        return cls(
+            min_size=read('MIN_SIZE', int, default.min_size),
+            max_size=read('MAX_SIZE', int, default.max_size),
+            timeout=read('TIMEOUT', float, default.timeout),
+            max_waiting=read('MAX_WAITING', int, default.max_waiting),
+            max_idle=read('MAX_IDLE', float, default.max_idle),
+            max_lifetime=read('MAX_LIFETIME', float, default.max_lifetime),
+            check=read(
+                'CHECK', lambda v: v.lower() in {'1', 'true', 'yes'}, default.check
+            ),
+        )
+
+    def for_workers(self, workers: int) -> 'PoolConfig':
+        '''This process's share when ``workers`` bot processes split the pool.
+
+        The DB_POOL_* sizes are budgets for the whole bot, so N shard workers
+        together never open more connections than one process would.
+        '''
+        if workers <= 1:
+            return self
+        max_size = max(1, math.ceil(self.max_size / workers))
+        return replace(
+            self,
+            max_size=max_size,
+            min_size=min(max_size, math.ceil(self.min_size / workers)),
+            max_waiting=math.ceil(self.max_waiting / workers),
+        )
+
+
+def application_name() -> str:
+    '''application_name of this process's connections. Triggers put it in
+    NOTIFY payloads, so a process can tell its own changes apart.'''
+    return f'lifted-leaderboard-{os.getpid()}'
+
+
+def _is_explainable(query: str) -> bool:
+    words = query.lstrip(' \t\r\n(').split(None, 1)
+    return bool(words) and words[0].upper() in _EXPLAINABLE
 
 
 def require_connection(func: Callable) -> Callable:
@@ -45,6 +146,10 @@ class DBManager:
         # Any to avoid importing psycopg types at type-check time; guarded by asserts
         self._pg_conn: Any | None = None
         self._from_pool: bool = False
+        # Reconnect-and-retry count for the statement currently running
+        self._retries: int = 0
+        # Seconds spent waiting for the pooled connection, reported once
+        self._pool_wait: Optional[float] = None
 
     # Shared pool across the process
     _pool: Any | None = None
@@ -53,10 +158,14 @@ class DBManager:
     def init_pool(
         cls,
         db_url: Optional[str] = None,
-        min_size: int = 1,
-        max_size: int = 10,
+        config: Optional[PoolConfig] = None,
     ) -> None:
-        '''Initialize a global connection pool for reuse across requests.'''
+        '''Initialize a global connection pool for reuse across requests.
+
+        ``config`` defaults to ``PoolConfig.from_env()``. Blocks until
+        ``min_size`` connections are open, so the first commands after startup
+        do not pay for connecting.
+        '''
         if cls._pool is not None:
             return
         if psycopg is None:
@@ -65,7 +174,7 @@ class DBManager:
             )
         if ConnectionPool is None:
             raise RuntimeError(
-                'psycopg_pool is not available. Run: pip install "psycopg[binary,pool]"'
+                'psycopg_pool is not available. Run: pip install "psycopg-pool>=3.2"'
             )
 
         conninfo = db_url or os.getenv('DATABASE_URL')
@@ -73,14 +182,33 @@ class DBManager:
             raise RuntimeError(
                 'DATABASE_URL is not set. This project now requires Postgres.'
             )
+        config = config or PoolConfig.from_env()
         # Ensure row_factory is applied to connections from the pool
-        cls._pool = ConnectionPool(
+        pool = ConnectionPool(
             conninfo=conninfo,
-            min_size=min_size,
-            max_size=max_size,
-            kwargs={'row_factory': dict_row},
+            min_size=config.min_size,
+            max_size=config.max_size,
+            timeout=config.timeout,
+            max_waiting=config.max_waiting,
+            max_idle=config.max_idle,
+            max_lifetime=config.max_lifetime,
+            check=ConnectionPool.check_connection if config.check else None,
+            kwargs={'row_factory': dict_row, 'application_name': application_name()},
+            name='lifted-leaderboard',
+            open=True,
+        )
+        try:
+            # Pre-warm: fail startup now rather than on the first command
+            pool.wait(timeout=max(config.timeout, 30.0))
+        except Exception:
+            pool.close()
+            raise
+        cls._pool = pool
+        logger.info(
+            f'Initialized Postgres connection pool '
+            f'(min={config.min_size}, max={config.max_size}, '
+            f'max_waiting={config.max_waiting})'
         )
-        logger.info('Initialized Postgres connection pool')
 
     @classmethod
     def close_pool(cls) -> None:
@@ -91,6 +219,26 @@ class DBManager:
             finally:
                 cls._pool = None
 
+    @classmethod
+    def pool_stats(cls) -> dict[str, int]:
+        '''psycopg_pool counters (``pool_size``, ``requests_num``, ...), or {}.'''
+        if cls._pool is None:
+            return {}
+        return dict(cls._pool.get_stats())
+
+    def _acquire(self) -> None:
+        '''Check a connection out of the pool, recording the wait.'''
+        pool = self.__class__._pool
+        assert pool is not None
+        start = time.perf_counter()
+        try:
+            self._pg_conn = pool.getconn()
+        except (TooManyRequests, PoolTimeout) as e:
+            logger.warning(f'Connection pool exhausted: {e}')
+            raise DatabaseBusyError(str(e)) from e
+        self._pool_wait = time.perf_counter() - start
+        self._from_pool = True
+
     def __enter__(self) -> 'DBManager':
         db_url = os.getenv('DATABASE_URL')
         if psycopg is None:
@@ -98,16 +246,16 @@ class DBManager:
                 'psycopg is not installed. Run: pip install "psycopg[binary,pool]"'
             )
         if self.__class__._pool is not None:
-            # Acquire from pool
-            self._pg_conn = self.__class__._pool.getconn()
-            self._from_pool = True
+            self._acquire()
         else:
             if not db_url:
                 raise RuntimeError(
                     'DATABASE_URL is not set. This project now requires Postgres.'
                 )
             # autocommit off to mimic transaction behavior
-            self._pg_conn = psycopg.connect(db_url, row_factory=dict_row)
+            self._pg_conn = psycopg.connect(
+                db_url, row_factory=dict_row, application_name=application_name()
+            )
         self._connected = True
         return self
 
@@ -155,15 +303,16 @@ class DBManager:
 
         # Open new connection
         if self.__class__._pool is not None:
-            self._pg_conn = self.__class__._pool.getconn()
-            self._from_pool = True
+            self._acquire()
         else:
             db_url = os.getenv('DATABASE_URL')
             if not db_url:
                 raise RuntimeError(
                     'DATABASE_URL is not set. This project now requires Postgres.'
                 )
-            self._pg_conn = psycopg.connect(db_url, row_factory=dict_row)
+            self._pg_conn = psycopg.connect(
+                db_url, row_factory=dict_row, application_name=application_name()
+            )
 
     def _run_with_retry(self, fn: Callable[[], T]) -> T:
         '''Run DB exec, reconn on OperationalError/InterfaceError, and retry once'''
@@ -176,111 +325,245 @@ class DBManager:
                 f'Reconnecting and retrying once...'
             )
             self._reconnect()
+            self._retries += 1
             return fn()
         except Exception:
             logger.exception('Unexpected error during DB operation')
             raise
 
-    def _exec_pg(self, query: str, params: Iterable[Any] | None) -> None:
-        '''Execute a statement that does not return rows (INSERT, UPDATE, DELETE).'''
+    def _exec_pg(self, query: str, params: Iterable[Any] | None) -> int:
+        '''Execute a statement that does not return rows; returns rows affected.'''
         assert self._pg_conn is not None
         with self._pg_conn.cursor() as cur:
             cur.execute(query, tuple(params or ()))
+            return max(cur.rowcount, 0)
 
     def _select_pg(
-        self, query: str, params: Iterable[Any] | None
-    ) -> Tuple[List[dict[str, Any]], List[str]]:
+        self, query: str, params: Iterable[Any] | None, row_factory: Any = None
+    ) -> Tuple[List[Any], List[str]]:
         '''Execute a SELECT query and return (rows, column_names).'''
         assert self._pg_conn is not None
-        with self._pg_conn.cursor() as cur:
+        cursor_kwargs = {'row_factory': row_factory} if row_factory else {}
+        with self._pg_conn.cursor(**cursor_kwargs) as cur:
             cur.execute(query, tuple(params or ()))
-            rows: List[dict[str, Any]] = cur.fetchall()
+            rows: List[Any] = cur.fetchall()
             cols: List[str] = (
                 [d.name for d in cur.description] if cur.description else []
             )
             return rows, cols
 
-    @require_connection
-    def execute(self, query: str, params: Iterable[Any] | None = None) -> None:
-        '''Execute a single SQL statement.'''
+    def _observed(
+        self,
+        operation: str,
+        query: str,
+        params: Iterable[Any] | None,
+        fn: Callable[[], T],
+        count_rows: Callable[[T], int],
+        metadata: Optional[dict[str, Any]] = None,
+    ) -> T:
+        '''Run ``fn`` (with retry) inside a span, feeding the query stats.'''
+        fp = fingerprint(query)
         with trace_span(
-            'database.execute',
+            f'database.{operation}',
             {
-                'operation': 'execute',
+                'operation': operation,
                 'query_type': query.strip().split()[0].upper() if query else 'unknown',
+                'fingerprint': fp.id,
+                **(metadata or {}),
             },
         ):
+            if self._pool_wait is not None:
+                # Charged to the first statement run on the checked-out connection
+                add_span_metadata('pool_wait_ms', round(self._pool_wait * 1000, 2))
+                self._pool_wait = None
+            self._retries = 0
+            start = time.perf_counter()
             try:
-                self._run_with_retry(lambda: self._exec_pg(query, params))
-            except Exception as e:
-                logger.error(
-                    f'Postgres execute() error: {e}\nQuery: {query}\nParams: {params}'
+                result = self._run_with_retry(fn)
+            except Exception:
+                query_stats.record(
+                    fp, time.perf_counter() - start, retries=self._retries, error=True
                 )
                 raise
+            duration = time.perf_counter() - start
+            query_stats.record(
+                fp, duration, rows=count_rows(result), retries=self._retries
+            )
+
+        if query_stats.is_slow(duration):
+            plan = None
+            if query_stats.explain_slow and _is_explainable(query):
+                try:
+                    # A savepoint, so a failed EXPLAIN doesn't abort the
+                    # caller's transaction
+                    with self._pg_conn.transaction():
+                        plan = self.explain(query, params)
+                except Exception as e:  # never fail the caller over a plan
+                    logger.warning(f'EXPLAIN for slow query {fp.id} failed: {e}')
+            query_stats.record_slow(fp, query, params, duration, plan=plan)
+        return result
+
+    @require_connection
+    def explain(
+        self, query: str, params: Iterable[Any] | None = None, analyze: bool = False
+    ) -> list[str]:
+        '''Return the plan for ``query`` as text lines.
+
+        ``analyze=True`` executes the statement, so only use it for reads (or
+        inside a transaction you roll back).
+        '''
+        assert self._pg_conn is not None
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if analyze else 'EXPLAIN '
+        with self._pg_conn.cursor() as cur:
+            cur.execute(prefix + query, tuple(params or ()))
+            return [
+                next(iter(r.values())) if isinstance(r, dict) else r[0] for r in cur
+            ]
+
+    @require_connection
+    def execute(self, query: str, params: Iterable[Any] | None = None) -> None:
+        '''Execute a single SQL statement.'''
+        try:
+            self._observed(
+                'execute',
+                query,
+                params,
+                lambda: self._exec_pg(query, params),
+                count_rows=lambda n: n,
+            )
+        except Exception as e:
+            logger.error(
+                f'Postgres execute() error: {e}\nQuery: {query}\nParams: {params}'
+            )
+            raise
 
     @require_connection
     def executemany(self, query: str, param_list: Iterable[Sequence[Any]]) -> None:
         '''Execute a SQL statement against a sequence of parameter sets.'''
-        param_count = len(list(param_list)) if param_list else 0
-
-        with trace_span(
-            'database.executemany',
-            {
-                'operation': 'executemany',
-                'query_type': query.strip().split()[0].upper() if query else 'unknown',
-                'param_count': param_count,
-            },
-        ):
+        params = list(param_list) if param_list else []
 
-            def _do() -> None:
-                assert self._pg_conn is not None
-                with self._pg_conn.cursor() as cur:
-                    cur.executemany(query, list(param_list))
+        def _do() -> int:
+            assert self._pg_conn is not None
+            with self._pg_conn.cursor() as cur:
+                cur.executemany(query, params)
+                return max(cur.rowcount, 0)
 
-            try:
-                self._run_with_retry(_do)
-            except Exception as e:
-                logger.error(f'Postgres executemany() error: {e}\nQuery: {query}')
-                raise
+        try:
+            self._observed(
+                'executemany',
+                query,
+                None,
+                _do,
+                count_rows=lambda n: n,
+                metadata={'param_count': len(params)},
+            )
+        except Exception as e:
+            logger.error(f'Postgres executemany() error: {e}\nQuery: {query}')
+            raise
 
     @require_connection
     def fetchall(
-        self, query: str, params: Iterable[Any] | None = None
-    ) -> List[dict[str, Any]]:
-        '''Return all rows as a list of dictionaries.'''
-        with trace_span(
-            'database.fetchall',
-            {
-                'operation': 'fetchall',
-                'query_type': query.strip().split()[0].upper() if query else 'unknown',
-            },
-        ):
-            try:
-                rows, _ = self._run_with_retry(lambda: self._select_pg(query, params))
-                return rows
-            except Exception as e:
-                logger.error(
-                    f'Postgres fetchall() error: {e}\nQuery: {query}\nParams: {params}'
-                )
-                raise
+        self, query: str, params: Iterable[Any] | None = None, row_factory: Any = None
+    ) -> List[Any]:
+        '''Return all rows as a list of dictionaries (or ``row_factory`` rows).'''
+        try:
+            rows, _ = self._observed(
+                'fetchall',
+                query,
+                params,
+                lambda: self._select_pg(query, params, row_factory),
+                count_rows=lambda result: len(result[0]),
+            )
+            return rows
+        except Exception as e:
+            logger.error(
+                f'Postgres fetchall() error: {e}\nQuery: {query}\nParams: {params}'
+            )
+            raise
 
     @require_connection
     def fetchone(
-        self, query: str, params: Iterable[Any] | None = None
-    ) -> Optional[dict[str, Any]]:
-        '''Return a single row as a dictionary, or None if no result.'''
-        with trace_span(
-            'database.fetchone',
-            {
-                'operation': 'fetchone',
-                'query_type': query.strip().split()[0].upper() if query else 'unknown',
-            },
-        ):
+        self, query: str, params: Iterable[Any] | None = None, row_factory: Any = None
+    ) -> Optional[Any]:
+        '''Return a single row as a dictionary (or ``row_factory`` row), or None.'''
+        try:
+            rows, _ = self._observed(
+                'fetchone',
+                query,
+                params,
+                lambda: self._select_pg(query, params, row_factory),
+                count_rows=lambda result: len(result[0]),
+            )
+            return rows[0] if rows else None
+        except Exception as e:
+            logger.error(
+                f'Postgres fetchone() error: {e}\nQuery: {query}\nParams: {params}'
+            )
+            raise
+
+    @require_connection
+    def stream(
+        self,
+        query: str,
+        params: Iterable[Any] | None = None,
+        batch_size: int = 1000,
+        *,
+        batches: bool = False,
+        row_factory: Any = None,
+    ) -> Iterator[Any]:
+        '''Lazily yield rows (or lists of rows) through a server-side cursor.
+
+        Rows are fetched from Postgres ``batch_size`` at a time, so the full result
+        is never materialized in memory. The cursor lives inside the current
+        transaction; closing the generator early closes the cursor, and leaving the
+        ``with DBManager()`` block releases the connection as usual.
+        '''
+        if batch_size < 1:
+            raise ValueError('batch_size must be a positive integer')
+        assert self._pg_conn is not None
+
+        cursor_name = f'stream_{os.getpid()}_{next(_cursor_ids)}'
+        fp = fingerprint(query)
+        cursor_kwargs = {'row_factory': row_factory} if row_factory else {}
+        cur = self._pg_conn.cursor(name=cursor_name, **cursor_kwargs)
+        try:
+            with trace_span(
+                'database.stream',
+                {
+                    'operation': 'stream',
+                    'query_type': (
+                        query.strip().split()[0].upper() if query else 'unknown'
+                    ),
+                    'batch_size': batch_size,
+                    'fingerprint': fp.id,
+                },
+            ):
+                start = time.perf_counter()
+                try:
+                    # Not retried: the named cursor is bound to this connection
+                    # and a dropped stream cannot be resumed transparently.
+                    cur.itersize = batch_size
+                    cur.execute(query, tuple(params or ()))
+                    # Rows are fetched lazily, so only opening the cursor counts
+                    query_stats.record(fp, time.perf_counter() - start)
+                except Exception as e:
+                    query_stats.record(fp, time.perf_counter() - start, error=True)
+                    logger.error(
+                        f'Postgres stream() error: {e}\nQuery: {query}\n'
+                        f'Params: {params}'
+                    )
+                    raise
+
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                if batches:
+                    yield rows
+                else:
+                    yield from rows
+        finally:
             try:
-                rows, _ = self._run_with_retry(lambda: self._select_pg(query, params))
-                return rows[0] if rows else None
-            except Exception as e:
-                logger.error(
-                    f'Postgres fetchone() error: {e}\nQuery: {query}\nParams: {params}'
-                )
-                raise
+                cur.close()
+            except Exception as e:  # best-effort close, e.g. broken connection
+                logger.warning(f'Error while closing stream cursor: {e}')
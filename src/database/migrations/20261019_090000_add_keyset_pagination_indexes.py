@@ -0,0 +1,41 @@
+from src.database.db_manager import DBManager
+import argparse
+
+
+def up(db_manager: DBManager):
+    # Composite indexes so keyset pages of a user's history seek instead of
+    # scanning: recent_for_user orders by (sort column, id) within one user.
+    db_manager.execute('''
+        CREATE INDEX IF NOT EXISTS idx_activity_records_user_occurred_id
+        ON activity_records(user_id, date_occurred DESC, id DESC)
+        ''')
+    db_manager.execute('''
+        CREATE INDEX IF NOT EXISTS idx_activity_records_user_created_id
+        ON activity_records(user_id, created_at DESC, id DESC)
+        ''')
+
+
+def down(db_manager: DBManager):
+    db_manager.execute('DROP INDEX IF EXISTS idx_activity_records_user_occurred_id')
+    db_manager.execute('DROP INDEX IF EXISTS idx_activity_records_user_created_id')
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_090000_add_keyset_pagination_indexes.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
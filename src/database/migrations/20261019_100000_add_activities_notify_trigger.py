@@ -0,0 +1,56 @@
+from src.database.db_manager import DBManager
+import argparse
+
+
+def up(db_manager: DBManager):
+    # Broadcast every change to activities so each process's ActivityCatalog
+    # reloads. Statement-level: a bulk edit sends one NOTIFY, not one per row.
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION notify_activities_changed_fn()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM pg_notify('activities_changed', TG_OP);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        ''')
+    db_manager.execute('''
+        DO $$ BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger WHERE tgname = 'trg_notify_activities_changed'
+            ) THEN
+                CREATE TRIGGER trg_notify_activities_changed
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON activities
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION notify_activities_changed_fn();
+            END IF;
+        END $$;
+        ''')
+
+
+def down(db_manager: DBManager):
+    db_manager.execute(
+        'DROP TRIGGER IF EXISTS trg_notify_activities_changed ON activities'
+    )
+    db_manager.execute('DROP FUNCTION IF EXISTS notify_activities_changed_fn()')
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_100000_add_activities_notify_trigger.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+from src.database.db_manager import DBManager
+import argparse
+
+
+def up(db_manager: DBManager):
+    # The quest sweeper bulk-deletes by deadline and finds stale rolls by
+    # date_rolled; without these both are sequential scans.
+    db_manager.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_quests_deadline
+        ON user_quests(deadline)
+        ''')
+    db_manager.execute('''
+        CREATE INDEX IF NOT EXISTS idx_quest_rolls_date_rolled
+        ON quest_rolls(date_rolled)
+        ''')
+
+
+def down(db_manager: DBManager):
+    db_manager.execute('DROP INDEX IF EXISTS idx_user_quests_deadline')
+    db_manager.execute('DROP INDEX IF EXISTS idx_quest_rolls_date_rolled')
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_110000_add_quest_sweeper_indexes.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+from src.database.db_manager import DBManager
+import argparse
+
+
+def up(db_manager: DBManager):
+    # Keep only each user's latest quest before enforcing one row per user.
+    # Expired rows count too; Quest.accept clears them in the same statement.
+    db_manager.execute('''
+        DELETE FROM user_quests uq
+        USING user_quests newer
+        WHERE newer.user_id = uq.user_id
+          AND (newer.deadline, newer.id) > (uq.deadline, uq.id)
+        ''')
+    db_manager.execute('''
+        DO $$ BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint WHERE conname = 'uq_user_quests_user_id'
+            ) THEN
+                ALTER TABLE user_quests
+                ADD CONSTRAINT uq_user_quests_user_id UNIQUE (user_id);
+            END IF;
+        END $$;
+        ''')
+    # The unique constraint's index replaces the plain user_id index
+    db_manager.execute('DROP INDEX IF EXISTS idx_user_quests_user_id')
+
+
+def down(db_manager: DBManager):
+    db_manager.execute(
+        'CREATE INDEX IF NOT EXISTS idx_user_quests_user_id ON user_quests(user_id)'
+    )
+    db_manager.execute(
+        'ALTER TABLE user_quests DROP CONSTRAINT IF EXISTS uq_user_quests_user_id'
+    )
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_120000_enforce_one_quest_per_user.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
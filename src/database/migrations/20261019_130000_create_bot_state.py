@@ -0,0 +1,39 @@
+from src.database.db_manager import DBManager
+import argparse
+
+
+def up(db_manager: DBManager):
+    # Small key/value store for process state that must survive restarts,
+    # e.g. the hash of the last application command tree synced to Discord.
+    db_manager.execute('''
+        CREATE TABLE IF NOT EXISTS bot_state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+        ''')
+
+
+def down(db_manager: DBManager):
+    db_manager.execute('DROP TABLE IF EXISTS bot_state')
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_130000_create_bot_state.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
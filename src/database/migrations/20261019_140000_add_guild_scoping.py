@@ -0,0 +1,128 @@
+from src.database.db_manager import DBManager
+import argparse
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def up(db_manager: DBManager):
+    # Scope records and quests to the guild they were made in, and track which
+    # users belong to which guild so leaderboards can be per guild.
+    db_manager.execute(
+        'ALTER TABLE activity_records ADD COLUMN IF NOT EXISTS guild_id BIGINT NULL'
+    )
+    db_manager.execute(
+        'ALTER TABLE user_quests ADD COLUMN IF NOT EXISTS guild_id BIGINT NULL'
+    )
+    db_manager.execute('''
+        CREATE TABLE IF NOT EXISTS guild_members (
+            guild_id BIGINT NOT NULL,
+            user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            joined_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (guild_id, user_id)
+        )
+        ''')
+    # guild_id leads so one guild's rows are a contiguous index range; a large
+    # guild's history never widens a small guild's scans
+    db_manager.execute('''
+        CREATE INDEX IF NOT EXISTS idx_guild_members_user_id
+        ON guild_members(user_id)
+        ''')
+    db_manager.execute('''
+        CREATE INDEX IF NOT EXISTS idx_activity_records_guild_occurred
+        ON activity_records(guild_id, date_occurred, id)
+        ''')
+    db_manager.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_quests_guild_user
+        ON user_quests(guild_id, user_id)
+        ''')
+
+    # Recording in a guild makes the user a member of it
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION add_guild_member_fn()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF NEW.guild_id IS NOT NULL THEN
+                INSERT INTO guild_members (guild_id, user_id)
+                VALUES (NEW.guild_id, NEW.user_id)
+                ON CONFLICT DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        ''')
+    db_manager.execute('''
+        DO $$ BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger WHERE tgname = 'trg_add_guild_member'
+            ) THEN
+                CREATE TRIGGER trg_add_guild_member
+                AFTER INSERT ON activity_records
+                FOR EACH ROW
+                EXECUTE FUNCTION add_guild_member_fn();
+            END IF;
+        END $$;
+        ''')
+
+    # Existing data all comes from the single guild the bot used to serve
+    guild_id = os.getenv('GUILD_ID')
+    if guild_id:
+        db_manager.execute(
+            'UPDATE activity_records SET guild_id = %s WHERE guild_id IS NULL',
+            (int(guild_id),),
+        )
+        db_manager.execute(
+            'UPDATE user_quests SET guild_id = %s WHERE guild_id IS NULL',
+            (int(guild_id),),
+        )
+        db_manager.execute(
+            'INSERT INTO guild_members (guild_id, user_id) '
+            'SELECT %s, id FROM users ON CONFLICT DO NOTHING',
+            (int(guild_id),),
+        )
+        return
+    unattributed = db_manager.fetchone(
+        'SELECT EXISTS (SELECT 1 FROM activity_records WHERE guild_id IS NULL) '
+        'AS found'
+    )
+    if unattributed and unattributed['found']:
+        # Guild leaderboards rank by a guild's records, so these never count
+        logger.warning(
+            'GUILD_ID is not set: existing activity records and quests were '
+            'not attributed to a guild and will not count towards any guild '
+            'leaderboard. Set GUILD_ID and re-run this migration to backfill.'
+        )
+
+
+def down(db_manager: DBManager):
+    db_manager.execute(
+        'DROP TRIGGER IF EXISTS trg_add_guild_member ON activity_records'
+    )
+    db_manager.execute('DROP FUNCTION IF EXISTS add_guild_member_fn()')
+    db_manager.execute('DROP TABLE IF EXISTS guild_members')
+    db_manager.execute('DROP INDEX IF EXISTS idx_activity_records_guild_occurred')
+    db_manager.execute('DROP INDEX IF EXISTS idx_user_quests_guild_user')
+    db_manager.execute('ALTER TABLE activity_records DROP COLUMN IF EXISTS guild_id')
+    db_manager.execute('ALTER TABLE user_quests DROP COLUMN IF EXISTS guild_id')
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_140000_add_guild_scoping.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+from src.database.db_manager import DBManager
+import argparse
+
+
+def up(db_manager: DBManager):
+    # Tell every bot process whose recent-activity cache holds the member to
+    # drop it. Identical payloads are folded per transaction, so a bulk change
+    # sends one NOTIFY per member.
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION notify_activity_records_changed_fn()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM pg_notify('activity_records_changed', OLD.user_id::text);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM pg_notify('activity_records_changed', NEW.user_id::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        ''')
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION notify_activity_records_truncated_fn()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM pg_notify('activity_records_changed', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        ''')
+    db_manager.execute('''
+        DO $$ BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger
+                WHERE tgname = 'trg_notify_activity_records_changed'
+            ) THEN
+                CREATE TRIGGER trg_notify_activity_records_changed
+                AFTER INSERT OR UPDATE OF user_id, activity_id, date_occurred
+                    OR DELETE ON activity_records
+                FOR EACH ROW
+                EXECUTE FUNCTION notify_activity_records_changed_fn();
+            END IF;
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger
+                WHERE tgname = 'trg_notify_activity_records_truncated'
+            ) THEN
+                CREATE TRIGGER trg_notify_activity_records_truncated
+                AFTER TRUNCATE ON activity_records
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION notify_activity_records_truncated_fn();
+            END IF;
+        END $$;
+        ''')
+
+
+def down(db_manager: DBManager):
+    db_manager.execute(
+        'DROP TRIGGER IF EXISTS trg_notify_activity_records_changed '
+        'ON activity_records'
+    )
+    db_manager.execute(
+        'DROP TRIGGER IF EXISTS trg_notify_activity_records_truncated '
+        'ON activity_records'
+    )
+    db_manager.execute('DROP FUNCTION IF EXISTS notify_activity_records_changed_fn()')
+    db_manager.execute('DROP FUNCTION IF EXISTS notify_activity_records_truncated_fn()')
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_150000_add_activity_records_notify_trigger.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+from src.database.db_manager import DBManager
+import argparse
+
+from src.database.partitions import (
+    create_default_partition,
+    create_partition,
+    ensure_partitions,
+)
+
+COLUMNS = (
+    'id, user_id, activity_id, note, date_occurred, created_at, updated_at, '
+    'message_id, guild_id'
+)
+
+
+def _is_partitioned(db_manager: DBManager) -> bool:
+    row = db_manager.fetchone(
+        "SELECT relkind FROM pg_class WHERE oid = to_regclass('activity_records')"
+    )
+    return bool(row) and row['relkind'] == 'p'
+
+
+def _detach_definitions(db_manager: DBManager, table: str) -> tuple[list, list]:
+    '''Drop the table's own indexes and triggers and return their definitions.
+
+    The definitions name ``table``, so replaying them after the table is
+    recreated under the same name rebuilds the same indexes and triggers.
+    '''
+    indexes = db_manager.fetchall(
+        'SELECT i.relname AS name, pg_get_indexdef(i.oid) AS definition '
+        'FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid '
+        'WHERE x.indrelid = %s::regclass AND NOT EXISTS ('
+        'SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)',
+        (table,),
+    )
+    triggers = db_manager.fetchall(
+        'SELECT tgname AS name, pg_get_triggerdef(oid) AS definition '
+        'FROM pg_trigger WHERE tgrelid = %s::regclass AND NOT tgisinternal',
+        (table,),
+    )
+    for index in indexes:
+        db_manager.execute(f'DROP INDEX {index["name"]}')
+    for trigger in triggers:
+        db_manager.execute(f'DROP TRIGGER {trigger["name"]} ON {table}')
+    return indexes, triggers
+
+
+def _restore_definitions(db_manager: DBManager, indexes: list, triggers: list):
+    for row in [*indexes, *triggers]:
+        db_manager.execute(row['definition'])
+
+
+def up(db_manager: DBManager):
+    if _is_partitioned(db_manager):
+        return
+
+    # Month partitions on date_occurred. The primary key must contain the
+    # partition key, and identity columns cannot be partitioned on every
+    # supported Postgres, so ids come from a plain sequence.
+    # Only months that hold data; a stray far-off date gets one partition
+    # rather than every month in between
+    months = db_manager.fetchall(
+        "SELECT DISTINCT date_trunc('month', date_occurred)::date AS month "
+        'FROM activity_records WHERE date_occurred IS NOT NULL'
+    )
+    indexes, triggers = _detach_definitions(db_manager, 'activity_records')
+    db_manager.execute('ALTER TABLE activity_records RENAME TO activity_records_old')
+    db_manager.execute(
+        'ALTER TABLE activity_records_old '
+        'RENAME CONSTRAINT activity_records_pkey TO activity_records_old_pkey'
+    )
+    # Frees the activity_records_id_seq name for the new sequence
+    db_manager.execute(
+        'ALTER TABLE activity_records_old ALTER COLUMN id DROP IDENTITY IF EXISTS'
+    )
+    db_manager.execute('CREATE SEQUENCE activity_records_id_seq AS INTEGER')
+    db_manager.execute('''
+        CREATE TABLE activity_records (
+            id INTEGER NOT NULL DEFAULT nextval('activity_records_id_seq'),
+            user_id BIGINT NOT NULL,
+            activity_id INTEGER NOT NULL,
+            note TEXT NULL,
+            date_occurred DATE NOT NULL DEFAULT CURRENT_DATE,
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            updated_at TIMESTAMPTZ DEFAULT NOW(),
+            message_id BIGINT,
+            guild_id BIGINT NULL,
+            CONSTRAINT activity_records_pkey PRIMARY KEY (id, date_occurred),
+            CONSTRAINT fk_ar_user FOREIGN KEY (user_id)
+                REFERENCES users(id) ON DELETE CASCADE,
+            CONSTRAINT fk_ar_activity FOREIGN KEY (activity_id)
+                REFERENCES activities(id)
+        ) PARTITION BY RANGE (date_occurred)
+        ''')
+    db_manager.execute(
+        'ALTER SEQUENCE activity_records_id_seq OWNED BY activity_records.id'
+    )
+    create_default_partition(db_manager)
+    for row in months:
+        create_partition(db_manager, row['month'])
+    ensure_partitions(db_manager)
+
+    # Triggers are replayed only after the copy, so moving rows does not
+    # award their XP a second time
+    db_manager.execute(f'''
+        INSERT INTO activity_records ({COLUMNS})
+        SELECT id, user_id, activity_id, note,
+               COALESCE(date_occurred, created_at::date, CURRENT_DATE),
+               created_at, updated_at, message_id, guild_id
+        FROM activity_records_old
+        ''')
+    db_manager.execute(
+        "SELECT setval('activity_records_id_seq', "
+        'COALESCE((SELECT MAX(id) FROM activity_records), 0) + 1, false)'
+    )
+    db_manager.execute('DROP TABLE activity_records_old')
+    # Indexes on the parent cascade to every current and future partition
+    _restore_definitions(db_manager, indexes, triggers)
+
+    # Per user, activity and month summary of archived (detached) partitions
+    db_manager.execute('''
+        CREATE TABLE IF NOT EXISTS activity_record_rollups (
+            month DATE NOT NULL,
+            user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            activity_id INTEGER NOT NULL REFERENCES activities(id),
+            records INTEGER NOT NULL,
+            first_occurred DATE NOT NULL,
+            last_occurred DATE NOT NULL,
+            PRIMARY KEY (user_id, month, activity_id)
+        )
+        ''')
+    # Which activities each user has ever recorded, archived months included
+    db_manager.execute('''
+        CREATE OR REPLACE VIEW activity_history AS
+        SELECT user_id, activity_id FROM activity_records
+        UNION ALL
+        SELECT user_id, activity_id FROM activity_record_rollups
+        ''')
+    db_manager.execute('ANALYZE activity_records')
+
+
+def down(db_manager: DBManager):
+    # Depends on activity_records, which is about to be replaced
+    db_manager.execute('DROP VIEW IF EXISTS activity_history')
+    if _is_partitioned(db_manager):
+        indexes, triggers = _detach_definitions(db_manager, 'activity_records')
+        db_manager.execute(
+            'ALTER TABLE activity_records RENAME TO activity_records_partitioned'
+        )
+        db_manager.execute(
+            'ALTER TABLE activity_records_partitioned RENAME CONSTRAINT '
+            'activity_records_pkey TO activity_records_partitioned_pkey'
+        )
+        db_manager.execute(
+            'ALTER SEQUENCE activity_records_id_seq '
+            'RENAME TO activity_records_partitioned_id_seq'
+        )
+        db_manager.execute('''
+            CREATE TABLE activity_records (
+                id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+                user_id BIGINT NOT NULL,
+                activity_id INTEGER NOT NULL,
+                note TEXT NULL,
+                date_occurred DATE DEFAULT CURRENT_DATE,
+                created_at TIMESTAMPTZ DEFAULT NOW(),
+                updated_at TIMESTAMPTZ DEFAULT NOW(),
+                message_id BIGINT,
+                guild_id BIGINT NULL,
+                CONSTRAINT fk_ar_user FOREIGN KEY (user_id)
+                    REFERENCES users(id) ON DELETE CASCADE,
+                CONSTRAINT fk_ar_activity FOREIGN KEY (activity_id)
+                    REFERENCES activities(id)
+            )
+            ''')
+        db_manager.execute(f'''
+            INSERT INTO activity_records ({COLUMNS})
+            SELECT {COLUMNS} FROM activity_records_partitioned
+            ''')
+        db_manager.execute(
+            "SELECT setval(pg_get_serial_sequence('activity_records', 'id'), "
+            'COALESCE((SELECT MAX(id) FROM activity_records), 0) + 1, false)'
+        )
+        # Drops the partitions and the sequence with it
+        db_manager.execute('DROP TABLE activity_records_partitioned')
+        _restore_definitions(db_manager, indexes, triggers)
+    # Detached (archived) months are left as standalone tables
+    db_manager.execute('DROP TABLE IF EXISTS activity_record_rollups')
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_160000_partition_activity_records.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+from src.database.db_manager import DBManager
+import argparse
+
+
+def up(db_manager: DBManager):
+    # One bit per day since 1970-01-01 for each user: "occurred" for days with
+    # a record dated on them, "created" for (UTC) days a record was made on.
+    # Bit n is bit n % 8 of byte n / 8, least significant first, which is how
+    # get_bit/set_bit number bytea bits (see src/utils/day_bitmap.py).
+    db_manager.execute('''
+        CREATE TABLE IF NOT EXISTS user_activity_days (
+            user_id BIGINT PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+            occurred BYTEA NOT NULL DEFAULT ''::bytea,
+            created BYTEA NOT NULL DEFAULT ''::bytea
+        )
+        ''')
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION day_bitmap_set(bm BYTEA, day DATE, value INTEGER)
+        RETURNS BYTEA AS $$
+        DECLARE
+            n INTEGER := day - DATE '1970-01-01';
+        BEGIN
+            IF n IS NULL OR n < 0 THEN
+                RETURN bm;
+            END IF;
+            IF length(bm) * 8 <= n THEN
+                IF value = 0 THEN
+                    RETURN bm;
+                END IF;
+                bm := bm || decode(repeat('00', n / 8 + 1 - length(bm)), 'hex');
+            END IF;
+            RETURN set_bit(bm, n, value);
+        END;
+        $$ LANGUAGE plpgsql IMMUTABLE;
+        ''')
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION day_bitmap_add(bm BYTEA, day DATE)
+        RETURNS BYTEA AS $$
+            SELECT day_bitmap_set(bm, day, 1)
+        $$ LANGUAGE sql IMMUTABLE;
+        ''')
+    db_manager.execute('DROP AGGREGATE IF EXISTS day_bitmap_agg(DATE)')
+    db_manager.execute('''
+        CREATE AGGREGATE day_bitmap_agg(DATE) (
+            SFUNC = day_bitmap_add,
+            STYPE = BYTEA,
+            INITCOND = ''
+        )
+        ''')
+
+    # Clearing a day needs to know no other record still covers it; both
+    # lookups are index seeks within one user (and one partition for dates)
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION sync_user_activity_days_fn()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            v_created DATE;
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                v_created := (OLD.created_at AT TIME ZONE 'UTC')::date;
+                UPDATE user_activity_days SET
+                    occurred = CASE WHEN EXISTS (
+                        SELECT 1 FROM activity_records
+                        WHERE user_id = OLD.user_id
+                          AND date_occurred = OLD.date_occurred
+                    ) THEN occurred
+                    ELSE day_bitmap_set(occurred, OLD.date_occurred, 0) END,
+                    created = CASE WHEN EXISTS (
+                        SELECT 1 FROM activity_records
+                        WHERE user_id = OLD.user_id
+                          AND created_at >= v_created::timestamp AT TIME ZONE 'UTC'
+                          AND created_at < (v_created + 1)::timestamp
+                              AT TIME ZONE 'UTC'
+                    ) THEN created
+                    ELSE day_bitmap_set(created, v_created, 0) END
+                WHERE user_id = OLD.user_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                v_created := (NEW.created_at AT TIME ZONE 'UTC')::date;
+                INSERT INTO user_activity_days (user_id, occurred, created)
+                VALUES (
+                    NEW.user_id,
+                    day_bitmap_set(''::bytea, NEW.date_occurred, 1),
+                    day_bitmap_set(''::bytea, v_created, 1)
+                )
+                ON CONFLICT (user_id) DO UPDATE SET
+                    occurred = day_bitmap_set(
+                        user_activity_days.occurred, NEW.date_occurred, 1
+                    ),
+                    created = day_bitmap_set(
+                        user_activity_days.created, v_created, 1
+                    );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        ''')
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION clear_user_activity_days_fn()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            DELETE FROM user_activity_days;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        ''')
+    db_manager.execute('''
+        DO $$ BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger WHERE tgname = 'trg_sync_user_activity_days'
+            ) THEN
+                CREATE TRIGGER trg_sync_user_activity_days
+                AFTER INSERT OR UPDATE OF user_id, date_occurred, created_at
+                    OR DELETE ON activity_records
+                FOR EACH ROW
+                EXECUTE FUNCTION sync_user_activity_days_fn();
+            END IF;
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger WHERE tgname = 'trg_clear_user_activity_days'
+            ) THEN
+                CREATE TRIGGER trg_clear_user_activity_days
+                AFTER TRUNCATE ON activity_records
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION clear_user_activity_days_fn();
+            END IF;
+        END $$;
+        ''')
+
+    db_manager.execute('''
+        INSERT INTO user_activity_days (user_id, occurred, created)
+        SELECT user_id,
+               day_bitmap_agg(DISTINCT date_occurred),
+               day_bitmap_agg(DISTINCT (created_at AT TIME ZONE 'UTC')::date)
+        FROM activity_records
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            occurred = EXCLUDED.occurred,
+            created = EXCLUDED.created
+        ''')
+
+
+def down(db_manager: DBManager):
+    db_manager.execute(
+        'DROP TRIGGER IF EXISTS trg_sync_user_activity_days ON activity_records'
+    )
+    db_manager.execute(
+        'DROP TRIGGER IF EXISTS trg_clear_user_activity_days ON activity_records'
+    )
+    db_manager.execute('DROP FUNCTION IF EXISTS sync_user_activity_days_fn()')
+    db_manager.execute('DROP FUNCTION IF EXISTS clear_user_activity_days_fn()')
+    db_manager.execute('DROP AGGREGATE IF EXISTS day_bitmap_agg(DATE)')
+    db_manager.execute('DROP FUNCTION IF EXISTS day_bitmap_add(BYTEA, DATE)')
+    db_manager.execute('DROP FUNCTION IF EXISTS day_bitmap_set(BYTEA, DATE, INTEGER)')
+    db_manager.execute('DROP TABLE IF EXISTS user_activity_days')
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_170000_create_user_activity_days.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
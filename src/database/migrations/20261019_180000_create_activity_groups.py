@@ -0,0 +1,234 @@
+from src.database.db_manager import DBManager
+import argparse
+
+
+def up(db_manager: DBManager):
+    # Activities that may only be recorded once per period between them,
+    # e.g. one "Daily Steps" tier per day. Members are the activities in
+    # ``category`` whose name matches any of the LIKE patterns.
+    db_manager.execute('''
+        CREATE TABLE IF NOT EXISTS activity_groups (
+            key TEXT PRIMARY KEY,
+            period TEXT NOT NULL CHECK (period IN ('day', 'week')),
+            label TEXT NOT NULL,
+            category TEXT NOT NULL,
+            name_patterns TEXT[] NOT NULL
+        )
+        ''')
+    db_manager.execute('''
+        INSERT INTO activity_groups (key, period, label, category, name_patterns)
+        VALUES
+            ('steps_daily', 'day', 'Daily Steps', 'Steps',
+             ARRAY['Daily Steps%']),
+            ('steps_weekly', 'week', 'Weekly Steps', 'Steps',
+             ARRAY['Weekly Steps%']),
+            ('recovery_weekly_sleep', 'week', 'weekly sleep', 'Recovery',
+             ARRAY['A week of good sleep (7+ hours/day avg)',
+                   'A week of great sleep (8+ hours/day avg)']),
+            ('diet_weekly_no_alcohol', 'week', 'Week of no Alcohol', 'Diet',
+             ARRAY['Week of no Alcohol'])
+        ON CONFLICT (key) DO NOTHING
+        ''')
+    db_manager.execute('''
+        CREATE TABLE IF NOT EXISTS activity_group_members (
+            activity_id INTEGER PRIMARY KEY
+                REFERENCES activities(id) ON DELETE CASCADE,
+            group_key TEXT NOT NULL
+                REFERENCES activity_groups(key) ON DELETE CASCADE
+        )
+        ''')
+
+    # Both tables are a few hundred rows at most: rebuild the membership
+    # whenever activities or group definitions change
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION refresh_activity_group_members_fn()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            DELETE FROM activity_group_members;
+            INSERT INTO activity_group_members (activity_id, group_key)
+            SELECT DISTINCT ON (a.id) a.id, g.key
+            FROM activities a
+            JOIN activity_groups g
+              ON g.category = a.category AND a.name LIKE ANY (g.name_patterns)
+            ORDER BY a.id, g.key;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        ''')
+    db_manager.execute('''
+        DO $$ BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger
+                WHERE tgname = 'trg_activities_refresh_group_members'
+            ) THEN
+                CREATE TRIGGER trg_activities_refresh_group_members
+                AFTER INSERT OR UPDATE OF name, category ON activities
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION refresh_activity_group_members_fn();
+            END IF;
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger
+                WHERE tgname = 'trg_activity_groups_refresh_members'
+            ) THEN
+                CREATE TRIGGER trg_activity_groups_refresh_members
+                AFTER INSERT OR UPDATE OR DELETE ON activity_groups
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION refresh_activity_group_members_fn();
+            END IF;
+        END $$;
+        ''')
+
+    # One row per (user, group, period) a record occupies. The primary key is
+    # what makes a second record in the same group and period fail: a unique
+    # index on activity_records can't see group membership, and a week may
+    # span two monthly partitions.
+    db_manager.execute('''
+        CREATE TABLE IF NOT EXISTS activity_group_claims (
+            user_id BIGINT NOT NULL,
+            group_key TEXT NOT NULL
+                REFERENCES activity_groups(key) ON DELETE CASCADE,
+            period_start DATE NOT NULL,
+            record_id INTEGER NOT NULL,
+            PRIMARY KEY (user_id, group_key, period_start)
+        )
+        ''')
+    db_manager.execute('''
+        CREATE INDEX IF NOT EXISTS idx_activity_group_claims_record
+        ON activity_group_claims (record_id)
+        ''')
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION activity_group_period_start(
+            period TEXT, day DATE
+        ) RETURNS DATE AS $$
+            SELECT CASE period
+                WHEN 'week' THEN date_trunc('week', day)::date
+                ELSE day
+            END
+        $$ LANGUAGE sql IMMUTABLE;
+        ''')
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION sync_activity_group_claims_fn()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM activity_group_claims WHERE record_id = OLD.id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                -- A taken period raises unique_violation and aborts the write
+                INSERT INTO activity_group_claims
+                    (user_id, group_key, period_start, record_id)
+                SELECT NEW.user_id, g.key,
+                       activity_group_period_start(g.period, NEW.date_occurred),
+                       NEW.id
+                FROM activity_group_members m
+                JOIN activity_groups g ON g.key = m.group_key
+                WHERE m.activity_id = NEW.activity_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        ''')
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION clear_activity_group_claims_fn()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            DELETE FROM activity_group_claims;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        ''')
+    # Created on the partitioned parent, so every partition inherits them
+    db_manager.execute('''
+        DO $$ BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger WHERE tgname = 'trg_sync_activity_group_claims'
+            ) THEN
+                CREATE TRIGGER trg_sync_activity_group_claims
+                AFTER INSERT OR UPDATE OF user_id, activity_id, date_occurred
+                    OR DELETE ON activity_records
+                FOR EACH ROW
+                EXECUTE FUNCTION sync_activity_group_claims_fn();
+            END IF;
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger
+                WHERE tgname = 'trg_clear_activity_group_claims'
+            ) THEN
+                CREATE TRIGGER trg_clear_activity_group_claims
+                AFTER TRUNCATE ON activity_records
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION clear_activity_group_claims_fn();
+            END IF;
+        END $$;
+        ''')
+
+    db_manager.execute('''
+        INSERT INTO activity_group_members (activity_id, group_key)
+        SELECT DISTINCT ON (a.id) a.id, g.key
+        FROM activities a
+        JOIN activity_groups g
+          ON g.category = a.category AND a.name LIKE ANY (g.name_patterns)
+        ORDER BY a.id, g.key
+        ON CONFLICT (activity_id) DO NOTHING
+        ''')
+    # Existing duplicates predate the checks; the earliest record keeps the
+    # claim and the others are left alone
+    db_manager.execute('''
+        INSERT INTO activity_group_claims
+            (user_id, group_key, period_start, record_id)
+        SELECT DISTINCT ON (ar.user_id, g.key, period_start)
+               ar.user_id, g.key,
+               activity_group_period_start(g.period, ar.date_occurred)
+                   AS period_start,
+               ar.id
+        FROM activity_records ar
+        JOIN activity_group_members m ON m.activity_id = ar.activity_id
+        JOIN activity_groups g ON g.key = m.group_key
+        ORDER BY ar.user_id, g.key, period_start, ar.id
+        ON CONFLICT DO NOTHING
+        ''')
+
+
+def down(db_manager: DBManager):
+    db_manager.execute(
+        'DROP TRIGGER IF EXISTS trg_sync_activity_group_claims ON activity_records'
+    )
+    db_manager.execute(
+        'DROP TRIGGER IF EXISTS trg_clear_activity_group_claims ON activity_records'
+    )
+    db_manager.execute(
+        'DROP TRIGGER IF EXISTS trg_activities_refresh_group_members ON activities'
+    )
+    db_manager.execute(
+        'DROP TRIGGER IF EXISTS trg_activity_groups_refresh_members '
+        'ON activity_groups'
+    )
+    db_manager.execute('DROP FUNCTION IF EXISTS sync_activity_group_claims_fn()')
+    db_manager.execute('DROP FUNCTION IF EXISTS clear_activity_group_claims_fn()')
+    db_manager.execute('DROP FUNCTION IF EXISTS refresh_activity_group_members_fn()')
+    db_manager.execute(
+        'DROP FUNCTION IF EXISTS activity_group_period_start(TEXT, DATE)'
+    )
+    db_manager.execute('DROP TABLE IF EXISTS activity_group_claims')
+    db_manager.execute('DROP TABLE IF EXISTS activity_group_members')
+    db_manager.execute('DROP TABLE IF EXISTS activity_groups')
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_180000_create_activity_groups.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
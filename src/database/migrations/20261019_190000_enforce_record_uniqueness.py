@@ -0,0 +1,76 @@
+from src.database.db_manager import DBManager
+import argparse
+
+
+def up(db_manager: DBManager):
+    # Double-clicks and retries could record the same activity twice for a
+    # day. Keep the earliest record; deleting the rest runs the usual
+    # triggers, so the XP they awarded is revoked.
+    db_manager.execute('''
+        DELETE FROM activity_records ar
+        USING (
+            SELECT id, date_occurred FROM (
+                SELECT id, date_occurred,
+                       row_number() OVER (
+                           PARTITION BY user_id, activity_id, date_occurred
+                           ORDER BY id
+                       ) AS n
+                FROM activity_records
+            ) ranked
+            WHERE n > 1
+        ) dup
+        WHERE ar.id = dup.id AND ar.date_occurred = dup.date_occurred
+        ''')
+    # Contains the partition key, so it can be unique on the partitioned
+    # parent; it also serves the same-day duplicate lookup
+    db_manager.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_activity_records_user_activity_day
+        ON activity_records (user_id, activity_id, date_occurred)
+        ''')
+
+    # One row per daily bonus paid: the primary key makes awarding it
+    # idempotent, and ``xp`` is what a refund takes back
+    db_manager.execute('''
+        CREATE TABLE IF NOT EXISTS daily_bonus_awards (
+            user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            day DATE NOT NULL,
+            xp INTEGER NOT NULL,
+            awarded_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (user_id, day)
+        )
+        ''')
+    # The bonus was paid for each (UTC) day a member created a record on
+    db_manager.execute('''
+        INSERT INTO daily_bonus_awards (user_id, day, xp, awarded_at)
+        SELECT user_id, (created_at AT TIME ZONE 'UTC')::date, 10, MIN(created_at)
+        FROM activity_records
+        WHERE created_at IS NOT NULL
+        GROUP BY user_id, (created_at AT TIME ZONE 'UTC')::date
+        ON CONFLICT (user_id, day) DO NOTHING
+        ''')
+
+
+def down(db_manager: DBManager):
+    db_manager.execute('DROP TABLE IF EXISTS daily_bonus_awards')
+    db_manager.execute('DROP INDEX IF EXISTS uq_activity_records_user_activity_day')
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_190000_enforce_record_uniqueness.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+from src.database.db_manager import DBManager
+import argparse
+
+
+def up(db_manager: DBManager):
+    # Name the operation and the writer's application_name in the payload, so
+    # a process can skip the echo of an insert it already applied to its own
+    # caches (see RecordsChange in src/models/activity_calendar.py)
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION notify_activity_records_changed_fn()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            v_sender TEXT := current_setting('application_name');
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM pg_notify(
+                    'activity_records_changed',
+                    format('%s %s %s', OLD.user_id, TG_OP, v_sender)
+                );
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM pg_notify(
+                    'activity_records_changed',
+                    format('%s %s %s', NEW.user_id, TG_OP, v_sender)
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        ''')
+
+
+def down(db_manager: DBManager):
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION notify_activity_records_changed_fn()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM pg_notify('activity_records_changed', OLD.user_id::text);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM pg_notify('activity_records_changed', NEW.user_id::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        ''')
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_200000_tag_activity_records_notify.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+from src.database.db_manager import DBManager
+import argparse
+import importlib
+
+
+def up(db_manager: DBManager):
+    # daily_bonus_awards decides the daily bonus now, so nothing reads the
+    # "created" bitmap; stop paying for its range lookup on every change
+    db_manager.execute('''
+        CREATE OR REPLACE FUNCTION sync_user_activity_days_fn()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE user_activity_days SET
+                    occurred = CASE WHEN EXISTS (
+                        SELECT 1 FROM activity_records
+                        WHERE user_id = OLD.user_id
+                          AND date_occurred = OLD.date_occurred
+                    ) THEN occurred
+                    ELSE day_bitmap_set(occurred, OLD.date_occurred, 0) END
+                WHERE user_id = OLD.user_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO user_activity_days (user_id, occurred)
+                VALUES (NEW.user_id, day_bitmap_set(''::bytea, NEW.date_occurred, 1))
+                ON CONFLICT (user_id) DO UPDATE SET
+                    occurred = day_bitmap_set(
+                        user_activity_days.occurred, NEW.date_occurred, 1
+                    );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        ''')
+    db_manager.execute(
+        'DROP TRIGGER IF EXISTS trg_sync_user_activity_days ON activity_records'
+    )
+    db_manager.execute('''
+        CREATE TRIGGER trg_sync_user_activity_days
+        AFTER INSERT OR UPDATE OF user_id, date_occurred
+            OR DELETE ON activity_records
+        FOR EACH ROW
+        EXECUTE FUNCTION sync_user_activity_days_fn()
+        ''')
+    db_manager.execute('ALTER TABLE user_activity_days DROP COLUMN IF EXISTS created')
+
+
+def down(db_manager: DBManager):
+    db_manager.execute('''
+        ALTER TABLE user_activity_days
+        ADD COLUMN IF NOT EXISTS created BYTEA NOT NULL DEFAULT ''::bytea
+        ''')
+    db_manager.execute(
+        'DROP TRIGGER IF EXISTS trg_sync_user_activity_days ON activity_records'
+    )
+    # Restores the two-bitmap trigger and backfills both bitmaps
+    importlib.import_module(
+        'src.database.migrations.20261019_170000_create_user_activity_days'
+    ).up(db_manager)
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_210000_drop_created_day_bitmap.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+from src.database.db_manager import DBManager
+import argparse
+
+
+def up(db_manager: DBManager):
+    # ActivityRecord.sort_defaults sorts the nullable created_at/updated_at
+    # as COALESCE(col, '-infinity') so NULL rows still page; index the same
+    # expressions so those pages seek. date_occurred is NOT NULL (partition
+    # key) and keeps idx_activity_records_user_occurred_id; the plain
+    # created_at index still serves created-on-day range counts.
+    db_manager.execute('''
+        CREATE INDEX IF NOT EXISTS idx_activity_records_user_created_sort
+        ON activity_records(
+            user_id, (COALESCE(created_at, '-infinity'::timestamptz)) DESC, id DESC
+        )
+        ''')
+    db_manager.execute('''
+        CREATE INDEX IF NOT EXISTS idx_activity_records_user_updated_sort
+        ON activity_records(
+            user_id, (COALESCE(updated_at, '-infinity'::timestamptz)) DESC, id DESC
+        )
+        ''')
+
+
+def down(db_manager: DBManager):
+    db_manager.execute('DROP INDEX IF EXISTS idx_activity_records_user_created_sort')
+    db_manager.execute('DROP INDEX IF EXISTS idx_activity_records_user_updated_sort')
+    db_manager.execute(
+        'DELETE FROM migrations '
+        "WHERE filename = '20261019_220000_add_nullable_sort_indexes.py'"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['up', 'down'])
+    args = parser.parse_args()
+
+    if args.command == 'up':
+        with DBManager() as _db:
+            up(_db)
+    elif args.command == 'down':
+        with DBManager() as _db:
+            down(_db)
+
+
+if __name__ == '__main__':
+    main()
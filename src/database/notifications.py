@@ -0,0 +1,114 @@
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psycopg
+    from psycopg import sql
+except Exception:  # pragma: no cover
+    psycopg = None  # type: ignore
+    sql = None  # type: ignore
+
+# Receives the NOTIFY payload, or None after (re)connecting when notifications
+# may have been missed and the subscriber should resync from the database.
+NotificationHandler = Callable[[Optional[str]], None]
+
+
+class NotificationListener:
+    '''Background LISTEN loop dispatching Postgres NOTIFY payloads to handlers.
+
+    Uses one dedicated autocommit connection (outside the pool) on a daemon
+    thread. Handlers run on that thread, so they must be thread-safe and quick.
+    '''
+
+    def __init__(self, poll_timeout: float = 1.0, reconnect_delay: float = 5.0):
+        self.poll_timeout = poll_timeout
+        self.reconnect_delay = reconnect_delay
+        self._handlers: dict[str, list[NotificationHandler]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._connected = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        '''True while the LISTEN connection is up and receiving notifications.'''
+        return self._thread is not None and self._connected.is_set()
+
+    def subscribe(self, channel: str, handler: NotificationHandler) -> None:
+        with self._lock:
+            self._handlers[channel].append(handler)
+
+    def start(self, db_url: Optional[str] = None) -> None:
+        if self._thread is not None:
+            return
+        if psycopg is None:
+            raise RuntimeError(
+                'psycopg is not installed. Run: pip install "psycopg[binary,pool]"'
+            )
+        conninfo = db_url or os.getenv('DATABASE_URL')
+        if not conninfo:
+            raise RuntimeError(
+                'DATABASE_URL is not set. This project now requires Postgres.'
+            )
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(conninfo,), name='pg-listener', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        self._connected.clear()
+
+    def _channels(self) -> list[str]:
+        with self._lock:
+            return list(self._handlers)
+
+    def _dispatch(self, channel: str, payload: Optional[str]) -> None:
+        with self._lock:
+            handlers = list(self._handlers.get(channel, ()))
+        for handler in handlers:
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception(f'Notification handler failed for {channel}')
+
+    def _run(self, conninfo: str) -> None:
+        assert psycopg is not None and sql is not None
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(conninfo, autocommit=True) as conn:
+                    listening: set[str] = set()
+                    self._connected.set()
+                    while not self._stop.is_set():
+                        # Pick up channels subscribed after the listener started
+                        for channel in self._channels():
+                            if channel not in listening:
+                                conn.execute(
+                                    sql.SQL('LISTEN {}').format(sql.Identifier(channel))
+                                )
+                                listening.add(channel)
+                                # Anything sent before LISTEN was missed
+                                self._dispatch(channel, None)
+                        for notify in conn.notifies(timeout=self.poll_timeout):
+                            self._dispatch(notify.channel, notify.payload)
+            except Exception as e:
+                logger.warning(
+                    f'Postgres LISTEN connection lost: {e}. '
+                    f'Reconnecting in {self.reconnect_delay:.0f}s...'
+                )
+            finally:
+                self._connected.clear()
+            self._stop.wait(self.reconnect_delay)
+
+
+# Shared listener for the process
+listener = NotificationListener()
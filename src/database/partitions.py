@@ -0,0 +1,229 @@
+'''Monthly range partitions of activity_records on date_occurred.
+
+Each month lives in its own ``activity_records_YYYY_MM`` partition, so queries
+filtered on date_occurred only touch the months they name, and VACUUM or an
+index rebuild works on one month at a time. ``activity_records_default``
+catches dates outside every partition (e.g. a record backdated past the
+oldest month).
+
+``ensure_partitions`` keeps a few future months ahead of the calendar. With a
+retention period, ``archive_partitions`` rolls cold months up into
+activity_record_rollups (per user, activity and month) and detaches them, so
+they no longer cost anything on the hot path but stay on disk until an
+operator drops or dumps them.
+'''
+
+import logging
+import os
+import re
+from datetime import date
+from typing import Any, Optional
+
+from src.database.db_manager import DBManager
+from src.utils.tracing import add_span_metadata, trace_span
+
+logger = logging.getLogger(__name__)
+
+PARENT = 'activity_records'
+DEFAULT_PARTITION = 'activity_records_default'
+MONTHS_AHEAD = 3
+# Serializes maintenance between bot processes; never blocks one
+MAINTENANCE_LOCK_KEY = 0x6163745F70617274  # 'act_part'
+
+_PARTITION_RE = re.compile(r'^activity_records_(\d{4})_(\d{2})$')
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f'{PARENT}_{month:%Y_%m}'
+
+
+def retention_months(env: Optional[dict[str, str]] = None) -> int:
+    '''ACTIVITY_RECORDS_RETENTION_MONTHS; 0 (the default) keeps every month.'''
+    env = dict(os.environ) if env is None else env
+    return int(env.get('ACTIVITY_RECORDS_RETENTION_MONTHS') or 0)
+
+
+def list_partitions(db: Any) -> list[date]:
+    '''Months with an attached partition, oldest first.'''
+    rows = db.fetchall(
+        'SELECT c.relname AS name FROM pg_inherits i '
+        'JOIN pg_class c ON c.oid = i.inhrelid '
+        'WHERE i.inhparent = %s::regclass',
+        (PARENT,),
+    )
+    months = []
+    for row in rows:
+        match = _PARTITION_RE.match(row['name'])
+        if match:
+            months.append(date(int(match[1]), int(match[2]), 1))
+    return sorted(months)
+
+
+def create_default_partition(db: Any) -> None:
+    db.execute(
+        f'CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT'
+    )
+
+
+def missing_months(
+    db: Any,
+    start: Optional[date] = None,
+    months_ahead: int = MONTHS_AHEAD,
+    today: Optional[date] = None,
+) -> list[date]:
+    '''Months from ``start`` (default: this month) through ``months_ahead``
+    months from now that have no partition yet.
+    '''
+    current = month_start(today or date.today())
+    month = month_start(start) if start else current
+    existing = set(list_partitions(db))
+    missing: list[date] = []
+    while month <= add_months(current, months_ahead):
+        if month not in existing:
+            missing.append(month)
+        month = add_months(month, 1)
+    return missing
+
+
+def ensure_partitions(
+    db: Any,
+    start: Optional[date] = None,
+    months_ahead: int = MONTHS_AHEAD,
+    today: Optional[date] = None,
+) -> list[str]:
+    '''Create missing monthly partitions from ``start`` (default: this month)
+    through ``months_ahead`` months from now. Returns the partitions created.
+    '''
+    return [
+        partition_name(month)
+        for month in missing_months(db, start, months_ahead, today)
+        if create_partition(db, month)
+    ]
+
+
+def create_partition(db: Any, month: date) -> bool:
+    '''Create the partition for ``month``; False if the default one is in the way.'''
+    end = add_months(month, 1)
+    # Postgres refuses a new partition whose range already has rows in the
+    # default partition; leave it for an operator rather than fail the run
+    stray = db.fetchone(
+        f'SELECT 1 FROM {DEFAULT_PARTITION} '
+        'WHERE date_occurred >= %s AND date_occurred < %s LIMIT 1',
+        (month, end),
+    )
+    if stray is not None:
+        logger.warning(
+            f'{DEFAULT_PARTITION} holds rows for {month:%Y-%m}; '
+            f'{partition_name(month)} not created'
+        )
+        return False
+    # CREATE TABLE ... PARTITION OF takes ACCESS EXCLUSIVE on the parent;
+    # ATTACH only needs SHARE UPDATE EXCLUSIVE, which writers don't wait on
+    name = partition_name(month)
+    db.execute(
+        f'CREATE TABLE IF NOT EXISTS {name} '
+        f'(LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    )
+    db.execute(
+        f'ALTER TABLE {PARENT} ATTACH PARTITION {name} '
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    logger.info(f'Created partition {name}')
+    return True
+
+
+def expired_months(db: Any, retention: int, today: Optional[date] = None) -> list[date]:
+    '''Partitioned months entirely older than ``retention`` months, oldest first.'''
+    if retention <= 0:
+        return []
+    cutoff = add_months(month_start(today or date.today()), -retention)
+    return [month for month in list_partitions(db) if month < cutoff]
+
+
+def archive_partition(db: Any, month: date) -> str:
+    '''Roll one month up into activity_record_rollups and detach it.
+
+    Detaching skips the delete triggers, so users keep the XP those records
+    earned. Run it in its own transaction: the rollup scans the month
+    holding only a SHARE lock on that partition (backdated writes into it
+    wait, nothing else does), and the parent is locked just for the detach.
+    '''
+    name = partition_name(month)
+    db.execute(f'LOCK TABLE {name} IN SHARE MODE')
+    db.execute(
+        'INSERT INTO activity_record_rollups '
+        '(month, user_id, activity_id, records, first_occurred, last_occurred) '
+        'SELECT %s, user_id, activity_id, COUNT(*), '
+        'MIN(date_occurred), MAX(date_occurred) '
+        f'FROM {name} GROUP BY user_id, activity_id '
+        'ON CONFLICT (user_id, month, activity_id) DO UPDATE SET '
+        'records = activity_record_rollups.records + EXCLUDED.records, '
+        'first_occurred = LEAST(activity_record_rollups.first_occurred, '
+        'EXCLUDED.first_occurred), '
+        'last_occurred = GREATEST(activity_record_rollups.last_occurred, '
+        'EXCLUDED.last_occurred)',
+        (month,),
+    )
+    db.execute(f'ALTER TABLE {PARENT} DETACH PARTITION {name}')
+    logger.info(f'Archived partition {name} into activity_record_rollups')
+    return name
+
+
+def archive_partitions(
+    db: Any, retention: int, today: Optional[date] = None
+) -> list[str]:
+    '''Roll up and detach partitions entirely older than ``retention`` months
+    in ``db``'s transaction. Returns the partitions detached.
+    '''
+    return [
+        archive_partition(db, month) for month in expired_months(db, retention, today)
+    ]
+
+
+def _set_lock_timeout(db: Any) -> None:
+    # A waiting DETACH queues every /record behind it; give up after a few
+    # seconds instead of waiting out a long-running query on the parent
+    db.execute("SET LOCAL lock_timeout = '5s'")
+
+
+def maintain(
+    db: Any, retention: Optional[int] = None, today: Optional[date] = None
+) -> dict[str, list[str]]:
+    '''Create upcoming partitions and archive expired ones, unless another
+    process is already doing so.
+
+    ``db`` only holds the advisory lock. Each partition is created or
+    archived in its own short transaction, so a parent lock is never held
+    across another month's work and a failure keeps the months already done.
+    '''
+    with trace_span('db.partition_maintenance'):
+        locked = db.fetchone(
+            'SELECT pg_try_advisory_xact_lock(%s) AS locked', (MAINTENANCE_LOCK_KEY,)
+        )
+        if not locked or not locked['locked']:
+            add_span_metadata('skipped', True)
+            return {'created': [], 'archived': []}
+        created: list[str] = []
+        for month in missing_months(db, today=today):
+            with DBManager() as step:
+                _set_lock_timeout(step)
+                if create_partition(step, month):
+                    created.append(partition_name(month))
+        archived: list[str] = []
+        retention = retention_months() if retention is None else retention
+        for month in expired_months(db, retention, today):
+            with DBManager() as step:
+                _set_lock_timeout(step)
+                archived.append(archive_partition(step, month))
+        add_span_metadata('created', len(created))
+        add_span_metadata('archived', len(archived))
+        return {'created': created, 'archived': archived}
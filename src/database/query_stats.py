@@ -0,0 +1,163 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_COMMENT_RE = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PARAM_RE = re.compile(r'%\(\w+\)s|%s|\$\d+')
+_IN_LIST_RE = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    id: str
+    normalized: str
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(query: str) -> Fingerprint:
+    '''Normalize literals, placeholders and whitespace, then hash.
+
+    Statements that differ only in their values share a fingerprint, e.g.
+    ``SELECT * FROM users WHERE id = 5`` and ``... WHERE id = %s``.
+    '''
+    normalized = _COMMENT_RE.sub(' ', query)
+    normalized = _STRING_RE.sub('?', normalized)
+    normalized = _PARAM_RE.sub('?', normalized)
+    normalized = _NUMBER_RE.sub('?', normalized)
+    normalized = _SPACE_RE.sub(' ', normalized).strip().lower()
+    normalized = _IN_LIST_RE.sub('in (?)', normalized)
+    digest = hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+    return Fingerprint(id=digest, normalized=normalized)
+
+
+@dataclass
+class QueryStat:
+    fingerprint: str
+    query: str
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    rows: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), 'mean_time': self.mean_time}
+
+
+@dataclass
+class SlowQuery:
+    fingerprint: str
+    query: str
+    params: tuple[Any, ...]
+    duration: float
+    at: float = field(default_factory=time.time)
+    plan: Optional[list[str]] = None
+
+
+class QueryStats:
+    '''In-process per-fingerprint query counters plus a slow-query log.
+
+    Statements taking at least ``slow_threshold`` seconds are logged and kept
+    (with their parameters) in a bounded list; with ``explain_slow`` the
+    plan is captured right away, otherwise ``DBManager.explain`` gets it on
+    demand.
+    '''
+
+    def __init__(
+        self,
+        slow_threshold: float = 0.25,
+        explain_slow: bool = False,
+        slow_log_size: int = 100,
+    ):
+        self.slow_threshold = slow_threshold
+        self.explain_slow = explain_slow
+        self._stats: dict[str, QueryStat] = {}
+        self._slow: deque[SlowQuery] = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+
+    def configure(self, env: Optional[dict[str, str]] = None) -> None:
+        '''Apply DB_SLOW_QUERY_MS and DB_SLOW_QUERY_EXPLAIN from the environment.'''
+        env = dict(os.environ) if env is None else env
+        if env.get('DB_SLOW_QUERY_MS'):
+            self.slow_threshold = float(env['DB_SLOW_QUERY_MS']) / 1000
+        explain = env.get('DB_SLOW_QUERY_EXPLAIN', '').lower()
+        self.explain_slow = explain in {'1', 'true', 'yes'}
+
+    def record(
+        self,
+        fp: Fingerprint,
+        duration: float,
+        rows: int = 0,
+        retries: int = 0,
+        error: bool = False,
+    ) -> None:
+        with self._lock:
+            stat = self._stats.get(fp.id)
+            if stat is None:
+                stat = self._stats[fp.id] = QueryStat(fp.id, fp.normalized)
+            stat.calls += 1
+            stat.errors += int(error)
+            stat.retries += retries
+            stat.rows += rows
+            stat.total_time += duration
+            stat.max_time = max(stat.max_time, duration)
+
+    def is_slow(self, duration: float) -> bool:
+        return duration >= self.slow_threshold
+
+    def record_slow(
+        self,
+        fp: Fingerprint,
+        query: str,
+        params: Iterable[Any] | None,
+        duration: float,
+        plan: Optional[list[str]] = None,
+    ) -> None:
+        logger.warning(
+            f'Slow query {fp.id} took {duration * 1000:.1f}ms: {fp.normalized}'
+        )
+        with self._lock:
+            self._slow.append(
+                SlowQuery(fp.id, query, tuple(params or ()), duration, plan=plan)
+            )
+
+    def get(self, fingerprint_id: str) -> Optional[QueryStat]:
+        with self._lock:
+            return self._stats.get(fingerprint_id)
+
+    def top(self, n: int = 10, by: str = 'total_time') -> list[dict[str, Any]]:
+        '''The ``n`` fingerprints with the highest ``by`` (any QueryStat field).'''
+        with self._lock:
+            stats = [s.as_dict() for s in self._stats.values()]
+        return sorted(stats, key=lambda s: s[by], reverse=True)[:n]
+
+    def slow_queries(self) -> list[SlowQuery]:
+        '''Most recent last.'''
+        with self._lock:
+            return list(self._slow)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+
+
+# Shared stats for the process
+query_stats = QueryStats()
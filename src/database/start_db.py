@@ -1,15 +1,103 @@
+import hashlib
 import importlib.util
 import logging
 import os
+from typing import Optional
 
+from src.database import postgres_bootstrap
 from src.database.db_manager import DBManager
 from src.database.postgres_bootstrap import init_schema_pg  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
 
-def run(db: DBManager):
-    '''Run full DB setup: schema + migrations.'''
+# pg_advisory_xact_lock key serializing schema setup between processes (bot, web)
+SCHEMA_LOCK_KEY = 0x4C4C_5343_4845_4D41  # "LLSCHEMA"
+
+_FINGERPRINT_PREFIX = 'schema:'
+# bot_state key holding the fingerprint of the last completed setup
+FINGERPRINT_KEY = 'schema_fingerprint'
+
+
+def _migration_files(migrations_dir: str) -> list[str]:
+    return sorted(
+        f
+        for f in os.listdir(migrations_dir)
+        if f.endswith('.py') and not f.startswith('__')
+    )
+
+
+def schema_fingerprint(migrations_dir: str = MIGRATIONS_DIR) -> str:
+    '''Hash of the bootstrap DDL plus every migration's filename and contents.
+
+    Any edit to ``postgres_bootstrap.py`` or an added/changed migration
+    changes the fingerprint, so a matching stored value means the schema is
+    exactly what this code would produce.
+    '''
+    digest = hashlib.sha256()
+    with open(postgres_bootstrap.__file__, 'rb') as f:
+        digest.update(f.read())
+    if os.path.exists(migrations_dir):
+        for filename in _migration_files(migrations_dir):
+            with open(os.path.join(migrations_dir, filename), 'rb') as f:
+                checksum = hashlib.sha256(f.read()).hexdigest()
+            digest.update(f'\0{filename}\0{checksum}'.encode())
+    return _FINGERPRINT_PREFIX + digest.hexdigest()
+
+
+def stored_fingerprint(db: DBManager, migration_files: list[str]) -> Optional[str]:
+    '''The fingerprint recorded by the last setup, or None (also before any).
+
+    Only trusted while the applied migrations are exactly ``migration_files``:
+    a migration's ``down()`` deletes its row, which invalidates it.
+    '''
+    # Both tables are missing on a fresh database, and naming a missing
+    # table fails the whole statement
+    ready = db.fetchone(
+        "SELECT to_regclass('public.bot_state') IS NOT NULL "
+        "AND to_regclass('public.migrations') IS NOT NULL AS ready"
+    )
+    if not ready or not ready['ready']:
+        return None
+    row = db.fetchone(
+        'SELECT (SELECT value FROM bot_state WHERE key = %s) AS fingerprint, '
+        'ARRAY(SELECT filename FROM migrations ORDER BY filename) AS applied',
+        (FINGERPRINT_KEY,),
+    )
+    if not row or list(row['applied']) != migration_files:
+        return None
+    return row['fingerprint']
+
+
+def run(db: DBManager, migrations_dir: str = MIGRATIONS_DIR):
+    '''Run full DB setup: schema + migrations, skipped when already up to date.'''
+    fingerprint = schema_fingerprint(migrations_dir)
+    migration_files = (
+        _migration_files(migrations_dir) if os.path.exists(migrations_dir) else []
+    )
+    if stored_fingerprint(db, migration_files) == fingerprint:
+        logger.info('Database schema up to date; skipping setup.')
+        return
+
+    # Held until the caller's transaction commits; a concurrent boot waits
+    # here and then finds the schema already set up
+    db.execute('SELECT pg_advisory_xact_lock(%s)', (SCHEMA_LOCK_KEY,))
+    if stored_fingerprint(db, migration_files) == fingerprint:
+        logger.info('Database schema set up by another process; skipping setup.')
+        return
+
+    _setup(db, migrations_dir)
+
+    db.execute(
+        'INSERT INTO bot_state (key, value) VALUES (%s, %s) '
+        'ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = NOW()',
+        (FINGERPRINT_KEY, fingerprint),
+    )
+    logger.info('Recorded database schema fingerprint.')
+
+
+def _setup(db: DBManager, migrations_dir: str) -> None:
     # Step 1: Create database and tables
     init_schema_pg(db)
     logger.info('Postgres database and tables created/verified.')
@@ -23,18 +111,11 @@ def run(db: DBManager):
     logger.info(f"Current tables in DB: {[t['name'] for t in tables]}")
 
     # Step 3: Run migrations
-    migrations_dir = os.path.join(
-        os.path.dirname(os.path.abspath(__file__)), 'migrations'
-    )
     if not os.path.exists(migrations_dir):
         logger.error('No migrations directory found, skipping migrations.')
         return
 
-    migration_files = sorted(
-        f
-        for f in os.listdir(migrations_dir)
-        if f.endswith('.py') and not f.startswith('__')
-    )
+    migration_files = _migration_files(migrations_dir)
     applied_rows = db.fetchall('SELECT filename FROM migrations')
     applied_migrations = {row['filename'] for row in applied_rows}
 
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Iterable
 
 from src.models.base import BaseModel
 
@@ -6,6 +6,15 @@ from src.models.base import BaseModel
 class Achievement(BaseModel):
     table = 'achievements'
 
+    @classmethod
+    def get_by_codes(cls, codes: Iterable[str]) -> dict[str, dict[str, Any]]:
+        '''Return achievements keyed by code for every known code in one query.'''
+        code_list = list(dict.fromkeys(codes))
+        if not code_list:
+            return {}
+        rows = cls.get_many(where='code = ANY(%s)', params=(code_list,))
+        return {r['code']: r for r in rows}
+
     @classmethod
     def upsert_code(
         cls, code: str, name: str, description: str, xp_value: int = 0
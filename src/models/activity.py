@@ -1,51 +1,61 @@
-from typing import Any, Optional, cast
+import heapq
+import random
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence
 
 from src.database.db_manager import DBManager
+from src.models.activity_catalog import catalog
 from src.models.base import BaseModel
 
 
+@dataclass(slots=True)
+class ActivityRow:
+    id: int
+    name: str
+    category: str
+    xp_value: int
+    is_archived: bool
+    created_at: datetime | None
+    updated_at: datetime | None
+
+
 class Activity(BaseModel):
     table = 'activities'
+    row_class = ActivityRow
+
+    # Reads are served from the process-wide catalog; writes invalidate it so the
+    # writing process sees its own change before the NOTIFY round-trip lands.
+
+    @classmethod
+    def get(
+        cls,
+        id_value: Any,
+        columns: Sequence[str] | None = None,
+        compact: bool = False,
+    ) -> Optional[Any]:
+        if columns or compact:
+            return super().get(id_value, columns=columns, compact=compact)
+        row = catalog.get(id_value)
+        return dict(row) if row is not None else None
 
     @classmethod
     def list_categories(cls, active_only: bool = True, limit: int = 25) -> list[str]:
-        where = 'WHERE is_archived = FALSE' if active_only else ''
-        sql = (
-            'SELECT DISTINCT category FROM activities '
-            f'{where} ORDER BY category ASC LIMIT %s'
-        )
-        with DBManager() as db:
-            rows = db.fetchall(sql, (limit,))
-        return [r['category'] for r in rows]
+        return catalog.categories(active_only=active_only)[:limit]
 
     @classmethod
     def list_by_category(
         cls, category: str, active_only: bool = True, limit: int = 25
     ) -> list[dict[str, Any]]:
-        where = 'AND is_archived = FALSE' if active_only else ''
-        sql = (
-            'SELECT id, name, xp_value, is_archived FROM activities '
-            'WHERE category = %s '
-            f'{where} '
-            'ORDER BY name ASC LIMIT %s'
-        )
-        with DBManager() as db:
-            rows = db.fetchall(sql, (category, limit))
-        return cast(list[dict[str, Any]], rows)
+        rows = catalog.by_category(category, active_only=active_only)[:limit]
+        return [dict(r) for r in rows]
 
     @classmethod
     def get_by_name_category(
         cls, name: str, category: str, active_only: bool = True
     ) -> Optional[dict[str, Any]]:
-        where = 'AND is_archived = FALSE' if active_only else ''
-        sql = (
-            'SELECT id, name, category, xp_value, is_archived FROM activities '
-            'WHERE name = %s AND category = %s '
-            f'{where}'
-        )
-        with DBManager() as db:
-            row = db.fetchone(sql, (name, category))
-        return cast(Optional[dict[str, Any]], row)
+        row = catalog.find(name, category, active_only=active_only)
+        return dict(row) if row is not None else None
 
     @classmethod
     def set_archived(cls, activity_id: int, is_archived: bool) -> None:
@@ -54,6 +64,7 @@ class Activity(BaseModel):
                 'UPDATE activities SET is_archived = %s WHERE id = %s',
                 (is_archived, activity_id),
             )
+        catalog.invalidate()
 
     @classmethod
     def upsert_activity(cls, name: str, category: str, xp_value: int) -> dict[str, Any]:
@@ -67,26 +78,56 @@ class Activity(BaseModel):
         )
 
     @classmethod
-    def get_random(cls, limit: int = 5) -> list[dict[str, Any]]:
-        sql = (
-            'SELECT id, name, category, xp_value FROM activities '
-            'WHERE is_archived = FALSE '
-            'ORDER BY RANDOM() LIMIT %s'
-        )
-        with DBManager() as db:
-            rows = db.fetchall(sql, (limit,))
-        return cast(list[dict[str, Any]], rows)
+    def get_random(
+        cls,
+        limit: int = 5,
+        weight: Callable[[dict[str, Any]], float] | None = None,
+        rng: random.Random | None = None,
+    ) -> list[dict[str, Any]]:
+        '''Sample distinct unarchived activities from the catalog.
+
+        ``weight`` maps an activity to its relative chance of being picked
+        (default: uniform). Pass a seeded ``rng`` for reproducible rolls.
+        '''
+        rng = rng or random.Random()
+        rows = catalog.all(active_only=True)
+        if weight is None:
+            picks = rng.sample(rows, min(limit, len(rows)))
+        else:
+            # Weighted sampling without replacement (Efraimidis-Spirakis): keep
+            # the top keys of u ** (1 / w), one pass and no sort of the table.
+            keyed = (
+                (rng.random() ** (1.0 / w), r) for r in rows if (w := weight(r)) > 0
+            )
+            picks = [r for _, r in heapq.nlargest(limit, keyed, key=lambda k: k[0])]
+        return [dict(r) for r in picks]
 
     @classmethod
     def get_by_ids(cls, activity_ids: list[int]) -> list[dict[str, Any]]:
-        if not activity_ids:
-            return []
+        rows = (catalog.get(i) for i in dict.fromkeys(activity_ids))
+        return [dict(r) for r in rows if r is not None]
 
-        placeholders = ', '.join(['%s'] * len(activity_ids))
-        sql = (
-            f'SELECT id, name, category, xp_value FROM activities '
-            f'WHERE id IN ({placeholders})'
-        )
-        with DBManager() as db:
-            rows = db.fetchall(sql, tuple(activity_ids))
-        return cast(list[dict[str, Any]], rows)
+    @classmethod
+    def create(cls, values: dict[str, Any]) -> dict[str, Any]:
+        row = super().create(values)
+        catalog.invalidate()
+        return row
+
+    @classmethod
+    def update(cls, id_value: Any, values: dict[str, Any]) -> dict[str, Any]:
+        row = super().update(id_value, values)
+        catalog.invalidate()
+        return row
+
+    @classmethod
+    def delete(cls, id_value: Any) -> None:
+        super().delete(id_value)
+        catalog.invalidate()
+
+    @classmethod
+    def upsert(
+        cls, conflict_cols: Sequence[str], values: dict[str, Any]
+    ) -> dict[str, Any]:
+        row = super().upsert(conflict_cols, values)
+        catalog.invalidate()
+        return row
@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Optional
+
+from src.database.db_manager import DBManager, application_name
+from src.database.notifications import NotificationListener
+from src.utils import day_bitmap
+
+# NOTIFY channel fired when a member's records change, with the payload
+# "<user id> <INSERT|UPDATE|DELETE> <application_name of the writer>"
+RECORDS_CHANNEL = 'activity_records_changed'
+
+
+@dataclass(frozen=True)
+class RecordsChange:
+    user_id: int
+    # Empty for payloads from before the operation was included
+    op: str = ''
+    sender: str = ''
+
+    @classmethod
+    def parse(cls, payload: str) -> 'RecordsChange':
+        user_id, *rest = payload.split(' ', 2)
+        return cls(int(user_id), *rest)
+
+    @property
+    def own_insert(self) -> bool:
+        '''An insert by this process, which its caches already applied.'''
+        return self.op == 'INSERT' and self.sender == application_name()
+
+
+@dataclass(frozen=True)
+class _Calendar:
+    # Days with a record dated on them (date_occurred)
+    occurred: bytes
+    loaded_at: float
+
+
+class ActivityCalendar:
+    '''Per-user day bitmaps from user_activity_days, cached in a bounded LRU.
+
+    Triggers on activity_records keep the table current; "any record on D",
+    "run of active days ending at D" and "days active in a range" are then
+    bit operations on a couple of kilobytes instead of record scans.
+
+    A cached calendar is trusted while attached to a running
+    NotificationListener, which drops users whose records change in any
+    process; otherwise it is reloaded once older than ``max_age``. ``mark``
+    applies this process's own inserts immediately, so their echoes are
+    ignored.
+    '''
+
+    def __init__(self, max_users: int = 20_000, max_age: float = 30.0):
+        self.max_users = max_users
+        self.max_age = max_age
+        self._users: OrderedDict[int, _Calendar] = OrderedDict()
+        self._lock = threading.Lock()
+        self._listener: NotificationListener | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, user_id: int) -> _Calendar:
+        with DBManager() as db:
+            row = db.fetchone(
+                'SELECT occurred FROM user_activity_days WHERE user_id = %s',
+                (user_id,),
+            )
+        return _Calendar(bytes(row['occurred']) if row else b'', time.monotonic())
+
+    def _is_fresh(self, calendar: _Calendar) -> bool:
+        if self._listener is not None and self._listener.running:
+            return True
+        return time.monotonic() - calendar.loaded_at < self.max_age
+
+    def _store(self, user_id: int, calendar: _Calendar) -> None:
+        # Caller holds the lock
+        self._users[user_id] = calendar
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+
+    def _get(self, user_id: int | str) -> _Calendar:
+        key = int(user_id)
+        with self._lock:
+            calendar = self._users.get(key)
+            if calendar is not None and self._is_fresh(calendar):
+                self.hits += 1
+                self._users.move_to_end(key)
+                return calendar
+            self.misses += 1
+        calendar = self._load(key)
+        with self._lock:
+            self._store(key, calendar)
+        return calendar
+
+    # ---------------- Queries ----------------
+
+    def has_occurred(self, user_id: int | str, day: date) -> bool:
+        '''Whether the user has a record dated ``day``.'''
+        return day_bitmap.has_bit(
+            self._get(user_id).occurred, day_bitmap.day_index(day)
+        )
+
+    def run_ending(self, user_id: int | str, day: date) -> int:
+        '''Consecutive days with a record dated on them, ending at ``day``.'''
+        return day_bitmap.run_length_ending(
+            self._get(user_id).occurred, day_bitmap.day_index(day)
+        )
+
+    def days_active(self, user_id: int | str, start: date, end: date) -> int:
+        '''Days from ``start`` to ``end`` (inclusive) with a record dated on them.'''
+        return day_bitmap.count_between(
+            self._get(user_id).occurred,
+            day_bitmap.day_index(start),
+            day_bitmap.day_index(end),
+        )
+
+    # ---------------- Maintenance ----------------
+
+    def mark(self, user_id: int | str, occurred: date) -> None:
+        '''Apply a record this process just inserted to a cached calendar.'''
+        key = int(user_id)
+        with self._lock:
+            calendar = self._users.get(key)
+            if calendar is None:
+                # Loaded with the record included on next use
+                return
+            self._users[key] = _Calendar(
+                day_bitmap.set_bit(calendar.occurred, day_bitmap.day_index(occurred)),
+                calendar.loaded_at,
+            )
+
+    def forget(self, user_id: int | str) -> None:
+        with self._lock:
+            self._users.pop(int(user_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+    def _on_records_changed(self, payload: Optional[str]) -> None:
+        if not payload:
+            self.clear()
+            return
+        change = RecordsChange.parse(payload)
+        if not change.own_insert:
+            self.forget(change.user_id)
+
+    def attach(self, listener: NotificationListener) -> None:
+        '''Drop users whose records changed, as NOTIFYed by any process.'''
+        self._listener = listener
+        listener.subscribe(RECORDS_CHANNEL, self._on_records_changed)
+
+    def stats(self) -> dict[str, Any]:
+        hits, misses = self.hits, self.misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else None,
+            'size': len(self._users),
+        }
+
+
+# Shared activity calendar cache for the process
+activity_calendar = ActivityCalendar()
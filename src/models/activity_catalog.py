@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from src.database.db_manager import DBManager
+from src.database.notifications import NotificationListener
+from src.utils.autocomplete import AutocompleteIndex
+from src.utils.tracing import trace_span
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel fired by the statement-level trigger on the activities table
+ACTIVITIES_CHANNEL = 'activities_changed'
+
+
+@dataclass(frozen=True)
+class _CatalogSnapshot:
+    version: int
+    loaded_at: float
+    by_id: dict[int, dict[str, Any]] = field(default_factory=dict)
+    by_name_category: dict[tuple[str, str], dict[str, Any]] = field(
+        default_factory=dict
+    )
+    # Rows per category, sorted by name
+    by_category: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    # Autocomplete indexes over unarchived activities, keyed by category
+    # (None for the category list itself)
+    indexes: dict[str | None, AutocompleteIndex] = field(default_factory=dict)
+
+
+_EMPTY_INDEX = AutocompleteIndex(())
+
+
+def _build_indexes(snapshot: _CatalogSnapshot) -> None:
+    '''Precompute autocomplete indexes so keystrokes never build them.'''
+    for category, rows in snapshot.by_category.items():
+        names = [r['name'] for r in rows if not r['is_archived']]
+        if names:
+            snapshot.indexes[category] = AutocompleteIndex(names)
+    snapshot.indexes[None] = AutocompleteIndex(
+        c for c in snapshot.indexes if c is not None
+    )
+
+
+class ActivityCatalog:
+    '''Process-wide, read-mostly cache of the whole activities table.
+
+    Reads are dictionary lookups against an immutable snapshot that is swapped
+    atomically on refresh. While attached to a running NotificationListener the
+    snapshot is rebuilt on the listener thread after every change to the table,
+    so readers never wait for a reload; otherwise it is reloaded once older
+    than max_age. The dashboard writes activities through Django, never this
+    module: it only stays in sync because the trg_notify_activities_changed
+    trigger fires for its writes too.
+    '''
+
+    def __init__(self, max_age: float = 300.0):
+        self.max_age = max_age
+        self._snapshot: _CatalogSnapshot | None = None
+        self._load_lock = threading.RLock()
+        self._listener: NotificationListener | None = None
+        self._version = 0
+        self.reads = 0
+        self.loads = 0
+
+    # ---------------- Loading ----------------
+
+    def _load_rows(self) -> list[dict[str, Any]]:
+        with DBManager() as db:
+            return db.fetchall('SELECT * FROM activities ORDER BY name ASC')
+
+    def refresh(self) -> None:
+        '''Reload every activity from the database and swap the snapshot.'''
+        with self._load_lock:
+            with trace_span('activity_catalog.refresh'):
+                rows = self._load_rows()
+            self._version += 1
+            snapshot = _CatalogSnapshot(
+                version=self._version, loaded_at=time.monotonic()
+            )
+            for row in sorted(rows, key=lambda r: r['name']):
+                snapshot.by_id[int(row['id'])] = row
+                snapshot.by_name_category[(row['name'], row['category'])] = row
+                snapshot.by_category.setdefault(row['category'], []).append(row)
+            _build_indexes(snapshot)
+            self._snapshot = snapshot
+            self.loads += 1
+        logger.debug(f'Activity catalog loaded {len(rows)} activities')
+
+    def invalidate(self) -> None:
+        '''Note that the activities table changed.
+
+        With a running listener the write's NOTIFY refreshes the snapshot on
+        the listener thread, so keep serving the current one meanwhile rather
+        than make the next reader (often autocomplete on the event loop) pay
+        for the reload. Otherwise drop it so the next read reloads.
+        '''
+        if self._listener is not None and self._listener.running:
+            return
+        self._snapshot = None
+
+    def attach(self, listener: NotificationListener) -> None:
+        '''Keep the catalog in sync with NOTIFYs on the activities channel.'''
+        self._listener = listener
+        listener.subscribe(ACTIVITIES_CHANNEL, lambda _payload: self.refresh())
+
+    def _is_fresh(self, snapshot: _CatalogSnapshot) -> bool:
+        if self._listener is not None and self._listener.running:
+            return True
+        return time.monotonic() - snapshot.loaded_at < self.max_age
+
+    @property
+    def loaded(self) -> bool:
+        snapshot = self._snapshot
+        return snapshot is not None and self._is_fresh(snapshot)
+
+    @property
+    def version(self) -> int:
+        '''Increments on every reload; lets derived indexes detect changes.'''
+        return self._snapshot.version if self._snapshot is not None else 0
+
+    def ensure_loaded(self) -> None:
+        if self.loaded:
+            return
+        with self._load_lock:
+            # Concurrent callers wait for the first load instead of repeating it
+            if not self.loaded:
+                self.refresh()
+
+    def _current(self) -> _CatalogSnapshot:
+        self.reads += 1
+        snapshot = self._snapshot
+        if snapshot is None or not self._is_fresh(snapshot):
+            self.ensure_loaded()
+            snapshot = self._snapshot
+        assert snapshot is not None
+        return snapshot
+
+    # ---------------- Reads ----------------
+
+    def get(self, activity_id: int) -> Optional[dict[str, Any]]:
+        return self._current().by_id.get(int(activity_id))
+
+    def find(
+        self, name: str, category: str, active_only: bool = True
+    ) -> Optional[dict[str, Any]]:
+        row = self._current().by_name_category.get((name, category))
+        if row is None or (active_only and row['is_archived']):
+            return None
+        return row
+
+    def categories(self, active_only: bool = True) -> list[str]:
+        by_category = self._current().by_category
+        return sorted(
+            c
+            for c, rows in by_category.items()
+            if not active_only or any(not r['is_archived'] for r in rows)
+        )
+
+    def by_category(
+        self, category: str, active_only: bool = True
+    ) -> list[dict[str, Any]]:
+        rows = self._current().by_category.get(category, [])
+        return [r for r in rows if not active_only or not r['is_archived']]
+
+    def all(self, active_only: bool = True) -> list[dict[str, Any]]:
+        rows = self._current().by_id.values()
+        return [r for r in rows if not active_only or not r['is_archived']]
+
+    # ---------------- Autocomplete ----------------
+
+    def category_index(self) -> AutocompleteIndex:
+        '''Autocomplete index over categories with unarchived activities.'''
+        return self._current().indexes[None]
+
+    def activity_index(self, category: str) -> AutocompleteIndex:
+        '''Autocomplete index over a category's unarchived activity names.'''
+        return self._current().indexes.get(category, _EMPTY_INDEX)
+
+    def stats(self) -> dict[str, Any]:
+        reads, loads = self.reads, self.loads
+        return {
+            'reads': reads,
+            'loads': loads,
+            'hit_rate': (reads - loads) / reads if reads else None,
+            'size': len(self._snapshot.by_id) if self._snapshot else 0,
+            'version': self.version,
+        }
+
+
+async def ensure_catalog_loaded() -> None:
+    '''Load the catalog off the event loop if a read would hit the database.'''
+    if not catalog.loaded:
+        await asyncio.to_thread(catalog.ensure_loaded)
+
+
+# Shared catalog for the process
+catalog = ActivityCatalog()
@@ -1,124 +1,116 @@
-from datetime import date
-from typing import Any, Literal, cast
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Iterable, Literal, cast
+
+from psycopg import errors
+from psycopg.rows import namedtuple_row
 
 from src.database.db_manager import DBManager
+from src.models.activity_calendar import activity_calendar
 from src.models.base import BaseModel
 
 
-class ActivityRecord(BaseModel):
-    table = 'activity_records'
+@dataclass(slots=True)
+class ActivityRecordRow:
+    id: int
+    user_id: int
+    activity_id: int
+    note: str | None
+    date_occurred: date
+    created_at: datetime | None
+    updated_at: datetime | None
+    message_id: int | None
+    guild_id: int | None = None
 
-    @staticmethod
-    def _activity_group_key(category: str, name: str) -> str | None:
-        if category == 'Steps' and name.startswith('Daily Steps'):
-            return 'steps_daily'
-        if category == 'Steps' and name.startswith('Weekly Steps'):
-            return 'steps_weekly'
-        if category == 'Recovery' and name in (
-            'A week of good sleep (7+ hours/day avg)',
-            'A week of great sleep (8+ hours/day avg)',
-        ):
-            return 'recovery_weekly_sleep'
-        if category == 'Diet' and name == 'Week of no Alcohol':
-            return 'diet_weekly_no_alcohol'
-        return None
 
-    @classmethod
-    def has_activity_on_date(
-        cls,
-        user_id: int | str,
-        activity_id: int,
-        date_iso: str,
-        *,
-        exclude_record_id: int | None = None,
-    ) -> bool:
-        sql = (
-            'SELECT 1 FROM activity_records '
-            'WHERE user_id = %s AND activity_id = %s AND date_occurred = %s'
-        )
-        params: list[Any] = [
-            user_id,
-            activity_id,
-            date.fromisoformat(date_iso),
-        ]
-        if exclude_record_id is not None:
-            sql += ' AND id <> %s'
-            params.append(exclude_record_id)
-        sql += ' LIMIT 1'
+@dataclass(frozen=True, slots=True)
+class DuplicateCheck:
+    '''Which duplicate rules a record for an activity and day would break.'''
 
-        with DBManager() as db:
-            row = db.fetchone(sql, tuple(params))
-        return row is not None
+    # The user already has this activity on this day
+    same_day: bool
+    # activity_groups entry the activity belongs to, if any
+    group_key: str | None = None
+    period: str | None = None
+    group_label: str | None = None
+    # Another record of the group already holds this day or week
+    group_taken: bool = False
 
-    @classmethod
-    def has_group_activity_on_date(
-        cls,
-        user_id: int | str,
-        group_key: str,
-        date_iso: str,
-        *,
-        exclude_record_id: int | None = None,
-    ) -> bool:
-        if group_key == 'steps_daily':
-            where = "a.category = 'Steps' AND a.name LIKE 'Daily Steps%%'"
-        else:
-            raise ValueError(f'Unknown daily group_key: {group_key}')
+    @property
+    def ok(self) -> bool:
+        return not (self.same_day or self.group_taken)
 
-        sql = (
-            'SELECT 1 FROM activity_records ar '
-            'JOIN activities a ON a.id = ar.activity_id '
-            f'WHERE ar.user_id = %s AND ar.date_occurred = %s AND {where}'
-        )
-        params: list[Any] = [user_id, date.fromisoformat(date_iso)]
-        if exclude_record_id is not None:
-            sql += ' AND ar.id <> %s'
-            params.append(exclude_record_id)
-        sql += ' LIMIT 1'
 
-        with DBManager() as db:
-            row = db.fetchone(sql, tuple(params))
-        return row is not None
+def week_start(day: date) -> date:
+    '''Monday of the week containing ``day``.'''
+    return day - timedelta(days=day.weekday())
+
+
+def utc_day_bounds(day: date) -> tuple[datetime, datetime]:
+    '''``[start, end)`` of the UTC day, for range predicates on timestamptz.'''
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+class ActivityRecord(BaseModel):
+    table = 'activity_records'
+    row_class = ActivityRecordRow
+    # NULL timestamps sort as the oldest; see idx_activity_records_user_*_sort
+    sort_defaults = {
+        'created_at': "'-infinity'::timestamptz",
+        'updated_at': "'-infinity'::timestamptz",
+    }
 
     @classmethod
-    def has_group_activity_in_week(
+    def check_duplicates(
         cls,
         user_id: int | str,
-        group_key: str,
+        activity_id: int,
         date_iso: str,
-        *,
         exclude_record_id: int | None = None,
-    ) -> bool:
-        if group_key == 'steps_weekly':
-            where = "a.category = 'Steps' AND a.name LIKE 'Weekly Steps%%'"
-        elif group_key == 'recovery_weekly_sleep':
-            where = (
-                "a.category = 'Recovery' AND a.name IN ("
-                "'A week of good sleep (7+ hours/day avg)',"
-                "'A week of great sleep (8+ hours/day avg)'"
-                ')'
-            )
-        elif group_key == 'diet_weekly_no_alcohol':
-            where = "a.category = 'Diet' AND a.name = 'Week of no Alcohol'"
-        else:
-            raise ValueError(f'Unknown weekly group_key: {group_key}')
+    ) -> DuplicateCheck:
+        '''Evaluate every duplicate rule for the activity in one query.
 
-        # Check within the same week as date_iso (Monday to Sunday)
+        Group rules come from activity_groups; the claims checked here are the
+        rows whose primary key rejects a conflicting insert, so a check that
+        loses a race still can't produce a duplicate.
+        '''
+        day = date.fromisoformat(date_iso)
         sql = (
-            'SELECT 1 FROM activity_records ar '
-            'JOIN activities a ON a.id = ar.activity_id '
-            f'WHERE ar.user_id = %s AND {where} '
-            "AND ar.date_occurred >= date_trunc('week', %s::date) "
-            "AND ar.date_occurred < date_trunc('week', %s::date) + INTERVAL '1 week'"
+            'SELECT g.key AS group_key, g.period AS period, g.label AS label, '
+            'EXISTS (SELECT 1 FROM activity_records '
+            'WHERE user_id = %s AND activity_id = %s AND date_occurred = %s '
+            'AND id IS DISTINCT FROM %s::integer) AS same_day, '
+            'EXISTS (SELECT 1 FROM activity_group_claims c '
+            'WHERE c.user_id = %s AND c.group_key = g.key '
+            "AND c.period_start = CASE g.period WHEN 'week' THEN %s ELSE %s END "
+            'AND c.record_id IS DISTINCT FROM %s::integer) AS group_taken '
+            'FROM (SELECT 1) AS one '
+            'LEFT JOIN activity_group_members m ON m.activity_id = %s '
+            'LEFT JOIN activity_groups g ON g.key = m.group_key'
+        )
+        params = (
+            user_id,
+            activity_id,
+            day,
+            exclude_record_id,
+            user_id,
+            week_start(day),
+            day,
+            exclude_record_id,
+            activity_id,
         )
-        params: list[Any] = [user_id, date_iso, date_iso]
-        if exclude_record_id is not None:
-            sql += ' AND ar.id <> %s'
-            params.append(exclude_record_id)
-        sql += ' LIMIT 1'
-
         with DBManager() as db:
-            row = db.fetchone(sql, tuple(params))
-        return row is not None
+            row = db.fetchone(sql, params)
+        if not row:
+            return DuplicateCheck(same_day=False)
+        return DuplicateCheck(
+            same_day=bool(row['same_day']),
+            group_key=row['group_key'],
+            period=row['period'],
+            group_label=row['label'],
+            group_taken=bool(row['group_taken']),
+        )
 
     @classmethod
     def insert(
@@ -128,50 +120,103 @@ class ActivityRecord(BaseModel):
         note: str | None,
         date_occurred: str,
         message_id: int | None = None,
+        guild_id: int | None = None,
     ) -> dict[str, Any]:
-        return cls.create(
-            {
-                'user_id': user_id,
-                'activity_id': activity_id,
-                'note': note,
-                'date_occurred': date_occurred,
-                'message_id': message_id,
-            }
-        )
+        '''Insert a record in one statement; ``{}`` if it is a duplicate.
 
-    @classmethod
-    def has_record_on_date(cls, user_id: int | str, date_iso: str) -> bool:
-        with DBManager() as db:
-            row = db.fetchone(
-                'SELECT 1 FROM activity_records '
-                'WHERE user_id = %s AND created_at::date = %s LIMIT 1',
-                (user_id, date.fromisoformat(date_iso)),
-            )
-        return row is not None
+        A second record of the activity on the same day hits
+        uq_activity_records_user_activity_day and inserts nothing; a taken
+        group day or week is rejected by activity_group_claims.
+        '''
+        try:
+            with DBManager() as db:
+                rows = db.fetchall(
+                    'INSERT INTO activity_records '
+                    '(user_id, activity_id, note, date_occurred, message_id, guild_id) '
+                    'VALUES (%s, %s, %s, %s, %s, %s) '
+                    'ON CONFLICT (user_id, activity_id, date_occurred) DO NOTHING '
+                    'RETURNING *',
+                    (user_id, activity_id, note, date_occurred, message_id, guild_id),
+                )
+        except errors.UniqueViolation:
+            return {}
+        rows = cast(list[dict[str, Any]], rows)
+        return cast(dict[str, Any], rows[0]) if rows else cast(dict[str, Any], {})
 
     @classmethod
     def has_any_record(cls, user_id: int | str, activity_id: int) -> bool:
         with DBManager() as db:
             row = db.fetchone(
-                'SELECT 1 FROM activity_records WHERE user_id = %s '
+                'SELECT 1 FROM activity_history WHERE user_id = %s '
                 'AND activity_id = %s LIMIT 1',
                 (user_id, activity_id),
             )
         return row is not None
 
+    @classmethod
+    def exists_many(cls, user_id: int | str, activity_ids: Iterable[int]) -> set[int]:
+        '''Return the subset of activity_ids the user has ever recorded.
+
+        Reads activity_history, which includes months archived as rollups.
+        '''
+        ids = list(dict.fromkeys(activity_ids))
+        if not ids:
+            return set()
+        with DBManager() as db:
+            rows = db.fetchall(
+                'SELECT DISTINCT activity_id FROM activity_history '
+                'WHERE user_id = %s AND activity_id = ANY(%s)',
+                (user_id, ids),
+            )
+        return {int(r['activity_id']) for r in rows}
+
+    @classmethod
+    def done_activity_ids_many(
+        cls, user_ids: Iterable[int | str]
+    ) -> dict[int, set[int]]:
+        '''Map each user to the set of activity ids they have ever recorded.'''
+        ids = list(dict.fromkeys(user_ids))
+        done: dict[int, set[int]] = {int(u): set() for u in ids}
+        if not ids:
+            return done
+        with DBManager() as db:
+            rows = db.fetchall(
+                'SELECT DISTINCT user_id, activity_id FROM activity_history '
+                'WHERE user_id = ANY(%s)',
+                (ids,),
+            )
+        for r in rows:
+            done[int(r['user_id'])].add(int(r['activity_id']))
+        return done
+
     @classmethod
     def recent_for_user(
         cls,
         user_id: int | str,
         limit: int,
         sort: Literal['occurred', 'created', 'updated'],
-    ) -> list[dict[str, Any]]:
-        if sort == 'created':
-            order_clause = 'ORDER BY ar.created_at DESC, ar.id DESC'
-        elif sort == 'updated':
-            order_clause = 'ORDER BY ar.updated_at DESC, ar.id DESC'
-        else:
-            order_clause = 'ORDER BY ar.date_occurred DESC, ar.id DESC'
+        compact: bool = False,
+        after: tuple[Any, int] | None = None,
+    ) -> list[Any]:
+        '''Most recent records first; pass ``after`` to fetch the next page.
+
+        ``after`` is ``(sort value, id)`` of the last row already shown, e.g.
+        ``(row['date_occurred'], row['id'])`` for the default sort.
+        '''
+        # Nullable timestamps sort through sort_defaults so NULL rows stay
+        # reachable; each expression has a matching (user_id, expr, id) index
+        sort_column, cursor_value = cls.sort_expression(
+            {'created': 'created_at', 'updated': 'updated_at'}.get(
+                sort, 'date_occurred'
+            ),
+            alias='ar',
+        )
+        params: list[Any] = [user_id]
+        keyset = ''
+        if after is not None:
+            keyset = f'AND ({sort_column}, ar.id) < ({cursor_value}, %s) '
+            params.extend(after)
+        params.append(limit)
         sql = (
             'SELECT '
             'ar.id AS id, '
@@ -180,25 +225,38 @@ class ActivityRecord(BaseModel):
             'ar.created_at AS created_at, '
             'ar.updated_at AS updated_at, '
             'ar.message_id AS message_id, '
+            'ar.activity_id AS activity_id, '
             'a.name AS activity_name, '
             'a.category AS category, '
             'a.xp_value AS xp_value '
             'FROM activity_records ar '
             'JOIN activities a ON a.id = ar.activity_id '
             'WHERE ar.user_id = %s AND a.is_archived = FALSE '
-            f'{order_clause} LIMIT %s'
+            f'{keyset}'
+            f'ORDER BY {sort_column} DESC, ar.id DESC LIMIT %s'
         )
         with DBManager() as db:
-            rows = db.fetchall(sql, (user_id, limit))
+            rows = db.fetchall(
+                sql,
+                tuple(params),
+                row_factory=namedtuple_row if compact else None,
+            )
         return cast(list[dict[str, Any]], rows)
 
     @classmethod
     def count_on_created_date(cls, user_id: int | str, date_iso: str) -> int:
+        '''Records the user created on the (UTC) day.
+
+        A half-open range on created_at, not ``created_at::date``, so the
+        count is a seek on idx_activity_records_user_created_id and does not
+        depend on the session time zone.
+        '''
+        start, end = utc_day_bounds(date.fromisoformat(date_iso))
         with DBManager() as db:
             row = db.fetchone(
                 'SELECT COUNT(*) AS cnt FROM activity_records '
-                'WHERE user_id = %s AND created_at::date = %s',
-                (user_id, date.fromisoformat(date_iso)),
+                'WHERE user_id = %s AND created_at >= %s AND created_at < %s',
+                (user_id, start, end),
             )
         return int(row['cnt']) if row and 'cnt' in row else 0
 
@@ -206,17 +264,30 @@ class ActivityRecord(BaseModel):
     def update_record(
         cls, record_id: int, activity_id: int, note: str | None, date_occurred: str
     ) -> dict[str, Any]:
-        with DBManager() as db:
-            rows = db.fetchall(
-                'UPDATE activity_records '
-                'SET activity_id = %s, note = %s, date_occurred = %s '
-                'WHERE id = %s RETURNING *',
-                (activity_id, note, date_occurred, record_id),
-            )
+        '''Update a record; ``{}`` if it is gone or a duplicate rule
+        rejected the change.'''
+        try:
+            with DBManager() as db:
+                rows = db.fetchall(
+                    'UPDATE activity_records '
+                    'SET activity_id = %s, note = %s, date_occurred = %s '
+                    'WHERE id = %s RETURNING *',
+                    (activity_id, note, date_occurred, record_id),
+                )
+        except errors.UniqueViolation:
+            return {}
         rows = cast(list[dict[str, Any]], rows)
+        if rows:
+            # Don't wait for the NOTIFY to drop the old day
+            activity_calendar.forget(rows[0]['user_id'])
         return cast(dict[str, Any], rows[0]) if rows else cast(dict[str, Any], {})
 
     @classmethod
     def delete_record(cls, record_id: int) -> None:
         with DBManager() as db:
-            db.execute('DELETE FROM activity_records WHERE id = %s', (record_id,))
+            row = db.fetchone(
+                'DELETE FROM activity_records WHERE id = %s RETURNING user_id',
+                (record_id,),
+            )
+        if row:
+            activity_calendar.forget(row['user_id'])
@@ -1,5 +1,6 @@
-from typing import Any, ClassVar, Iterable, Optional, Sequence, cast
+from typing import Any, ClassVar, Iterable, Iterator, Optional, Sequence, cast
 
+from psycopg.rows import class_row, namedtuple_row
 from psycopg.types.json import Json
 
 from src.database.db_manager import DBManager
@@ -8,33 +9,71 @@ from src.database.db_manager import DBManager
 class BaseModel:
     table: ClassVar[str]
     pk: ClassVar[str] = 'id'
+    # Slotted dataclass matching a full table row, used for compact=True reads
+    row_class: ClassVar[type | None] = None
+    # Nullable columns get_page may sort on, mapped to the SQL value NULL sorts
+    # as; each needs a matching COALESCE(col, value) index to seek on
+    sort_defaults: ClassVar[dict[str, str]] = {}
 
     @classmethod
-    def get(cls, id_value: Any) -> Optional[dict[str, Any]]:
+    def _row_factory(cls, compact: bool, columns: Sequence[str] | None = None) -> Any:
+        '''Row factory for compact reads; None keeps the default dict rows.'''
+        if not compact:
+            return None
+        # Projections don't fill every dataclass field, so use named tuples
+        if cls.row_class is None or columns:
+            return namedtuple_row
+        return class_row(cls.row_class)
+
+    @staticmethod
+    def _column_list(columns: Sequence[str] | None) -> str:
+        return ', '.join(columns) if columns else '*'
+
+    @classmethod
+    def get(
+        cls,
+        id_value: Any,
+        columns: Sequence[str] | None = None,
+        compact: bool = False,
+    ) -> Optional[Any]:
         with DBManager() as db:
             row = db.fetchone(
-                f'SELECT * FROM {cls.table} WHERE {cls.pk} = %s', (id_value,)
+                f'SELECT {cls._column_list(columns)} FROM {cls.table} '
+                f'WHERE {cls.pk} = %s',
+                (id_value,),
+                row_factory=cls._row_factory(compact, columns),
             )
         return cast(Optional[dict[str, Any]], row)
 
     @classmethod
     def get_one(
-        cls, where: str, params: Iterable[Any] = ()
-    ) -> Optional[dict[str, Any]]:
+        cls,
+        where: str,
+        params: Iterable[Any] = (),
+        columns: Sequence[str] | None = None,
+        compact: bool = False,
+    ) -> Optional[Any]:
         where_clause = f' WHERE {where}' if where else ''
         with DBManager() as db:
-            row = db.fetchone(f'SELECT * FROM {cls.table}{where_clause}', tuple(params))
+            row = db.fetchone(
+                f'SELECT {cls._column_list(columns)} FROM {cls.table}{where_clause}',
+                tuple(params),
+                row_factory=cls._row_factory(compact, columns),
+            )
         return cast(Optional[dict[str, Any]], row)
 
     @classmethod
-    def get_many(
+    def _select_sql(
         cls,
         where: str = '',
         params: Iterable[Any] = (),
         order_by: str = '',
         limit: Optional[int] = None,
-    ) -> list[dict[str, Any]]:
-        query_parts: list[str] = [f'SELECT * FROM {cls.table}']
+        columns: Sequence[str] | None = None,
+    ) -> tuple[str, tuple[Any, ...]]:
+        query_parts: list[str] = [
+            f'SELECT {cls._column_list(columns)} FROM {cls.table}'
+        ]
         parameters: tuple[Any, ...] = tuple(params)
 
         if where:
@@ -45,12 +84,144 @@ class BaseModel:
             query_parts.append('LIMIT %s')
             parameters = (*parameters, limit)
 
-        query = ' '.join(query_parts)
+        return ' '.join(query_parts), parameters
+
+    @classmethod
+    def get_many(
+        cls,
+        where: str = '',
+        params: Iterable[Any] = (),
+        order_by: str = '',
+        limit: Optional[int] = None,
+        columns: Sequence[str] | None = None,
+        compact: bool = False,
+    ) -> list[Any]:
+        query, parameters = cls._select_sql(where, params, order_by, limit, columns)
 
         with DBManager() as db:
-            rows = db.fetchall(query, parameters)
+            rows = db.fetchall(
+                query, parameters, row_factory=cls._row_factory(compact, columns)
+            )
         return cast(list[dict[str, Any]], rows)
 
+    @classmethod
+    def get_many_by_ids(
+        cls,
+        id_values: Iterable[Any],
+        columns: Sequence[str] | None = None,
+        compact: bool = False,
+    ) -> list[Any]:
+        '''Fetch several rows by primary key in a single query (order not kept).'''
+        ids = list(dict.fromkeys(id_values))
+        if not ids:
+            return []
+        return cls.get_many(
+            where=f'{cls.pk} = ANY(%s)', params=(ids,), columns=columns, compact=compact
+        )
+
+    @classmethod
+    def get_page(
+        cls,
+        sort_key: str | None = None,
+        after: tuple[Any, Any] | None = None,
+        limit: int = 25,
+        where: str = '',
+        params: Iterable[Any] = (),
+        columns: Sequence[str] | None = None,
+        descending: bool = True,
+        compact: bool = False,
+    ) -> list[Any]:
+        '''Return one page ordered by (sort_key, pk), resuming after a cursor.
+
+        ``after`` is the ``(sort_key value, pk value)`` of the last row of the
+        previous page (see ``page_cursor``). Paging seeks on the index instead of
+        scanning an OFFSET, so deep pages cost the same as the first one.
+
+        ``sort_key`` must be NOT NULL or listed in ``sort_defaults``: a row
+        comparison with NULL is never true, so NULL keys would drop out.
+        '''
+        sort_key = sort_key or cls.pk
+        if columns:
+            # The cursor columns must be selected to build the next cursor
+            columns = [*columns, *(c for c in (sort_key, cls.pk) if c not in columns)]
+
+        direction = 'DESC' if descending else 'ASC'
+        op = '<' if descending else '>'
+        conditions: list[str] = [f'({where})'] if where else []
+        parameters: tuple[Any, ...] = tuple(params)
+        if sort_key == cls.pk:
+            order_by = f'{cls.pk} {direction}'
+            if after is not None:
+                conditions.append(f'{cls.pk} {op} %s')
+                parameters = (*parameters, after[1])
+        else:
+            sort_expr, cursor_expr = cls.sort_expression(sort_key)
+            if (
+                after is not None
+                and after[0] is None
+                and sort_key not in cls.sort_defaults
+            ):
+                raise ValueError(
+                    f'{cls.table}.{sort_key} is NULL in the cursor; '
+                    'add it to sort_defaults to page on it'
+                )
+            order_by = f'{sort_expr} {direction}, {cls.pk} {direction}'
+            if after is not None:
+                conditions.append(f'({sort_expr}, {cls.pk}) {op} ({cursor_expr}, %s)')
+                parameters = (*parameters, after[0], after[1])
+
+        return cls.get_many(
+            where=' AND '.join(conditions),
+            params=parameters,
+            order_by=order_by,
+            limit=limit,
+            columns=columns,
+            compact=compact,
+        )
+
+    @classmethod
+    def sort_expression(cls, sort_key: str, alias: str = '') -> tuple[str, str]:
+        '''``(column expression, cursor placeholder)`` to sort and seek on.'''
+        column = f'{alias}.{sort_key}' if alias else sort_key
+        default = cls.sort_defaults.get(sort_key)
+        if default is None:
+            return column, '%s'
+        return f'COALESCE({column}, {default})', f'COALESCE(%s, {default})'
+
+    @classmethod
+    def page_cursor(cls, row: Any, sort_key: str | None = None) -> tuple[Any, Any]:
+        '''Build the ``after`` cursor for ``get_page`` from the last row of a page.'''
+        sort_key = sort_key or cls.pk
+        if isinstance(row, dict):
+            return row[sort_key], row[cls.pk]
+        return getattr(row, sort_key), getattr(row, cls.pk)
+
+    @classmethod
+    def iter_many(
+        cls,
+        where: str = '',
+        params: Iterable[Any] = (),
+        order_by: str = '',
+        limit: Optional[int] = None,
+        batch_size: int = 1000,
+        columns: Sequence[str] | None = None,
+        compact: bool = False,
+    ) -> Iterator[Any]:
+        '''Stream matching rows lazily instead of materializing them all.
+
+        The connection is held until the iterator is exhausted or closed, so
+        consume it promptly (or wrap it in ``contextlib.closing``).
+        '''
+        query, parameters = cls._select_sql(where, params, order_by, limit, columns)
+
+        with DBManager() as db:
+            yield from db.stream(
+                query,
+                parameters,
+                batch_size=batch_size,
+                row_factory=cls._row_factory(compact, columns),
+            )
+
     @classmethod
     def create(cls, values: dict[str, Any]) -> dict[str, Any]:
         cols = list(values.keys())
@@ -0,0 +1,21 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from src.models.base import BaseModel
+
+
+class BotState(BaseModel):
+    table = 'bot_state'
+    pk = 'key'
+
+    @classmethod
+    def get_value(cls, key: str) -> Optional[str]:
+        row = cls.get(key, columns=('value',))
+        return row['value'] if row else None
+
+    @classmethod
+    def set_value(cls, key: str, value: str) -> None:
+        cls.upsert(
+            ('key',),
+            {'key': key, 'value': value, 'updated_at': datetime.now(timezone.utc)},
+        )
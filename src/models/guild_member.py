@@ -0,0 +1,16 @@
+from src.database.db_manager import DBManager
+from src.models.base import BaseModel
+
+
+class GuildMember(BaseModel):
+    table = 'guild_members'
+
+    @classmethod
+    def join(cls, guild_id: int, user_id: int | str) -> None:
+        '''Record that the user belongs to the guild (idempotent).'''
+        with DBManager() as db:
+            db.execute(
+                'INSERT INTO guild_members (guild_id, user_id) VALUES (%s, %s) '
+                'ON CONFLICT DO NOTHING',
+                (guild_id, user_id),
+            )
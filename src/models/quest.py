@@ -1,12 +1,26 @@
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Optional, cast
 
 from src.database.db_manager import DBManager
 from src.models.base import BaseModel
+from src.utils.constants import QUEST_NEW_ACTIVITY_BONUS_XP, QUEST_XP
+
+
+@dataclass(slots=True)
+class QuestRow:
+    id: int
+    user_id: int
+    activity_id: int
+    deadline: datetime
+    is_new_bonus: bool
+    created_at: datetime | None
+    guild_id: int | None = None
 
 
 class Quest(BaseModel):
     table = 'user_quests'
+    row_class = QuestRow
 
     @classmethod
     def create_new(
@@ -17,7 +31,7 @@ class Quest(BaseModel):
         is_new_bonus: bool = False,
     ) -> dict[str, Any]:
         return cls.upsert(
-            ('id',),
+            ('user_id',),
             {
                 'user_id': user_id,
                 'activity_id': activity_id,
@@ -26,14 +40,85 @@ class Quest(BaseModel):
             },
         )
 
+    @classmethod
+    def accept(
+        cls,
+        user_id: int | str,
+        activity_id: int,
+        deadline: datetime,
+        is_new_bonus: bool = False,
+        guild_id: int | None = None,
+    ) -> Optional[dict[str, Any]]:
+        '''
+        Accept a quest from the user's roll in one transaction: the roll is
+        marked accepted and the quest inserted together, or neither happens.
+        Returns None if the roll was already accepted or a quest is still active.
+        '''
+        # An expired quest the sweeper hasn't reached yet would block the insert
+        # on the one-quest-per-user constraint. It is deleted by its own
+        # statement: the parts of one WITH statement share a snapshot, so the
+        # INSERT would still see a row deleted alongside it.
+        clear_expired = (
+            'DELETE FROM user_quests WHERE user_id = %s AND deadline <= NOW()'
+        )
+        # Concurrent accepts serialize on the quest_rolls row lock; the loser
+        # re-checks has_accepted and inserts nothing
+        sql = (
+            'WITH roll AS ('
+            'UPDATE quest_rolls SET has_accepted = TRUE, updated_at = NOW() '
+            'WHERE user_id = %s AND has_accepted = FALSE '
+            'AND NOT EXISTS ('
+            'SELECT 1 FROM user_quests WHERE user_id = %s AND deadline > NOW()'
+            ') RETURNING user_id'
+            ') '
+            'INSERT INTO user_quests '
+            '(user_id, activity_id, deadline, is_new_bonus, guild_id) '
+            'SELECT user_id, %s, %s, %s, %s FROM roll '
+            'RETURNING *'
+        )
+        with DBManager() as db:
+            db.execute(clear_expired, (user_id,))
+            row = db.fetchone(
+                sql,
+                (user_id, user_id, activity_id, deadline, is_new_bonus, guild_id),
+            )
+        return cast(Optional[dict[str, Any]], row)
+
+    @classmethod
+    def complete(cls, user_id: int | str, activity_id: int) -> Optional[dict[str, Any]]:
+        '''
+        Complete the user's active quest for this activity and award its XP in
+        one statement. Returns ``{'id', 'is_new_bonus', 'bonus_xp'}``, or None
+        when there is no matching unexpired quest (or another request won).
+        '''
+        sql = (
+            'WITH done AS ('
+            'DELETE FROM user_quests '
+            'WHERE user_id = %s AND activity_id = %s AND deadline > NOW() '
+            'RETURNING id, is_new_bonus, '
+            '%s + CASE WHEN is_new_bonus THEN %s ELSE 0 END AS bonus_xp'
+            ') '
+            'UPDATE users u '
+            'SET total_xp = u.total_xp + done.bonus_xp, updated_at = NOW() '
+            'FROM done WHERE u.id = %s '
+            'RETURNING done.id, done.is_new_bonus, done.bonus_xp'
+        )
+        with DBManager() as db:
+            row = db.fetchone(
+                sql,
+                (user_id, activity_id, QUEST_XP, QUEST_NEW_ACTIVITY_BONUS_XP, user_id),
+            )
+        return cast(Optional[dict[str, Any]], row)
+
     @classmethod
     def get_active(cls, user_id: int | str) -> Optional[dict[str, Any]]:
+        '''Unexpired quest, if any; expired rows are left for the sweeper.'''
         sql = (
             'SELECT uq.id, uq.user_id, uq.activity_id, uq.deadline, uq.is_new_bonus, '
             'a.name as activity_name, a.category as activity_category, a.xp_value '
             'FROM user_quests uq '
             'JOIN activities a ON uq.activity_id = a.id '
-            'WHERE uq.user_id = %s '
+            'WHERE uq.user_id = %s AND uq.deadline > NOW() '
             'ORDER BY uq.deadline ASC LIMIT 1'
         )
         with DBManager() as db:
@@ -44,3 +129,19 @@ class Quest(BaseModel):
     def delete_quest(cls, quest_id: int) -> None:
         with DBManager() as db:
             db.execute('DELETE FROM user_quests WHERE id = %s', (quest_id,))
+
+    @classmethod
+    def delete_expired(cls, batch_size: int = 5000) -> int:
+        '''Bulk-delete expired quests in batches; returns how many were removed.'''
+        deleted = 0
+        while True:
+            with DBManager() as db:
+                rows = db.fetchall(
+                    'DELETE FROM user_quests WHERE id IN ('
+                    'SELECT id FROM user_quests WHERE deadline <= NOW() LIMIT %s'
+                    ') RETURNING id',
+                    (batch_size,),
+                )
+            deleted += len(rows)
+            if len(rows) < batch_size:
+                return deleted
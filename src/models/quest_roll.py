@@ -1,10 +1,20 @@
+import random
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from psycopg.types.json import Json
 
+from src.database.db_manager import DBManager
+from src.models.activity import Activity
+from src.models.activity_catalog import catalog
+from src.models.activity_record import ActivityRecord
 from src.models.base import BaseModel
 
+# Relative chance of rolling an activity the user has never recorded
+NEW_ACTIVITY_WEIGHT = 3.0
+# Users who recorded something this recently get rolls pre-generated
+ACTIVE_USER_DAYS = 14
+
 
 class QuestRoll(BaseModel):
     table = 'quest_rolls'
@@ -57,8 +67,98 @@ class QuestRoll(BaseModel):
             }
         )
 
+    @classmethod
+    def sample_activities(
+        cls, user_id: int | str, count: int = 5, rng: random.Random | None = None
+    ) -> list[dict[str, Any]]:
+        '''
+        Roll quest candidates from the activity catalog, favouring activities the
+        user has never recorded. Each row gets an ``is_new`` flag; both come from
+        a single set-membership query.
+        '''
+        active_ids = [a['id'] for a in catalog.all(active_only=True)]
+        done_ids = ActivityRecord.exists_many(user_id, active_ids)
+        return cls._sample(done_ids, count, rng)
+
+    @staticmethod
+    def _sample(
+        done_ids: set[int], count: int, rng: random.Random | None
+    ) -> list[dict[str, Any]]:
+        picks = Activity.get_random(
+            count,
+            weight=lambda a: 1.0 if a['id'] in done_ids else NEW_ACTIVITY_WEIGHT,
+            rng=rng,
+        )
+        for pick in picks:
+            pick['is_new'] = pick['id'] not in done_ids
+        return picks
+
     @classmethod
     def mark_accepted(cls, user_id: int | str) -> None:
         cls.update(
             user_id, {'has_accepted': True, 'updated_at': datetime.now(timezone.utc)}
         )
+
+    @classmethod
+    def users_due(
+        cls, after: int = 0, limit: int = 500, active_days: int = ACTIVE_USER_DAYS
+    ) -> list[int]:
+        '''Recently active users with a missing or expired roll, ordered by id.'''
+        sql = (
+            'SELECT u.id FROM users u '
+            'LEFT JOIN quest_rolls qr ON qr.user_id = u.id '
+            'WHERE u.id > %s '
+            "AND (qr.user_id IS NULL OR qr.date_rolled < NOW() - INTERVAL '7 days') "
+            'AND EXISTS ('
+            'SELECT 1 FROM activity_records ar WHERE ar.user_id = u.id '
+            'AND ar.created_at >= NOW() - make_interval(days => %s)'
+            ') '
+            'ORDER BY u.id ASC LIMIT %s'
+        )
+        with DBManager() as db:
+            rows = db.fetchall(sql, (after, active_days, limit))
+        return [int(r['id']) for r in rows]
+
+    @classmethod
+    def pregenerate(
+        cls,
+        batch_size: int = 500,
+        count: int = 5,
+        rng: random.Random | None = None,
+    ) -> int:
+        '''
+        Roll the next week's quests ahead of time for recently active users
+        whose roll is missing or expired, ``batch_size`` users at a time.
+        Returns the number of rolls written.
+        '''
+        written = 0
+        after = 0
+        while True:
+            user_ids = cls.users_due(after=after, limit=batch_size)
+            if not user_ids:
+                return written
+            done = ActivityRecord.done_activity_ids_many(user_ids)
+            rolls = [
+                Json([a['id'] for a in cls._sample(done[user_id], count, rng)])
+                for user_id in user_ids
+            ]
+            with DBManager() as db:
+                # The WHERE keeps a roll the user made in the meantime; only
+                # rows actually written come back
+                rows = db.fetchall(
+                    'INSERT INTO quest_rolls '
+                    '(user_id, activity_ids, date_rolled, has_accepted, updated_at) '
+                    'SELECT r.user_id, r.activity_ids, NOW(), FALSE, NOW() '
+                    'FROM unnest(%s::bigint[], %s::jsonb[]) '
+                    'AS r(user_id, activity_ids) '
+                    'ON CONFLICT (user_id) DO UPDATE SET '
+                    'activity_ids = EXCLUDED.activity_ids, '
+                    'date_rolled = EXCLUDED.date_rolled, '
+                    'has_accepted = FALSE, '
+                    'updated_at = EXCLUDED.updated_at '
+                    "WHERE quest_rolls.date_rolled < NOW() - INTERVAL '7 days' "
+                    'RETURNING user_id',
+                    (user_ids, rolls),
+                )
+            written += len(rows)
+            after = user_ids[-1]
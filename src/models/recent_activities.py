@@ -0,0 +1,137 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from src.database.notifications import NotificationListener
+from src.models.activity_calendar import RECORDS_CHANNEL, RecordsChange
+from src.models.activity_catalog import catalog
+from src.models.activity_record import ActivityRecord
+
+
+class RecentActivities:
+    '''Bounded LRU of each member's most recently recorded activity ids.
+
+    Holds at most ``max_users`` members with ``per_user`` ids each, evicting
+    the least recently active member first, so memory stays flat however many
+    members the guild has. Members are seeded from the database the first time
+    they are looked up and kept current by ``record`` on every /record. While
+    attached to a NotificationListener, a member is dropped (and reseeded on
+    next use) whenever their records change in any process, except for the
+    echoes of this process's own inserts.
+    '''
+
+    def __init__(self, max_users: int = 20_000, per_user: int = 10):
+        self.max_users = max_users
+        self.per_user = per_user
+        # user_id -> activity ids, most recent first
+        self._users: OrderedDict[int, list[int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._users
+
+    def _store(self, user_id: int, activity_ids: list[int]) -> None:
+        # Caller holds the lock
+        self._users[user_id] = activity_ids
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+
+    def get(self, user_id: int) -> Optional[list[int]]:
+        '''Cached recent ids, or None when the member has not been seeded.'''
+        with self._lock:
+            ids = self._users.get(int(user_id))
+            if ids is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._users.move_to_end(int(user_id))
+            return list(ids)
+
+    def load(self, user_id: int) -> list[int]:
+        '''Return the member's recent ids, seeding them from the database.'''
+        ids = self.get(user_id)
+        if ids is not None:
+            return ids
+        # Several records can share an activity, so over-fetch before deduping
+        rows = ActivityRecord.recent_for_user(
+            user_id, limit=self.per_user * 3, sort='created', compact=True
+        )
+        ids = list(dict.fromkeys(int(r.activity_id) for r in rows))[: self.per_user]
+        with self._lock:
+            # A /record may have landed while we were querying; keep its order
+            current = self._users.get(int(user_id))
+            if current is not None:
+                return list(current)
+            self._store(int(user_id), ids)
+        return list(ids)
+
+    def record(self, user_id: int, activity_id: int) -> None:
+        '''Move an activity to the front of a seeded member's list.'''
+        with self._lock:
+            ids = self._users.get(int(user_id))
+            if ids is None:
+                # Unseeded members pick it up from the database when seeded
+                return
+            ids = [int(activity_id), *(i for i in ids if i != int(activity_id))]
+            self._store(int(user_id), ids[: self.per_user])
+
+    def forget(self, user_id: int) -> None:
+        with self._lock:
+            self._users.pop(int(user_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+    def _on_records_changed(self, payload: Optional[str]) -> None:
+        if not payload:
+            # Reconnected (changes may have been missed) or truncated
+            self.clear()
+            return
+        change = RecordsChange.parse(payload)
+        # record() already applied this process's own inserts
+        if not change.own_insert:
+            self.forget(change.user_id)
+
+    def attach(self, listener: NotificationListener) -> None:
+        '''Drop members whose records changed, as NOTIFYed by any process.'''
+        listener.subscribe(RECORDS_CHANNEL, self._on_records_changed)
+
+    def stats(self) -> dict[str, Any]:
+        hits, misses = self.hits, self.misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else None,
+            'size': len(self._users),
+        }
+
+    def boost(self, user_id: int, category: str | None = None) -> dict[str, float]:
+        '''Autocomplete boost scores, most recently recorded highest.
+
+        Scores activity names within ``category``, or categories when None.
+        '''
+        ids = self.get(user_id) or []
+        scores: dict[str, float] = {}
+        for rank, activity_id in enumerate(ids):
+            row = catalog.get(activity_id)
+            if row is None or row['is_archived']:
+                continue
+            if category is None:
+                label = row['category']
+            elif row['category'] == category:
+                label = row['name']
+            else:
+                continue
+            scores.setdefault(label, float(len(ids) - rank))
+        return scores
+
+
+# Shared recent-activity cache for the process
+recent_activities = RecentActivities()
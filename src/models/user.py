@@ -1,40 +1,74 @@
+from dataclasses import dataclass
+from datetime import date, datetime
 from typing import Any, Optional, cast
 
+from psycopg.rows import namedtuple_row
+
 from src.database.db_manager import DBManager
 from src.models.base import BaseModel
 from src.utils.constants import DAILY_BONUS_XP
 
 
+@dataclass(slots=True)
+class UserRow:
+    id: int
+    display_name: str
+    total_xp: int
+    level: int
+    email: str | None
+    password: str | None
+    is_admin: bool
+    is_active: bool
+    last_login: datetime | None
+    created_at: datetime | None
+    updated_at: datetime | None
+
+
 class User(BaseModel):
     table = 'users'
     pk = 'id'
+    row_class = UserRow
 
     @classmethod
     def upsert_user(cls, user_id: int | str, display_name: str) -> dict[str, Any]:
         return cls.upsert(('id',), {'id': user_id, 'display_name': display_name})
 
     @classmethod
-    def add_daily_bonus(cls, user_id: int | str, bonus: int = DAILY_BONUS_XP) -> None:
+    def add_daily_bonus(
+        cls, user_id: int | str, day: date, bonus: int = DAILY_BONUS_XP
+    ) -> bool:
+        '''Pay the daily bonus for ``day`` unless it already was; True if paid.
+
+        The daily_bonus_awards primary key decides, so concurrent first
+        records of a day pay it once.
+        '''
         with DBManager() as db:
-            db.execute(
-                'UPDATE users '
-                'SET total_xp = total_xp + %s, updated_at = CURRENT_TIMESTAMP '
-                'WHERE id = %s',
-                (bonus, user_id),
+            row = db.fetchone(
+                'WITH awarded AS ('
+                'INSERT INTO daily_bonus_awards (user_id, day, xp) '
+                'VALUES (%s, %s, %s) '
+                'ON CONFLICT (user_id, day) DO NOTHING RETURNING user_id, xp) '
+                'UPDATE users SET total_xp = users.total_xp + awarded.xp, '
+                'updated_at = CURRENT_TIMESTAMP '
+                'FROM awarded WHERE users.id = awarded.user_id RETURNING users.id',
+                (user_id, day, bonus),
             )
+        return row is not None
 
     @classmethod
-    def remove_daily_bonus(
-        cls, user_id: int | str, bonus: int = DAILY_BONUS_XP
-    ) -> None:
+    def remove_daily_bonus(cls, user_id: int | str, day: date) -> bool:
+        '''Take back the daily bonus paid for ``day``; True if there was one.'''
         with DBManager() as db:
-            db.execute(
-                'UPDATE users '
-                'SET total_xp = '
-                'GREATEST(total_xp - %s, 0), updated_at = CURRENT_TIMESTAMP '
-                'WHERE id = %s',
-                (bonus, user_id),
+            row = db.fetchone(
+                'WITH revoked AS ('
+                'DELETE FROM daily_bonus_awards WHERE user_id = %s AND day = %s '
+                'RETURNING user_id, xp) '
+                'UPDATE users SET total_xp = GREATEST(users.total_xp - revoked.xp, 0), '
+                'updated_at = CURRENT_TIMESTAMP '
+                'FROM revoked WHERE users.id = revoked.user_id RETURNING users.id',
+                (user_id, day),
             )
+        return row is not None
 
     @classmethod
     def get_profile(cls, user_id: int | str) -> Optional[dict[str, Any]]:
@@ -47,11 +81,36 @@ class User(BaseModel):
         return cast(Optional[dict[str, Any]], row)
 
     @classmethod
-    def leaderboard_top(cls, limit: int) -> list[dict[str, Any]]:
+    def leaderboard_top(
+        cls, limit: int, compact: bool = False, guild_id: int | None = None
+    ) -> list[Any]:
+        '''Top users by XP; with ``guild_id``, that guild's members ranked by
+        the XP their records in it earned (returned as ``total_xp``).
+
+        Records in archived (detached) partitions no longer count there.
+        '''
+        if guild_id is None:
+            sql = (
+                'SELECT display_name, level, total_xp '
+                'FROM users ORDER BY total_xp DESC LIMIT %s'
+            )
+            params: tuple[Any, ...] = (limit,)
+        else:
+            # users.total_xp is earned across every guild; sum this guild's
+            # records instead (a range of idx_activity_records_guild_occurred)
+            sql = (
+                'SELECT u.display_name, u.level, COALESCE(g.xp, 0) AS total_xp '
+                'FROM guild_members gm JOIN users u ON u.id = gm.user_id '
+                'LEFT JOIN ('
+                'SELECT ar.user_id, SUM(a.xp_value) AS xp '
+                'FROM activity_records ar JOIN activities a ON a.id = ar.activity_id '
+                'WHERE ar.guild_id = %s GROUP BY ar.user_id'
+                ') g ON g.user_id = gm.user_id '
+                'WHERE gm.guild_id = %s ORDER BY total_xp DESC, u.id LIMIT %s'
+            )
+            params = (guild_id, guild_id, limit)
         with DBManager() as db:
             rows = db.fetchall(
-                'SELECT display_name, level, total_xp '
-                'FROM users ORDER BY total_xp DESC LIMIT %s',
-                (limit,),
+                sql, params, row_factory=namedtuple_row if compact else None
             )
         return cast(list[dict[str, Any]], rows)
@@ -1,5 +1,20 @@
+from typing import Iterable
+
 from src.models.base import BaseModel
 
 
 class UserAchievement(BaseModel):
     table = 'user_achievements'
+
+    @classmethod
+    def earned_ids(cls, user_id: int | str, achievement_ids: Iterable[int]) -> set[int]:
+        '''Return the subset of achievement_ids the user has already earned.'''
+        ids = list(dict.fromkeys(achievement_ids))
+        if not ids:
+            return set()
+        rows = cls.get_many(
+            where='user_id = %s AND achievement_id = ANY(%s)',
+            params=(user_id, ids),
+            columns=('achievement_id',),
+        )
+        return {int(r['achievement_id']) for r in rows}
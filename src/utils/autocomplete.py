@@ -0,0 +1,119 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Iterable, Iterator, Mapping, Optional
+
+# Discord rejects autocomplete responses with more than 25 choices
+MAX_CHOICES = 25
+# Queries up to this length are looked up directly in the n-gram table
+_MAX_GRAM = 3
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _grams(text: str, n: int) -> set[str]:
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+class AutocompleteIndex:
+    '''Immutable prefix/substring index over a fixed list of labels.
+
+    Labels are lowercased and tokenized once at build time. Lookups rank whole
+    label prefixes first, then word prefixes ("press" finds "Bench Press"),
+    then plain substrings; ties go to the caller's boost scores (e.g. the
+    user's recent activities) and then to alphabetical order.
+    '''
+
+    def __init__(self, labels: Iterable[str]):
+        self._labels: list[str] = sorted(dict.fromkeys(labels), key=str.lower)
+        self._lowered = [label.lower() for label in self._labels]
+
+        # Sorted (word, label index) pairs: a flat trie walked with bisect
+        words = sorted(
+            (word, i)
+            for i, low in enumerate(self._lowered)
+            for word in {low, *_TOKEN_RE.findall(low)}
+        )
+        self._words = [w for w, _ in words]
+        self._word_ids = [i for _, i in words]
+
+        # 1..3-gram -> sorted label indexes, so substring candidates come out in
+        # rank order without scanning every label
+        grams: defaultdict[str, set[int]] = defaultdict(set)
+        for i, low in enumerate(self._lowered):
+            for n in range(1, _MAX_GRAM + 1):
+                for gram in _grams(low, n):
+                    grams[gram].add(i)
+        self._grams = {g: tuple(sorted(ids)) for g, ids in grams.items()}
+        self._ids = {label: i for i, label in enumerate(self._labels)}
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def _full_prefix_ids(self, query: str) -> Iterator[int]:
+        pos = bisect_left(self._lowered, query)
+        while pos < len(self._lowered) and self._lowered[pos].startswith(query):
+            yield pos
+            pos += 1
+
+    def _word_prefix_ids(self, query: str) -> Iterator[int]:
+        ids: set[int] = set()
+        pos = bisect_left(self._words, query)
+        while pos < len(self._words) and self._words[pos].startswith(query):
+            ids.add(self._word_ids[pos])
+            pos += 1
+        return iter(sorted(ids))
+
+    def _substring_ids(self, query: str) -> Iterator[int]:
+        if len(query) <= _MAX_GRAM:
+            return iter(self._grams.get(query, ()))
+        postings = [self._grams.get(g, ()) for g in _grams(query, _MAX_GRAM)]
+        candidates = set(min(postings, key=len))
+        for posting in postings:
+            candidates.intersection_update(posting)
+        return iter(sorted(i for i in candidates if query in self._lowered[i]))
+
+    def _tiers(self, query: str) -> Iterator[Callable[[], Iterator[int]]]:
+        if not query:
+            yield lambda: iter(range(len(self._labels)))
+            return
+        yield lambda: self._full_prefix_ids(query)
+        yield lambda: self._word_prefix_ids(query)
+        yield lambda: self._substring_ids(query)
+
+    def search(
+        self,
+        query: str | None,
+        limit: int = MAX_CHOICES,
+        boost: Optional[Mapping[str, float]] = None,
+    ) -> list[str]:
+        '''Return up to ``limit`` labels matching ``query``, best first.'''
+        q = (query or '').strip().lower()
+        # Boosted labels lead their tier, highest score first
+        boosted = [
+            self._ids[label]
+            for label, _ in sorted(
+                (boost or {}).items(), key=lambda item: item[1], reverse=True
+            )
+            if label in self._ids
+        ]
+
+        ranked: list[int] = []
+        seen: set[int] = set()
+        for tier in self._tiers(q):
+            if len(ranked) >= limit:
+                break
+            if boosted:
+                members = set(tier())
+                for i in boosted:
+                    if i in members and i not in seen:
+                        ranked.append(i)
+                        seen.add(i)
+            # Tiers yield ascending (alphabetical) ids, so stop once full
+            for i in tier():
+                if len(ranked) >= limit:
+                    break
+                if i not in seen:
+                    ranked.append(i)
+                    seen.add(i)
+        return [self._labels[i] for i in ranked[:limit]]
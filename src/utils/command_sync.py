@@ -0,0 +1,68 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Optional
+
+import discord
+from discord import app_commands
+
+from src.models.bot_state import BotState
+from src.utils.tracing import add_span_metadata, trace_span
+
+logger = logging.getLogger(__name__)
+
+
+def dev_guild() -> Optional[discord.Object]:
+    '''The development guild from GUILD_ID, or None to sync commands globally.
+
+    Guild commands update instantly while global ones take a while to reach
+    every guild, so GUILD_ID scopes the sync during development.
+    '''
+    guild_id = os.getenv('GUILD_ID')
+    return discord.Object(id=int(guild_id)) if guild_id else None
+
+
+def command_tree_hash(
+    tree: app_commands.CommandTree, guild: Optional[discord.Object] = None
+) -> str:
+    '''Stable hash of the command payload ``tree.sync(guild=guild)`` would send.'''
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda c: (c['name'], c.get('type', 1)),
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _state_key(guild: Optional[discord.Object]) -> str:
+    return f'command_tree_hash:{guild.id if guild else "global"}'
+
+
+async def sync_command_tree(
+    tree: app_commands.CommandTree,
+    guild: Optional[discord.Object] = None,
+    force: bool = False,
+) -> bool:
+    '''Sync global (or one guild's) commands to Discord unless unchanged.
+
+    The hash of the last synced tree is kept in ``bot_state``, so restarts
+    and gateway reconnects skip the rate-limited sync when nothing changed.
+    Returns whether a sync was performed.
+    '''
+    scope = str(guild.id) if guild else 'global'
+    with trace_span('bot.command_sync', {'scope': scope, 'force': force}):
+        tree_hash = command_tree_hash(tree, guild)
+        if not force:
+            stored = await asyncio.to_thread(BotState.get_value, _state_key(guild))
+            if stored == tree_hash:
+                add_span_metadata('synced', False)
+                logger.info(f'Commands unchanged ({scope}); sync skipped')
+                return False
+
+        await tree.sync(guild=guild)
+        await asyncio.to_thread(BotState.set_value, _state_key(guild), tree_hash)
+        add_span_metadata('synced', True)
+        logger.info(f'Synced commands ({scope})')
+        return True
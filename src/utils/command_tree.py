@@ -0,0 +1,52 @@
+from discord import Interaction, InteractionType, app_commands
+
+from src.database.db_manager import DatabaseBusyError
+from src.utils.tracing import add_span_metadata, trace_span
+
+BUSY_MESSAGE = '⏳ The bot is busy right now. Please try again in a moment.'
+
+
+async def reply_busy(interaction: Interaction) -> None:
+    '''Tell the user the database is saturated instead of a generic failure.'''
+    add_span_metadata('busy', True)
+    if interaction.response.is_done():
+        await interaction.followup.send(BUSY_MESSAGE, ephemeral=True)
+    else:
+        await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
+
+
+def command_span_name(command: str) -> str:
+    '''Span name recorded for every invocation of the /``command`` slash command.'''
+    return f'command.{command}'
+
+
+class TracedCommandTree(app_commands.CommandTree):
+    '''Command tree that wraps each interaction it dispatches in a root span.
+
+    Slash commands are traced as ``command.<name>`` and autocomplete requests
+    as ``autocomplete.<name>``, so the latency aggregator keeps per-command
+    percentiles without every cog instrumenting itself.
+    '''
+
+    async def _call(self, interaction: Interaction) -> None:
+        data = interaction.data or {}
+        name = str(data.get('name', 'unknown'))
+        if interaction.type is InteractionType.autocomplete:
+            span_name = f'autocomplete.{name}'
+        else:
+            span_name = command_span_name(name)
+
+        with trace_span(span_name, {'user_id': interaction.user.id}):
+            await super()._call(interaction)
+            if interaction.command_failed:
+                add_span_metadata('failed', True)
+
+    async def on_error(
+        self, interaction: Interaction, error: app_commands.AppCommandError
+    ) -> None:
+        original = getattr(error, 'original', error)
+        if not isinstance(original, DatabaseBusyError):
+            await super().on_error(interaction, error)
+            return
+        # View and Modal callbacks don't come through here; see components.base
+        await reply_busy(interaction)
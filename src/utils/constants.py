@@ -1,6 +1,8 @@
 TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'  # For SQLite TIMESTAMP
 
 DAILY_BONUS_XP = 10
+QUEST_XP = 50
+QUEST_NEW_ACTIVITY_BONUS_XP = 100
 
 HEALTH_FACTS = [
     'Walking after meals may not fix your metabolism, but it will remind you that time is fleeting.',  # noqa: E501
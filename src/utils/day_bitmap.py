@@ -0,0 +1,89 @@
+'''One-bit-per-day calendars, as stored in user_activity_days.
+
+Bit ``n`` stands for ``EPOCH + n days`` and is bit ``n % 8`` of byte ``n // 8``
+(least significant first). That is Postgres' own ``get_bit``/``set_bit`` order
+for ``bytea``, and the order of ``int.from_bytes(data, 'little')``.
+
+Scans read 64 days at a time: a run of active days costs one step per word,
+not one per day.
+'''
+
+from datetime import date, timedelta
+
+EPOCH = date(1970, 1, 1)
+_WORD_BYTES = 8
+_WORD_BITS = _WORD_BYTES * 8
+_FULL_WORD = (1 << _WORD_BITS) - 1
+
+
+def day_index(day: date) -> int:
+    return (day - EPOCH).days
+
+
+def index_day(index: int) -> date:
+    return EPOCH + timedelta(days=index)
+
+
+def _word(data: bytes, word: int) -> int:
+    return int.from_bytes(data[word * _WORD_BYTES : (word + 1) * _WORD_BYTES], 'little')
+
+
+def has_bit(data: bytes, index: int) -> bool:
+    if index < 0 or index >= len(data) * 8:
+        return False
+    return bool(data[index >> 3] >> (index & 7) & 1)
+
+
+def set_bit(data: bytes, index: int, value: bool = True) -> bytes:
+    '''Copy of ``data`` with the bit set or cleared, grown as needed.'''
+    if index < 0:
+        return data
+    if index >= len(data) * 8:
+        if not value:
+            return data
+        data = data + bytes(index // 8 + 1 - len(data))
+    buf = bytearray(data)
+    if value:
+        buf[index >> 3] |= 1 << (index & 7)
+    else:
+        buf[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+    return bytes(buf)
+
+
+def run_length_ending(data: bytes, index: int) -> int:
+    '''Number of consecutive set bits ending at (and including) ``index``.'''
+    if not has_bit(data, index):
+        return 0
+    word, bit = divmod(index, _WORD_BITS)
+    # Only bits at or below ``index`` count in its own word
+    width = bit + 1
+    run = 0
+    while word >= 0:
+        mask = _FULL_WORD if width == _WORD_BITS else (1 << width) - 1
+        gaps = ~_word(data, word) & mask
+        if gaps:
+            # The highest clear bit ends the run
+            return run + width - gaps.bit_length()
+        run += width
+        word -= 1
+        width = _WORD_BITS
+    return run
+
+
+def count_between(data: bytes, start: int, end: int) -> int:
+    '''Number of set bits with ``start <= index <= end``.'''
+    start = max(start, 0)
+    end = min(end, len(data) * 8 - 1)
+    if start > end:
+        return 0
+    first, last = start // _WORD_BITS, end // _WORD_BITS
+    total = 0
+    for word in range(first, last + 1):
+        value = _word(data, word)
+        if word == first:
+            value >>= start % _WORD_BITS
+            value <<= start % _WORD_BITS
+        if word == last:
+            value &= (1 << (end % _WORD_BITS + 1)) - 1
+        total += value.bit_count()
+    return total
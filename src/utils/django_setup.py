@@ -0,0 +1,36 @@
+import os
+import sys
+import threading
+
+_lock = threading.Lock()
+_ready = False
+
+# Repository's web/ directory, holding the Django project ('core', 'dashboard')
+WEB_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'web',
+)
+
+
+def ensure_django() -> None:
+    '''Import and configure Django exactly once per process.
+
+    ``django.setup()`` imports every installed app and is slow, so call this
+    from a worker thread (``asyncio.to_thread``), never on the event loop.
+    '''
+    global _ready
+    if _ready:
+        return
+    with _lock:
+        if _ready:
+            return
+        import django
+        from django.conf import settings
+
+        # Add the 'web' directory to Python's path so Django can find 'dashboard'
+        if WEB_DIR not in sys.path:
+            sys.path.append(WEB_DIR)
+        if not settings.configured:
+            os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+            django.setup()
+        _ready = True
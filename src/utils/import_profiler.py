@@ -0,0 +1,80 @@
+'''Trace module imports as spans, like ``python -X importtime`` but as a tree.
+
+While ``profile_imports()`` is active every module executed for the first time
+is wrapped in an ``import.<module>`` span. Nested imports nest naturally, so
+the exported trace shows which import pulled in which and how long each took
+(inclusive of its children, like the cumulative column of ``-X importtime``).
+'''
+
+import importlib.abc
+import sys
+import threading
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Iterator, Optional, Sequence
+
+from src.utils.tracing import trace_span
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader: Any, name: str):
+        self._loader = loader
+        self._name = name
+
+    def create_module(self, spec) -> Optional[ModuleType]:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        try:
+            with trace_span(f'import.{self._name}', {'module': self._name}):
+                self._loader.exec_module(module)
+        finally:
+            # Hand the module its real loader back (importlib.resources,
+            # inspect and pkgutil look at it)
+            module.__loader__ = self._loader
+            if module.__spec__ is not None:
+                module.__spec__.loader = self._loader
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Optional[Sequence[str]],
+        target: Optional[ModuleType] = None,
+    ):
+        # Ask the real finders; guard against finding ourselves recursively
+        if getattr(self._local, 'busy', False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.busy = False
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, fullname)
+        return spec
+
+
+@contextmanager
+def profile_imports() -> Iterator[None]:
+    '''Emit an ``import.<module>`` span for each module first imported inside.'''
+    finder = _TimingFinder()
+    sys.meta_path.insert(0, finder)
+    try:
+        yield
+    finally:
+        sys.meta_path.remove(finder)
@@ -7,7 +7,7 @@ from pythonjsonlogger import jsonlogger
 def setup_logging(level: int = logging.INFO):
     '''Configure root logger for the entire codebase.'''
     formatter = jsonlogger.JsonFormatter(
-        '%(asctime)s %(levelname)s %(name)s %(message)s'
+        '%(asctime)s %(levelname)s %(processName)s %(name)s %(message)s'
     )
 
     stream_handler = logging.StreamHandler(sys.stdout)
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.utils.tracing import trace_span
+
+logger = logging.getLogger(__name__)
+
+
+class BlockingCallError(RuntimeError):
+    '''Raised by a strict LoopLagMonitor when a callback blocked the loop.'''
+
+    def __init__(self, report: 'BlockedLoopReport'):
+        super().__init__(
+            f'Event loop blocked for {report.lag * 1000:.0f}ms at:\n{report.stack}'
+        )
+        self.report = report
+
+
+@dataclass
+class BlockedLoopReport:
+    # Seconds the loop went without running its heartbeat
+    lag: float
+    # Loop thread's stack captured while it was blocked, innermost call last
+    stack: str
+    at: float = field(default_factory=time.time)
+
+
+class LoopLagMonitor:
+    '''Measures how late the event loop wakes up from a short sleep.
+
+    Anything that blocks the loop (sync I/O, heavy CPU) delays the wake-up by
+    the same amount, so the overshoot is a direct measure of how long other
+    coroutines -- including interaction handlers -- were kept waiting.
+
+    The loop beats at most ``block_threshold / 2`` apart, so a stall can't
+    hide inside one sleep; the worst overshoot per ``interval`` is kept as a
+    lag sample. A watchdog thread checks the heartbeat every few milliseconds;
+    once the loop has gone more than ``block_threshold`` without beating it
+    snapshots the loop thread's stack with ``sys._current_frames``, catching
+    the blocking call in the act. The stall is reported as an
+    ``event_loop.blocked`` span when the loop resumes, and with ``strict`` the
+    next ``stop()`` or ``check()`` raises BlockingCallError.
+    '''
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        window: int = 120,
+        block_threshold: float = 0.1,
+        strict: bool = False,
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.strict = strict
+        # Lag in seconds of the most recent ``window`` samples
+        self._samples: deque[float] = deque(maxlen=window)
+        self._blocked: deque[BlockedLoopReport] = deque(maxlen=20)
+        self.blocked_count = 0
+        self._violation: Optional[BlockedLoopReport] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # Written by the loop, read by the watchdog
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat: Optional[float] = None
+        # (heartbeat the stall followed, stack) captured by the watchdog
+        self._pending_stack: Optional[tuple[float, str]] = None
+
+    def configure(self, env: Optional[dict[str, str]] = None) -> None:
+        '''Apply LOOP_BLOCK_THRESHOLD_MS and LOOP_BLOCK_STRICT from the environment.'''
+        env = dict(os.environ) if env is None else env
+        if env.get('LOOP_BLOCK_THRESHOLD_MS'):
+            self.block_threshold = float(env['LOOP_BLOCK_THRESHOLD_MS']) / 1000
+        strict = env.get('LOOP_BLOCK_STRICT', '').lower()
+        self.strict = strict in {'1', 'true', 'yes'}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        '''Start sampling on the running loop (no-op if already running).'''
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._task = asyncio.get_running_loop().create_task(
+            self._run(), name='loop-lag-monitor'
+        )
+        self._stop_event.clear()
+        self._watchdog = threading.Thread(
+            target=self._watch, name='loop-lag-watchdog', daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._stop_event.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+        self._last_beat = None
+        self.check()
+
+    def check(self) -> None:
+        '''In strict mode, raise for the first stall since the last check.'''
+        violation, self._violation = self._violation, None
+        if violation is not None and self.strict:
+            raise BlockingCallError(violation)
+
+    @property
+    def heartbeat(self) -> float:
+        '''Seconds between beats: short enough that no stall fits between two.'''
+        return min(self.interval, self.block_threshold / 2)
+
+    async def _run(self) -> None:
+        beat = self.heartbeat
+        last_beat = sample_started = time.perf_counter()
+        self._last_beat = last_beat
+        worst = 0.0
+        while True:
+            await asyncio.sleep(beat)
+            now = time.perf_counter()
+            previous, last_beat = last_beat, now
+            self._last_beat = now
+            gap = now - previous
+            worst = max(worst, gap - beat)
+            if now - sample_started >= self.interval:
+                self.record(worst)
+                sample_started, worst = now, 0.0
+            pending, self._pending_stack = self._pending_stack, None
+            if pending is not None and pending[0] == previous:
+                self._report(BlockedLoopReport(gap, pending[1]))
+
+    def _watch(self) -> None:
+        # Sample several times per threshold so the stack is caught mid-stall
+        period = max(0.005, self.block_threshold / 4)
+        captured_for: Optional[float] = None
+        while not self._stop_event.wait(period):
+            last_beat = self._last_beat
+            if last_beat is None or last_beat == captured_for:
+                continue
+            if time.perf_counter() - last_beat <= self.block_threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id or 0)
+            if frame is None:
+                continue
+            # One stack per stall: the first sample is closest to the culprit
+            captured_for = last_beat
+            self._pending_stack = (last_beat, ''.join(traceback.format_stack(frame)))
+
+    def _report(self, report: BlockedLoopReport) -> None:
+        self.blocked_count += 1
+        self._blocked.append(report)
+        if self._violation is None:
+            self._violation = report
+        logger.warning(
+            f'Event loop blocked for {report.lag * 1000:.0f}ms at:\n{report.stack}'
+        )
+        with trace_span(
+            'event_loop.blocked',
+            {'lag_ms': round(report.lag * 1000, 1), 'stack': report.stack},
+        ):
+            pass
+
+    def record(self, lag: float) -> None:
+        self._samples.append(max(0.0, lag))
+
+    def blocked_reports(self) -> list[BlockedLoopReport]:
+        '''Most recent last.'''
+        return list(self._blocked)
+
+    def stats(self) -> dict[str, float]:
+        '''``{last, mean, max}`` over the window in ms, plus the ``blocked`` count.'''
+        samples = list(self._samples)
+        if not samples:
+            return {'last': 0.0, 'mean': 0.0, 'max': 0.0, 'blocked': self.blocked_count}
+        return {
+            'last': samples[-1] * 1000,
+            'mean': sum(samples) / len(samples) * 1000,
+            'max': max(samples) * 1000,
+            'blocked': self.blocked_count,
+        }
+
+
+# Started by the bot in setup_hook
+loop_lag = LoopLagMonitor()
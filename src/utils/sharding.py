@@ -0,0 +1,90 @@
+'''Gateway shard layout for one bot process or a group of worker processes.
+
+SHARD_COUNT fixes the total number of shards (default: Discord's recommended
+count). SHARD_IDS (e.g. ``0-3`` or ``0,2,5``) limits this process to some of
+them. BOT_WORKERS=N starts N worker processes, each running a contiguous slice
+of the shards with its own event loop, connection pool and caches.
+'''
+
+import os
+from dataclasses import dataclass, replace
+from typing import Optional
+
+
+def parse_shard_ids(value: str) -> tuple[int, ...]:
+    '''Parse ``0-3,6`` into ``(0, 1, 2, 3, 6)``.'''
+    ids: list[int] = []
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition('-')
+        if sep:
+            ids.extend(range(int(start), int(end) + 1))
+        else:
+            ids.append(int(part))
+    return tuple(sorted(set(ids)))
+
+
+def split_shards(shard_count: int, workers: int) -> list[tuple[int, ...]]:
+    '''Split ``range(shard_count)`` into ``workers`` contiguous, even ranges.'''
+    if workers < 1:
+        raise ValueError('workers must be at least 1')
+    if shard_count < workers:
+        raise ValueError(f'{workers} workers need at least {workers} shards')
+    size, extra = divmod(shard_count, workers)
+    ranges: list[tuple[int, ...]] = []
+    start = 0
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(tuple(range(start, end)))
+        start = end
+    return ranges
+
+
+@dataclass(frozen=True)
+class ShardPlan:
+    # None lets discord.py ask Discord for the recommended count
+    shard_count: Optional[int] = None
+    # Shards run by this process; None runs all of them
+    shard_ids: Optional[tuple[int, ...]] = None
+    workers: int = 1
+
+    @classmethod
+    def from_env(cls, env: Optional[dict[str, str]] = None) -> 'ShardPlan':
+        '''Read SHARD_COUNT, SHARD_IDS and BOT_WORKERS.'''
+        env = dict(os.environ) if env is None else env
+        workers = int(env.get('BOT_WORKERS') or 1)
+        shard_count = int(env['SHARD_COUNT']) if env.get('SHARD_COUNT') else None
+        shard_ids = parse_shard_ids(env['SHARD_IDS']) if env.get('SHARD_IDS') else None
+        if workers > 1 and shard_count is None:
+            # Worker ranges must be fixed up front; one shard per worker
+            shard_count = workers
+        if shard_ids is not None and shard_count is None:
+            raise ValueError('SHARD_IDS requires SHARD_COUNT')
+        return cls(shard_count=shard_count, shard_ids=shard_ids, workers=workers)
+
+    @property
+    def owns_command_sync(self) -> bool:
+        '''Only the process running shard 0 syncs the (global) command tree.'''
+        return self.shard_ids is None or 0 in self.shard_ids
+
+    @property
+    def runs_global_tasks(self) -> bool:
+        '''Only the process running shard 0 runs bot-wide background jobs
+        (e.g. the quest sweep), so workers don't repeat them.'''
+        return self.owns_command_sync
+
+    @property
+    def label(self) -> str:
+        if self.shard_ids is None:
+            return 'all shards'
+        return f'shards {self.shard_ids[0]}-{self.shard_ids[-1]}/{self.shard_count}'
+
+    def worker_plans(self) -> list['ShardPlan']:
+        '''One plan per worker process, each owning a slice of the shards.'''
+        assert self.shard_count is not None
+        return [
+            replace(self, shard_ids=ids)
+            for ids in split_shards(self.shard_count, self.workers)
+        ]
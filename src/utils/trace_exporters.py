@@ -0,0 +1,268 @@
+'''Span exporters for ``src.utils.tracing`` and their environment configuration.
+
+TRACE_EXPORTERS selects a comma-separated list of: log, noop, ring, otlp, stats
+(default ``log,stats``). TRACE_SAMPLE_RATE (0-1, default 1) sets head sampling,
+TRACE_OTLP_PATH the OTLP-JSON output file and TRACE_RING_SIZE the ring size.
+'''
+
+import bisect
+import json
+import logging
+import math
+import os
+import threading
+from collections import deque
+from typing import Any, Optional
+
+from src.utils.tracing import (
+    LoggingExporter,
+    NoopExporter,
+    SpanExporter,
+    TraceSpan,
+    set_exporters,
+    set_sample_rate,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RingBufferExporter(SpanExporter):
+    '''Keeps the most recent finished spans in memory for inspection.'''
+
+    def __init__(self, size: int = 1000):
+        self._spans: deque[dict[str, Any]] = deque(maxlen=size)
+
+    def export(self, span: TraceSpan) -> None:
+        # Store a flat record, not the span, so parents/children aren't retained
+        self._spans.append(
+            {
+                'name': span.name,
+                'trace_id': span.trace_id,
+                'span_id': span.span_id,
+                'parent': span.parent.name if span.parent else None,
+                'duration_ms': (span.duration or 0) * 1000,
+                'metadata': dict(span.metadata),
+            }
+        )
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        '''Oldest first.'''
+        return list(self._spans)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_span(span: TraceSpan) -> dict[str, Any]:
+    duration_ns = int((span.duration or 0) * 1e9)
+    record: dict[str, Any] = {
+        'traceId': span.trace_id,
+        'spanId': span.span_id,
+        'name': span.name,
+        'kind': 1,  # SPAN_KIND_INTERNAL
+        'startTimeUnixNano': str(span.start_unix_ns),
+        'endTimeUnixNano': str(span.start_unix_ns + duration_ns),
+        'attributes': [
+            {'key': k, 'value': _otlp_value(v)} for k, v in span.metadata.items()
+        ],
+    }
+    if span.parent is not None:
+        record['parentSpanId'] = span.parent.span_id
+    return record
+
+
+class OtlpJsonFileExporter(SpanExporter):
+    '''Appends one OTLP/JSON ``ExportTraceServiceRequest`` per line.
+
+    Spans are written a whole trace at a time when its root finishes, so the
+    file costs one write per trace rather than per span. The output can be
+    replayed into any OTLP collector (e.g. with the ``otlpjsonfile`` receiver).
+    '''
+
+    def __init__(self, path: str, service_name: str = 'lifted-leaderboard'):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def export(self, span: TraceSpan) -> None:
+        if span.parent is not None:
+            return
+        spans: list[dict[str, Any]] = []
+        stack = [span]
+        while stack:
+            current = stack.pop()
+            if current.end_time is not None:
+                spans.append(_otlp_span(current))
+            stack.extend(current.children)
+        line = json.dumps(
+            {
+                'resourceSpans': [
+                    {
+                        'resource': {
+                            'attributes': [
+                                {
+                                    'key': 'service.name',
+                                    'value': {'stringValue': self.service_name},
+                                }
+                            ]
+                        },
+                        'scopeSpans': [
+                            {'scope': {'name': 'src.utils.tracing'}, 'spans': spans}
+                        ],
+                    }
+                ]
+            },
+            separators=(',', ':'),
+        )
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+# Histogram bucket upper bounds in seconds: 50µs to ~2min, 10% apart, so any
+# percentile is reported within 10% of the true value in constant memory.
+_BUCKET_GROWTH = 1.1
+_BUCKET_BOUNDS = [
+    5e-5 * _BUCKET_GROWTH**i
+    for i in range(math.ceil(math.log(120 / 5e-5, _BUCKET_GROWTH)) + 1)
+]
+
+
+class LatencyHistogram:
+    '''Fixed log-bucketed latency histogram (not thread-safe on its own).'''
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        '''Upper bound of the bucket holding the q-th (0-1) observation.'''
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                bound = _BUCKET_BOUNDS[i] if i < len(_BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+
+class LatencyAggregator(SpanExporter):
+    '''Streams span durations into per-span-name histograms.'''
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self) -> None:
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def export(self, span: TraceSpan) -> None:
+        duration = span.duration or 0.0
+        with self._lock:
+            histogram = self._histograms.get(span.name)
+            if histogram is None:
+                histogram = self._histograms[span.name] = LatencyHistogram()
+            histogram.record(duration)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def summary(self, name: Optional[str] = None) -> dict[str, dict[str, float]]:
+        '''``{span name: {count, mean, max, p50, p95, p99}}``, times in ms.'''
+        with self._lock:
+            items = [
+                (n, h) for n, h in self._histograms.items() if name is None or n == name
+            ]
+            return {
+                n: {
+                    'count': h.count,
+                    'mean': h.total / h.count * 1000 if h.count else 0.0,
+                    'max': h.max * 1000,
+                    **{
+                        f'p{round(q * 100)}': h.percentile(q) * 1000
+                        for q in self.QUANTILES
+                    },
+                }
+                for n, h in sorted(items)
+            }
+
+    def prometheus(self, metric: str = 'trace_span_duration_seconds') -> str:
+        '''Render the histograms as a Prometheus text-format summary.'''
+        lines = [
+            f'# HELP {metric} Duration of traced spans.',
+            f'# TYPE {metric} summary',
+        ]
+        with self._lock:
+            for name, h in sorted(self._histograms.items()):
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                for q in self.QUANTILES:
+                    lines.append(
+                        f'{metric}{{span="{label}",quantile="{q}"}} '
+                        f'{h.percentile(q):.6f}'
+                    )
+                lines.append(f'{metric}_sum{{span="{label}"}} {h.total:.6f}')
+                lines.append(f'{metric}_count{{span="{label}"}} {h.count}')
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide aggregator, installed by configure_tracing() when "stats" is on
+span_stats = LatencyAggregator()
+
+
+def configure_tracing(env: Optional[dict[str, str]] = None) -> list[SpanExporter]:
+    '''Install exporters and the sample rate from TRACE_* environment variables.'''
+    env = dict(os.environ) if env is None else env
+    names = [
+        n.strip().lower()
+        for n in env.get('TRACE_EXPORTERS', 'log,stats').split(',')
+        if n.strip()
+    ]
+
+    exporters: list[SpanExporter] = []
+    for name in names:
+        if name == 'log':
+            exporters.append(LoggingExporter())
+        elif name == 'noop':
+            exporters.append(NoopExporter())
+        elif name == 'ring':
+            exporters.append(RingBufferExporter(int(env.get('TRACE_RING_SIZE', 1000))))
+        elif name == 'otlp':
+            exporters.append(
+                OtlpJsonFileExporter(env.get('TRACE_OTLP_PATH', 'traces.otlp.jsonl'))
+            )
+        elif name == 'stats':
+            exporters.append(span_stats)
+        else:
+            logger.warning(f'Unknown trace exporter "{name}" ignored')
+
+    set_sample_rate(float(env.get('TRACE_SAMPLE_RATE', 1.0)))
+    set_exporters(exporters)
+    return exporters
@@ -1,9 +1,13 @@
 import logging
+import random
+import secrets
+import threading
 import time
+from abc import ABC, abstractmethod
 from contextlib import contextmanager
 from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
 
 # Context variable for current trace context
 trace_context: ContextVar[Optional['TraceSpan']] = ContextVar(
@@ -23,6 +27,17 @@ class TraceSpan:
     metadata: Dict[str, Any] = field(default_factory=dict)
     parent: Optional['TraceSpan'] = None
     children: list['TraceSpan'] = field(default_factory=list)
+    # Head sampling decision, made once per root span and inherited
+    sampled: bool = True
+    start_unix_ns: int = field(default_factory=time.time_ns)
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    trace_id: str = ''
+
+    def __post_init__(self) -> None:
+        if not self.trace_id:
+            self.trace_id = (
+                self.parent.trace_id if self.parent else secrets.token_hex(16)
+            )
 
     @property
     def duration(self) -> Optional[float]:
@@ -30,21 +45,83 @@ class TraceSpan:
         return self.end_time - self.start_time if self.end_time else None
 
     def finish(self) -> None:
-        '''Mark the span as finished.'''
+        '''Mark the span as finished and hand it to the exporters.'''
         self.end_time = time.perf_counter()
+        if not self.sampled:
+            return
+        for exporter in _exporters:
+            try:
+                exporter.export(self)
+            except Exception:
+                logger.exception(f'Span exporter {type(exporter).__name__} failed')
+
+
+class SpanExporter(ABC):
+    '''Receives every finished, sampled span.
+
+    Called on the thread that finished the span, so implementations must be
+    thread-safe and cheap.
+    '''
+
+    @abstractmethod
+    def export(self, span: TraceSpan) -> None:
+        '''Handle one finished span.'''
+
+    def shutdown(self) -> None:
+        '''Flush and release resources; called when exporters are replaced.'''
+
+
+class NoopExporter(SpanExporter):
+    def export(self, span: TraceSpan) -> None:
+        pass
+
 
-        # Log the span completion
-        duration_ms = (self.duration or 0) * 1000
-        metadata_str = ', '.join(f'{k}={v}' for k, v in self.metadata.items())
+class LoggingExporter(SpanExporter):
+    '''Logs one INFO line per span (the original tracing output).'''
 
-        if self.parent:
+    def export(self, span: TraceSpan) -> None:
+        # Skip the formatting entirely when INFO is filtered out
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        duration_ms = (span.duration or 0) * 1000
+        metadata_str = ', '.join(f'{k}={v}' for k, v in span.metadata.items())
+
+        if span.parent:
             logger.info(
-                f'⏱️  {self.name}: '
+                f'⏱️  {span.name}: '
                 f'{duration_ms:.2f}ms '
-                f'(parent: {self.parent.name}) [{metadata_str}]'
+                f'(parent: {span.parent.name}) [{metadata_str}]'
             )
         else:
-            logger.info(f'⏱️  {self.name}: {duration_ms:.2f}ms [{metadata_str}]')
+            logger.info(f'⏱️  {span.name}: {duration_ms:.2f}ms [{metadata_str}]')
+
+
+_exporters: tuple[SpanExporter, ...] = (LoggingExporter(),)
+_UNSAMPLED = TraceSpan(name='unsampled', sampled=False, trace_id='0' * 32)
+_sample_rate = 1.0
+_config_lock = threading.Lock()
+
+
+def set_exporters(exporters: Iterable[SpanExporter]) -> None:
+    '''Replace the active exporters, shutting down the previous ones.'''
+    global _exporters
+    with _config_lock:
+        previous, _exporters = _exporters, tuple(exporters)
+    for exporter in previous:
+        if exporter not in _exporters:
+            exporter.shutdown()
+
+
+def get_exporters() -> tuple[SpanExporter, ...]:
+    return _exporters
+
+
+def set_sample_rate(rate: float) -> None:
+    '''Fraction of root spans (and their whole trees) that are recorded.'''
+    global _sample_rate
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError('sample rate must be between 0 and 1')
+    _sample_rate = rate
 
 
 @contextmanager
@@ -62,6 +139,23 @@ def trace_span(name: str, metadata: Optional[Dict[str, Any]] = None):
     # Get current parent span
     parent = trace_context.get()
 
+    if parent is None:
+        sampled = bool(_exporters) and (
+            _sample_rate >= 1.0 or random.random() < _sample_rate
+        )
+        if not sampled:
+            # Unsampled traces share one inert span: nothing is allocated,
+            # timed or exported for them or their children
+            token = trace_context.set(_UNSAMPLED)
+            try:
+                yield _UNSAMPLED
+            finally:
+                trace_context.reset(token)
+            return
+    elif not parent.sampled:
+        yield parent
+        return
+
     # Create new span
     span = TraceSpan(name=name, metadata=metadata or {}, parent=parent)
 
@@ -88,5 +182,5 @@ def get_current_span() -> Optional[TraceSpan]:
 def add_span_metadata(key: str, value: Any) -> None:
     '''Add metadata to the current span.'''
     current = trace_context.get()
-    if current:
+    if current and current.sampled:
         current.metadata[key] = value
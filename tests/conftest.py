@@ -19,13 +19,13 @@ class FakeDB:
     def __exit__(self, exc_type, exc, tb):
         return False
 
-    def fetchone(self, query: str, params=None):
+    def fetchone(self, query: str, params=None, row_factory=None):
         self.last_query = query
         self.last_params = tuple(params or ())
         if self.fetchone_results:
             return self.fetchone_results.pop(0)
 
-    def fetchall(self, query: str, params=None):
+    def fetchall(self, query: str, params=None, row_factory=None):
         self.last_query = query
         self.last_params = tuple(params or ())
         if self.fetchall_results:
@@ -57,8 +57,11 @@ def fake_db() -> FakeDB:
 
 @pytest.fixture()
 def clean_registry():
+    from src.achievements import load_rules
     from src.achievements.registry import registry
 
+    # Register the built-in rules first so nothing loads them mid-test
+    load_rules()
     before = list(registry.all())
     registry._rules.clear()  # type: ignore[attr-defined]
     try:
@@ -25,7 +25,13 @@ def test_engine_dispatch_creates_achievement_and_awards_once(
     rule = _Rule('r1', earned=True)
     clean_registry.register(rule)  # type: ignore[arg-type]
 
-    monkeypatch.setattr(engine_module.Achievement, 'get_one', lambda *a, **k: None)
+    lookups = []
+
+    def _get_by_codes(codes):
+        lookups.append(list(codes))
+        return {}
+
+    monkeypatch.setattr(engine_module.Achievement, 'get_by_codes', _get_by_codes)
     monkeypatch.setattr(
         engine_module.Achievement,
         'create',
@@ -38,13 +44,13 @@ def test_engine_dispatch_creates_achievement_and_awards_once(
         },
     )
 
-    exists_calls = {'n': 0}
+    earned_calls = {'n': 0}
 
-    def _exists(*a, **k):
-        exists_calls['n'] += 1
-        return False
+    def _earned_ids(*a, **k):
+        earned_calls['n'] += 1
+        return set()
 
-    monkeypatch.setattr(engine_module.UserAchievement, 'exists', _exists)
+    monkeypatch.setattr(engine_module.UserAchievement, 'earned_ids', _earned_ids)
 
     created = []
 
@@ -65,15 +71,18 @@ def test_engine_dispatch_creates_achievement_and_awards_once(
     assert len(earned) == 1
     assert earned[0]['code'] == 'r1'
     assert created and created[0]['achievement_id'] == 123
-    assert exists_calls['n'] >= 1
+    assert earned_calls['n'] == 1
+    assert lookups == [['r1']]
 
 
 def test_engine_dispatch_skips_if_not_earned(monkeypatch, clean_registry):
     rule = _Rule('r2', earned=False)
     clean_registry.register(rule)  # type: ignore[arg-type]
 
-    monkeypatch.setattr(engine_module.Achievement, 'get_one', lambda *a, **k: None)
-    monkeypatch.setattr(engine_module.UserAchievement, 'exists', lambda *a, **k: False)
+    monkeypatch.setattr(engine_module.Achievement, 'get_by_codes', lambda codes: {})
+    monkeypatch.setattr(
+        engine_module.UserAchievement, 'earned_ids', lambda *a, **k: set()
+    )
 
     created = []
     monkeypatch.setattr(
@@ -90,3 +99,40 @@ def test_engine_dispatch_skips_if_not_earned(monkeypatch, clean_registry):
 
     assert earned == []
     assert created == []
+
+
+def test_engine_dispatch_batches_lookups_and_skips_already_earned(
+    monkeypatch, clean_registry
+):
+    for code in ('a', 'b', 'c'):
+        clean_registry.register(_Rule(code, earned=True))  # type: ignore[arg-type]
+
+    lookups = []
+
+    def _get_by_codes(codes):
+        codes = list(codes)
+        lookups.append(codes)
+        return {
+            c: {'id': i, 'code': c, 'name': c, 'description': '', 'xp_value': 1}
+            for i, c in enumerate(codes)
+        }
+
+    monkeypatch.setattr(engine_module.Achievement, 'get_by_codes', _get_by_codes)
+    monkeypatch.setattr(
+        engine_module.UserAchievement, 'earned_ids', lambda user_id, ids: {1}
+    )
+    created = []
+    monkeypatch.setattr(
+        engine_module.UserAchievement, 'create', lambda v: created.append(v)
+    )
+    monkeypatch.setattr(engine_module.User, 'get_profile', lambda *a, **k: {'level': 1})
+
+    earned = engine_module.engine.dispatch(
+        ActivityRecordedEvent(
+            user_id=1, activity_id=1, category='Steps', date_occurred=date(2026, 2, 5)
+        )
+    )
+
+    assert lookups == [['a', 'b', 'c']]
+    assert [e['code'] for e in earned] == ['a', 'c']
+    assert [c['achievement_id'] for c in created] == [0, 2]
@@ -1,6 +1,4 @@
-from datetime import date
-
-import pytest
+from datetime import date, timedelta
 
 import src.achievements.rules.streaks as streaks_module
 from src.achievements.events import ActivityRecordedEvent, RankChangedEvent
@@ -12,52 +10,79 @@ def test_streak_rule_handles_only_activity_recorded():
     assert rule.handles(RankChangedEvent(1, 'Bronze')) is False
 
 
+def _calendar_with(monkeypatch, fake_db, days: list[date]) -> None:
+    from src.models import activity_calendar as calendar_module
+    from src.utils import day_bitmap
+    from tests.conftest import FakeDBManager
+
+    occurred = b''
+    for day in days:
+        occurred = day_bitmap.set_bit(occurred, day_bitmap.day_index(day))
+    fake_db.fetchone_results = [{'occurred': occurred}]
+    monkeypatch.setattr(calendar_module, 'DBManager', FakeDBManager(fake_db))
+    monkeypatch.setattr(
+        streaks_module, 'activity_calendar', calendar_module.ActivityCalendar()
+    )
+
+
 def test_daily_streak_achieved(monkeypatch, fake_db):
     end = date(2026, 2, 7)
-    fake_db.fetchall_results = [
+    _calendar_with(
+        monkeypatch,
+        fake_db,
         [
-            {'date_occurred': date(2026, 2, 1)},
-            {'date_occurred': date(2026, 2, 2)},
-            {'date_occurred': date(2026, 2, 3)},
-            {'date_occurred': date(2026, 2, 4)},
-            {'date_occurred': date(2026, 2, 5)},
-            {'date_occurred': date(2026, 2, 6)},
-            {'date_occurred': date(2026, 2, 7)},
-        ]
-    ]
-
-    with pytest.MonkeyPatch.context() as mp:
-        from tests.conftest import FakeDBManager
-
-        mp.setattr(streaks_module, 'DBManager', FakeDBManager(fake_db))
-        ok, meta = streaks_module.DailyStreak7().evaluate(
-            ActivityRecordedEvent(1, 1, 'Steps', end)
-        )
+            date(2026, 2, 1),
+            date(2026, 2, 2),
+            date(2026, 2, 3),
+            date(2026, 2, 4),
+            date(2026, 2, 5),
+            date(2026, 2, 6),
+            date(2026, 2, 7),
+        ],
+    )
+
+    ok, meta = streaks_module.DailyStreak7().evaluate(
+        ActivityRecordedEvent(1, 1, 'Steps', end)
+    )
 
     assert ok is True
     assert meta is not None
     assert meta['streak'] >= 7
+    assert 'user_activity_days' in (fake_db.last_query or '')
 
 
 def test_daily_streak_not_achieved_gap(monkeypatch, fake_db):
     end = date(2026, 2, 7)
-    fake_db.fetchall_results = [
+    _calendar_with(
+        monkeypatch,
+        fake_db,
         [
-            {'date_occurred': date(2026, 2, 1)},
-            {'date_occurred': date(2026, 2, 2)},
-            {'date_occurred': date(2026, 2, 4)},
-            {'date_occurred': date(2026, 2, 5)},
-            {'date_occurred': date(2026, 2, 6)},
-            {'date_occurred': date(2026, 2, 7)},
-        ]
-    ]
-
-    from tests.conftest import FakeDBManager
+            date(2026, 2, 1),
+            date(2026, 2, 2),
+            date(2026, 2, 4),
+            date(2026, 2, 5),
+            date(2026, 2, 6),
+            date(2026, 2, 7),
+        ],
+    )
 
-    monkeypatch.setattr(streaks_module, 'DBManager', FakeDBManager(fake_db))
     ok, meta = streaks_module.DailyStreak7().evaluate(
         ActivityRecordedEvent(1, 1, 'Steps', end)
     )
     assert ok is False
     assert meta is not None
     assert meta['streak'] < 7
+
+
+def test_weekly_streak_spans_many_bitmap_words(monkeypatch, fake_db):
+    end = date(2026, 2, 7)
+    _calendar_with(
+        monkeypatch, fake_db, [end - timedelta(days=i) for i in range(14 * 7)]
+    )
+
+    ok, meta = streaks_module.WeeklyStreak13().evaluate(
+        ActivityRecordedEvent(1, 1, 'Steps', end)
+    )
+
+    assert ok is True
+    assert meta == {'streak': 91, 'unit': 'day'}
@@ -0,0 +1,126 @@
+from src.models import activity_catalog as catalog_module
+from src.models.activity import Activity
+from src.models.activity_catalog import ActivityCatalog
+from tests.conftest import FakeDB, FakeDBManager, patched_dbmanager
+
+_ROWS = [
+    {
+        'id': 1,
+        'name': 'Run',
+        'category': 'Cardio',
+        'xp_value': 10,
+        'is_archived': False,
+    },
+    {
+        'id': 2,
+        'name': 'Bike',
+        'category': 'Cardio',
+        'xp_value': 8,
+        'is_archived': False,
+    },
+    {
+        'id': 3,
+        'name': 'Squat',
+        'category': 'Strength',
+        'xp_value': 12,
+        'is_archived': True,
+    },
+]
+
+
+class _FakeListener:
+    def __init__(self, running=True):
+        self.running = running
+        self.handlers = {}
+
+    def subscribe(self, channel, handler):
+        self.handlers[channel] = handler
+
+
+def _catalog(monkeypatch, *row_sets) -> ActivityCatalog:
+    '''Catalog whose successive reloads return each of row_sets in turn.'''
+    db = FakeDB(fetchall_results=[list(rows) for rows in row_sets])
+    monkeypatch.setattr(catalog_module, 'DBManager', FakeDBManager(db))
+    return ActivityCatalog()
+
+
+def test_catalog_indexes_rows(monkeypatch):
+    catalog = _catalog(monkeypatch, _ROWS)
+
+    assert catalog.get(1)['name'] == 'Run'
+    assert catalog.find('Bike', 'Cardio')['id'] == 2
+    assert catalog.find('Squat', 'Strength') is None
+    assert catalog.find('Squat', 'Strength', active_only=False)['id'] == 3
+    assert catalog.categories() == ['Cardio']
+    assert catalog.categories(active_only=False) == ['Cardio', 'Strength']
+    assert [r['name'] for r in catalog.by_category('Cardio')] == ['Bike', 'Run']
+    assert catalog.loads == 1
+
+
+def test_catalog_reloads_on_notification(monkeypatch):
+    catalog = _catalog(monkeypatch, _ROWS, _ROWS[:1])
+    listener = _FakeListener()
+    catalog.attach(listener)  # type: ignore[arg-type]
+
+    assert catalog.get(2) is not None
+    version = catalog.version
+    listener.handlers[catalog_module.ACTIVITIES_CHANNEL]('UPDATE')
+
+    assert catalog.get(2) is None
+    assert catalog.version == version + 1
+
+
+def test_catalog_expires_without_listener(monkeypatch):
+    catalog = _catalog(monkeypatch, _ROWS, _ROWS)
+    catalog.max_age = 0.0
+
+    catalog.get(1)
+    catalog.get(1)
+
+    assert catalog.loads == 2
+
+
+def test_activity_writes_invalidate_catalog(monkeypatch):
+    from src.models import activity as activity_module
+
+    catalog = _catalog(monkeypatch, _ROWS)
+    monkeypatch.setattr(activity_module, 'catalog', catalog)
+    with patched_dbmanager(monkeypatch, activity_module, FakeDB()):
+        row = Activity.get_by_name_category('Run', 'Cardio')
+        assert row['xp_value'] == 10
+        # Callers get copies, so they can't corrupt the shared snapshot
+        row['xp_value'] = 0
+        assert catalog.get(1)['xp_value'] == 10
+        assert catalog.loaded
+
+        Activity.set_archived(1, True)
+
+    assert not catalog.loaded
+
+
+def test_catalog_rebuilds_autocomplete_indexes_on_reload(monkeypatch):
+    catalog = _catalog(monkeypatch, _ROWS, _ROWS[1:])
+
+    assert catalog.category_index().search('') == ['Cardio']
+    assert catalog.activity_index('Cardio').search('') == ['Bike', 'Run']
+    assert catalog.activity_index('Strength').search('sq') == []
+
+    catalog.refresh()
+
+    assert catalog.activity_index('Cardio').search('') == ['Bike']
+
+
+def test_writes_with_listener_keep_serving_until_notify_reloads(monkeypatch):
+    catalog = _catalog(monkeypatch, _ROWS, _ROWS[:1])
+    listener = _FakeListener()
+    catalog.attach(listener)  # type: ignore[arg-type]
+    assert catalog.get(2) is not None
+
+    catalog.invalidate()
+
+    # Readers keep the old snapshot instead of reloading on their own thread
+    assert catalog.get(2) is not None
+    assert catalog.loads == 1
+    listener.handlers[catalog_module.ACTIVITIES_CHANNEL]('UPDATE')
+    assert catalog.get(2) is None
+    assert catalog.loads == 2
@@ -1,7 +1,17 @@
-import pytest
+import importlib
+from datetime import date, timedelta
 
+from psycopg import errors
+
+from src.components.activity_records import duplicate_message
 from src.models import activity_record as activity_record_module
-from src.models.activity_record import ActivityRecord
+from src.models.activity_record import (
+    ActivityRecord,
+    DuplicateCheck,
+    utc_day_bounds,
+    week_start,
+)
+from tests.conftest import patched_dbmanager
 
 
 class _FakeDB:
@@ -32,90 +42,184 @@ class _FakeDBManager:
         return self.instance
 
 
-def test_activity_group_key_steps_daily():
-    assert (
-        ActivityRecord._activity_group_key('Steps', 'Daily Steps 10k+') == 'steps_daily'
+def _check_row(same_day=False, group=None, group_taken=False):
+    key, period, label = group or (None, None, None)
+    return {
+        'group_key': key,
+        'period': period,
+        'label': label,
+        'same_day': same_day,
+        'group_taken': group_taken,
+    }
+
+
+_DAILY_STEPS = ('steps_daily', 'day', 'Daily Steps')
+_WEEKLY_STEPS = ('steps_weekly', 'week', 'Weekly Steps')
+
+
+def test_check_duplicates_regular_activity_same_day(monkeypatch):
+    monkeypatch.setattr(
+        activity_record_module, 'DBManager', _FakeDBManager(_check_row(True))
     )
 
+    check = ActivityRecord.check_duplicates(1, 10, '2026-02-05')
 
-def test_activity_group_key_steps_weekly():
-    assert (
-        ActivityRecord._activity_group_key('Steps', 'Weekly Steps 70k+')
-        == 'steps_weekly'
+    assert check.group_key is None and not check.ok
+    assert duplicate_message(check) == (
+        '❌ You already recorded that activity for that day.'
     )
 
 
-def test_activity_group_key_recovery_sleep_weekly():
-    assert (
-        ActivityRecord._activity_group_key(
-            'Recovery', 'A week of good sleep (7+ hours/day avg)'
-        )
-        == 'recovery_weekly_sleep'
+def test_check_duplicates_daily_group_taken(monkeypatch):
+    monkeypatch.setattr(
+        activity_record_module,
+        'DBManager',
+        _FakeDBManager(_check_row(group=_DAILY_STEPS, group_taken=True)),
     )
-    assert (
-        ActivityRecord._activity_group_key(
-            'Recovery', 'A week of great sleep (8+ hours/day avg)'
-        )
-        == 'recovery_weekly_sleep'
+
+    check = ActivityRecord.check_duplicates(1, 10, '2026-02-05')
+
+    assert (check.group_key, check.period) == ('steps_daily', 'day')
+    assert duplicate_message(check) == (
+        '❌ You already recorded a Daily Steps activity for that day.'
     )
 
 
-def test_activity_group_key_diet_no_alcohol_weekly():
-    assert (
-        ActivityRecord._activity_group_key('Diet', 'Week of no Alcohol')
-        == 'diet_weekly_no_alcohol'
+def test_check_duplicates_weekly_group_wins_over_same_day(monkeypatch):
+    monkeypatch.setattr(
+        activity_record_module,
+        'DBManager',
+        _FakeDBManager(_check_row(True, _WEEKLY_STEPS, group_taken=True)),
     )
 
+    check = ActivityRecord.check_duplicates(1, 10, '2026-02-05')
 
-def test_has_activity_on_date_true(monkeypatch):
-    fake_mgr = _FakeDBManager(row={'ok': 1})
-    monkeypatch.setattr(activity_record_module, 'DBManager', fake_mgr)
+    assert 'weekly version' in (duplicate_message(check) or '')
 
-    assert ActivityRecord.has_activity_on_date(1, 10, '2026-02-05') is True
-    assert fake_mgr.instance is not None
-    assert 'activity_id = %s' in (fake_mgr.instance.last_query or '')
 
+def test_check_duplicates_free_group_slot_is_ok(monkeypatch):
+    monkeypatch.setattr(
+        activity_record_module,
+        'DBManager',
+        _FakeDBManager(_check_row(group=_WEEKLY_STEPS)),
+    )
 
-def test_has_activity_on_date_false(monkeypatch):
-    fake_mgr = _FakeDBManager(row=None)
-    monkeypatch.setattr(activity_record_module, 'DBManager', fake_mgr)
+    check = ActivityRecord.check_duplicates(1, 10, '2026-02-05')
 
-    assert ActivityRecord.has_activity_on_date(1, 10, '2026-02-05') is False
+    assert check.ok and duplicate_message(check) is None
 
 
-def test_has_group_activity_on_date_unknown_key_raises():
-    with pytest.raises(ValueError):
-        ActivityRecord.has_group_activity_on_date(1, 'unknown', '2026-02-05')
+def test_activity_groups_seed_the_built_in_groups(fake_db):
+    migration = importlib.import_module(
+        'src.database.migrations.20261019_180000_create_activity_groups'
+    )
 
+    migration.up(fake_db)
+
+    [seed] = [q for q, _ in fake_db.executed if 'INSERT INTO activity_groups' in q]
+    for key, period in (
+        ('steps_daily', 'day'),
+        ('steps_weekly', 'week'),
+        ('recovery_weekly_sleep', 'week'),
+        ('diet_weekly_no_alcohol', 'week'),
+    ):
+        assert f"('{key}', '{period}'" in seed
+    assert "ARRAY['Daily Steps%']" in seed
+
+
+def test_week_start_is_monday():
+    assert week_start(date(2026, 2, 5)) == date(2026, 2, 2)
+    assert week_start(date(2026, 2, 2)) == date(2026, 2, 2)
+    assert week_start(date(2026, 2, 8)) == date(2026, 2, 2)
+
+
+def test_check_duplicates_one_query(monkeypatch):
+    fake_mgr = _FakeDBManager(
+        row={
+            'group_key': 'steps_weekly',
+            'period': 'week',
+            'label': 'Weekly Steps',
+            'same_day': False,
+            'group_taken': True,
+        }
+    )
+    monkeypatch.setattr(activity_record_module, 'DBManager', fake_mgr)
 
-def test_has_group_activity_in_week_unknown_key_raises():
-    with pytest.raises(ValueError):
-        ActivityRecord.has_group_activity_in_week(1, 'unknown', '2026-02-05')
+    check = ActivityRecord.check_duplicates(1, 10, '2026-02-05', exclude_record_id=7)
 
+    assert check == DuplicateCheck(
+        same_day=False,
+        group_key='steps_weekly',
+        period='week',
+        group_label='Weekly Steps',
+        group_taken=True,
+    )
+    assert not check.ok
+    q = fake_mgr.instance.last_query
+    assert 'activity_group_claims' in q and 'activity_group_members' in q
+    # Week bounds are computed here, not per row in SQL
+    assert date(2026, 2, 2) in fake_mgr.instance.last_params
+    assert fake_mgr.instance.last_params.count(7) == 2
 
-def test_has_group_activity_on_date_steps_daily(monkeypatch):
-    fake_mgr = _FakeDBManager(row={'ok': 1})
-    monkeypatch.setattr(activity_record_module, 'DBManager', fake_mgr)
 
-    assert (
-        ActivityRecord.has_group_activity_on_date(1, 'steps_daily', '2026-02-05')
-        is True
+def test_check_duplicates_no_row_is_ok(monkeypatch):
+    monkeypatch.setattr(activity_record_module, 'DBManager', _FakeDBManager(None))
+
+    assert ActivityRecord.check_duplicates(1, 10, '2026-02-05').ok
+
+
+def test_duplicate_message():
+    assert duplicate_message(DuplicateCheck(same_day=False)) is None
+    assert duplicate_message(DuplicateCheck(same_day=True)) == (
+        '❌ You already recorded that activity for that day.'
     )
-    assert fake_mgr.instance is not None
-    q = fake_mgr.instance.last_query or ''
-    assert "a.category = 'Steps'" in q
-    assert "a.name LIKE 'Daily Steps%%'" in q
+    daily = DuplicateCheck(
+        same_day=False,
+        group_key='steps_daily',
+        period='day',
+        group_label='Daily Steps',
+        group_taken=True,
+    )
+    assert duplicate_message(daily) == (
+        '❌ You already recorded a Daily Steps activity for that day.'
+    )
+    weekly = DuplicateCheck(
+        same_day=True, group_key='steps_weekly', period='week', group_taken=True
+    )
+    assert 'weekly version' in (duplicate_message(weekly) or '')
 
 
-def test_has_group_activity_in_week_steps_weekly(monkeypatch):
-    fake_mgr = _FakeDBManager(row={'ok': 1})
-    monkeypatch.setattr(activity_record_module, 'DBManager', fake_mgr)
+def test_insert_does_nothing_on_conflict(monkeypatch, fake_db):
+    with patched_dbmanager(monkeypatch, activity_record_module, fake_db):
+        assert ActivityRecord.insert(1, 10, None, '2026-02-05') == {}
 
     assert (
-        ActivityRecord.has_group_activity_in_week(1, 'steps_weekly', '2026-02-05')
-        is True
+        'ON CONFLICT (user_id, activity_id, date_occurred) DO NOTHING'
+        in fake_db.last_query
     )
-    assert fake_mgr.instance is not None
-    q = fake_mgr.instance.last_query or ''
-    assert "a.name LIKE 'Weekly Steps%%'" in q
-    assert "date_trunc('week'" in q
+
+
+def test_insert_returns_empty_on_group_claim_violation(monkeypatch, fake_db):
+    def fetchall(query, params=None, row_factory=None):
+        raise errors.UniqueViolation()
+
+    monkeypatch.setattr(fake_db, 'fetchall', fetchall)
+    with patched_dbmanager(monkeypatch, activity_record_module, fake_db):
+        assert ActivityRecord.insert(1, 10, None, '2026-02-05') == {}
+
+
+def test_utc_day_bounds_half_open():
+    start, end = utc_day_bounds(date(2026, 2, 5))
+
+    assert start.isoformat() == '2026-02-05T00:00:00+00:00'
+    assert end - start == timedelta(days=1)
+
+
+def test_count_on_created_date_uses_range(monkeypatch, fake_db):
+    fake_db.fetchone_results = [{'cnt': 2}]
+    with patched_dbmanager(monkeypatch, activity_record_module, fake_db):
+        assert ActivityRecord.count_on_created_date(1, '2026-02-05') == 2
+
+    assert '::date' not in fake_db.last_query
+    assert 'created_at >= %s AND created_at < %s' in fake_db.last_query
+    assert fake_db.last_params == (1, *utc_day_bounds(date(2026, 2, 5)))
@@ -0,0 +1,41 @@
+from src.utils.autocomplete import MAX_CHOICES, AutocompleteIndex
+
+_LABELS = ['Bench Press', 'Press Ups', 'Leg Press', 'Running', 'Rowing', 'Yoga']
+
+
+def test_prefix_ranks_before_word_prefix_and_substring():
+    index = AutocompleteIndex(_LABELS)
+
+    assert index.search('press') == ['Press Ups', 'Bench Press', 'Leg Press']
+    assert index.search('ress') == ['Bench Press', 'Leg Press', 'Press Ups']
+    assert index.search('  RO ') == ['Rowing']
+
+
+def test_multi_word_and_long_substring_queries():
+    index = AutocompleteIndex(_LABELS)
+
+    assert index.search('bench p') == ['Bench Press']
+    assert index.search('unnin') == ['Running']
+    assert index.search('zzz') == []
+
+
+def test_boost_breaks_ties_within_a_tier():
+    index = AutocompleteIndex(_LABELS)
+
+    assert index.search('r', boost={'Rowing': 1.0})[:2] == ['Rowing', 'Running']
+    assert index.search('', limit=2, boost={'Yoga': 2.0, 'Rowing': 1.0}) == [
+        'Yoga',
+        'Rowing',
+    ]
+
+
+def test_results_are_capped():
+    index = AutocompleteIndex(f'Activity {i:03}' for i in range(100))
+
+    assert len(index.search('')) == MAX_CHOICES
+    assert len(index.search('act')) == MAX_CHOICES
+    assert index.search('act', limit=3) == [
+        'Activity 000',
+        'Activity 001',
+        'Activity 002',
+    ]
@@ -0,0 +1,252 @@
+import pytest
+
+from src.models import activity_record as activity_record_module
+from src.models import base as base_module
+from src.models.activity_record import ActivityRecord
+from tests.conftest import patched_dbmanager
+
+
+class _StreamingDB:
+    def __init__(self, rows):
+        self._rows = rows
+        self.entered = 0
+        self.exited: list[type | None] = []
+        self.stream_args = None
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        self.entered += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.exited.append(exc_type)
+        return False
+
+    def stream(self, query, params=None, batch_size=1000, **kwargs):
+        self.stream_args = (query, params, batch_size)
+        yield from self._rows
+
+
+def test_iter_many_streams_rows(monkeypatch):
+    fake = _StreamingDB([{'id': 1}, {'id': 2}])
+    monkeypatch.setattr(base_module, 'DBManager', fake)
+
+    rows = list(
+        ActivityRecord.iter_many(
+            where='user_id = %s', params=(7,), order_by='id ASC', batch_size=50
+        )
+    )
+
+    assert rows == [{'id': 1}, {'id': 2}]
+    query, params, batch_size = fake.stream_args
+    assert query == 'SELECT * FROM activity_records WHERE user_id = %s ORDER BY id ASC'
+    assert params == (7,)
+    assert batch_size == 50
+    assert fake.exited == [None]
+
+
+def test_iter_many_releases_connection_on_early_close(monkeypatch):
+    fake = _StreamingDB([{'id': i} for i in range(100)])
+    monkeypatch.setattr(base_module, 'DBManager', fake)
+
+    it = ActivityRecord.iter_many()
+    assert next(it) == {'id': 0}
+    assert fake.exited == []
+
+    it.close()
+
+    assert fake.entered == 1
+    assert fake.exited == [GeneratorExit]
+
+
+class _RowFactoryDB:
+    def __init__(self):
+        self.row_factory = 'unset'
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def fetchall(self, query, params=None, row_factory=None):
+        self.row_factory = row_factory
+        return []
+
+
+def test_get_many_default_keeps_dict_rows(monkeypatch):
+    fake = _RowFactoryDB()
+    monkeypatch.setattr(base_module, 'DBManager', fake)
+
+    ActivityRecord.get_many()
+
+    assert fake.row_factory is None
+
+
+def test_get_many_compact_uses_model_row_class(monkeypatch):
+    from src.models.activity_record import ActivityRecordRow
+
+    fake = _RowFactoryDB()
+    monkeypatch.setattr(base_module, 'DBManager', fake)
+    monkeypatch.setattr(base_module, 'class_row', lambda cls: ('class_row', cls))
+
+    ActivityRecord.get_many(compact=True)
+
+    assert fake.row_factory == ('class_row', ActivityRecordRow)
+
+
+def test_row_classes_are_slotted():
+    from src.models.activity import ActivityRow
+    from src.models.activity_record import ActivityRecordRow
+    from src.models.quest import QuestRow
+    from src.models.user import UserRow
+
+    for row_cls in (UserRow, ActivityRow, ActivityRecordRow, QuestRow):
+        assert '__slots__' in vars(row_cls)
+
+
+class _QueryDB(_RowFactoryDB):
+    def __init__(self):
+        super().__init__()
+        self.query = None
+        self.params = None
+
+    def fetchall(self, query, params=None, row_factory=None):
+        self.query = query
+        self.params = params
+        return super().fetchall(query, params, row_factory)
+
+
+def test_get_many_column_projection(monkeypatch):
+    fake = _QueryDB()
+    monkeypatch.setattr(base_module, 'DBManager', fake)
+
+    ActivityRecord.get_many(columns=('id', 'user_id'), compact=True)
+
+    assert fake.query == 'SELECT id, user_id FROM activity_records'
+    # Projections can't fill the full row dataclass, so fall back to named tuples
+    assert fake.row_factory is base_module.namedtuple_row
+
+
+def test_get_page_first_page_orders_by_sort_key_then_pk(monkeypatch):
+    fake = _QueryDB()
+    monkeypatch.setattr(base_module, 'DBManager', fake)
+
+    ActivityRecord.get_page(
+        sort_key='date_occurred',
+        limit=10,
+        where='user_id = %s',
+        params=(7,),
+        columns=('note',),
+    )
+
+    assert fake.query == (
+        'SELECT note, date_occurred, id FROM activity_records '
+        'WHERE (user_id = %s) '
+        'ORDER BY date_occurred DESC, id DESC LIMIT %s'
+    )
+    assert fake.params == (7, 10)
+
+
+def test_get_page_after_cursor_uses_row_comparison(monkeypatch):
+    fake = _QueryDB()
+    monkeypatch.setattr(base_module, 'DBManager', fake)
+
+    cursor = ActivityRecord.page_cursor(
+        {'id': 42, 'date_occurred': '2026-02-05'}, 'date_occurred'
+    )
+    ActivityRecord.get_page(
+        sort_key='date_occurred',
+        after=cursor,
+        limit=10,
+        where='user_id = %s',
+        params=(7,),
+    )
+
+    # NOT NULL keys keep a plain row comparison the (.., date_occurred, id) index seeks
+    assert '(date_occurred, id) < (%s, %s)' in fake.query
+    assert 'NULL' not in fake.query
+    assert fake.params == (7, '2026-02-05', 42, 10)
+
+
+def test_get_page_sorts_nullable_keys_through_their_default(monkeypatch):
+    fake = _QueryDB()
+    monkeypatch.setattr(base_module, 'DBManager', fake)
+
+    cursor = ActivityRecord.page_cursor({'id': 42, 'updated_at': None}, 'updated_at')
+    ActivityRecord.get_page(sort_key='updated_at', after=cursor, limit=10)
+
+    coalesced = "COALESCE(updated_at, '-infinity'::timestamptz)"
+    assert fake.query == (
+        f'SELECT * FROM activity_records WHERE ({coalesced}, id) < '
+        "(COALESCE(%s, '-infinity'::timestamptz), %s) "
+        f'ORDER BY {coalesced} DESC, id DESC LIMIT %s'
+    )
+    assert fake.params == (None, 42, 10)
+
+
+def test_get_page_rejects_null_cursor_for_keys_without_default(monkeypatch):
+    monkeypatch.setattr(base_module, 'DBManager', _QueryDB())
+
+    with pytest.raises(ValueError, match='sort_defaults'):
+        ActivityRecord.get_page(sort_key='message_id', after=(None, 42))
+
+
+def test_get_page_by_pk_ascending(monkeypatch):
+    fake = _QueryDB()
+    monkeypatch.setattr(base_module, 'DBManager', fake)
+
+    ActivityRecord.get_page(after=(5, 5), limit=3, descending=False)
+
+    assert fake.query == (
+        'SELECT * FROM activity_records WHERE id > %s ORDER BY id ASC LIMIT %s'
+    )
+    assert fake.params == (5, 3)
+
+
+def test_get_many_by_ids_uses_single_any_query(monkeypatch):
+    fake = _QueryDB()
+    monkeypatch.setattr(base_module, 'DBManager', fake)
+
+    ActivityRecord.get_many_by_ids([3, 1, 3, 2])
+
+    assert fake.query == 'SELECT * FROM activity_records WHERE id = ANY(%s)'
+    assert fake.params == ([3, 1, 2],)
+
+
+def test_get_many_by_ids_empty_skips_query(monkeypatch):
+    fake = _QueryDB()
+    monkeypatch.setattr(base_module, 'DBManager', fake)
+
+    assert ActivityRecord.get_many_by_ids([]) == []
+    assert fake.query is None
+
+
+def test_exists_many_returns_recorded_subset(monkeypatch, fake_db):
+    from src.models import activity_record as activity_record_module
+    from tests.conftest import FakeDBManager
+
+    fake_db.fetchall_results = [[{'activity_id': 2}, {'activity_id': 5}]]
+    monkeypatch.setattr(activity_record_module, 'DBManager', FakeDBManager(fake_db))
+
+    done = ActivityRecord.exists_many(9, [1, 2, 5, 7])
+
+    assert done == {2, 5}
+    assert 'activity_id = ANY(%s)' in (fake_db.last_query or '')
+    assert fake_db.last_params == (9, [1, 2, 5, 7])
+
+
+def test_recent_for_user_pages_nullable_sorts_as_oldest(fake_db, monkeypatch):
+    fake_db.fetchall_results.append([])
+    with patched_dbmanager(monkeypatch, activity_record_module, fake_db):
+        ActivityRecord.recent_for_user(7, limit=5, sort='updated', after=(None, 42))
+
+    coalesced = "COALESCE(ar.updated_at, '-infinity'::timestamptz)"
+    assert f'AND ({coalesced}, ar.id) < (' in fake_db.last_query
+    assert f'ORDER BY {coalesced} DESC, ar.id DESC' in fake_db.last_query
+    assert fake_db.last_params == (7, None, 42, 5)
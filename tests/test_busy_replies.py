@@ -0,0 +1,64 @@
+import asyncio
+
+from src.components.base import BaseModal, BaseView
+from src.database.db_manager import DatabaseBusyError
+from src.utils.command_tree import BUSY_MESSAGE
+
+
+class _Response:
+    def __init__(self):
+        self.sent: list[tuple[str, bool]] = []
+
+    def is_done(self) -> bool:
+        return bool(self.sent)
+
+    async def send_message(self, content, ephemeral=False):
+        self.sent.append((content, ephemeral))
+
+
+class _Interaction:
+    def __init__(self):
+        self.response = _Response()
+
+
+class _Modal(BaseModal, title='Test'):
+    pass
+
+
+def test_view_callback_busy_error_gets_busy_reply():
+    interaction = _Interaction()
+
+    async def scenario():
+        view = BaseView()
+        await view.on_error(interaction, DatabaseBusyError('pool'), None)
+
+    asyncio.run(scenario())
+    assert interaction.response.sent == [(BUSY_MESSAGE, True)]
+
+
+def test_modal_submit_busy_error_gets_busy_reply():
+    interaction = _Interaction()
+
+    async def scenario():
+        await _Modal().on_error(interaction, DatabaseBusyError('pool'))
+
+    asyncio.run(scenario())
+    assert interaction.response.sent == [(BUSY_MESSAGE, True)]
+
+
+def test_other_modal_errors_keep_default_handling(monkeypatch):
+    handled: list[Exception] = []
+
+    async def default_on_error(self, interaction, error):
+        handled.append(error)
+
+    monkeypatch.setattr('discord.ui.Modal.on_error', default_on_error)
+    interaction = _Interaction()
+    error = ValueError('boom')
+
+    async def scenario():
+        await _Modal().on_error(interaction, error)
+
+    asyncio.run(scenario())
+    assert handled == [error]
+    assert interaction.response.sent == []
@@ -0,0 +1,62 @@
+import asyncio
+
+import discord
+import pytest
+from discord import app_commands
+
+from src.utils import command_sync
+
+GUILD = discord.Object(id=1234)
+
+
+@pytest.fixture
+def tree(monkeypatch):
+    tree = app_commands.CommandTree(discord.Client(intents=discord.Intents.none()))
+
+    @tree.command(name='ping', description='Ping', guild=GUILD)
+    async def ping(interaction: discord.Interaction):
+        pass
+
+    synced: list[int] = []
+
+    async def fake_sync(*, guild=None):
+        synced.append(guild.id)
+        return []
+
+    monkeypatch.setattr(tree, 'sync', fake_sync)
+    tree.synced = synced  # type: ignore[attr-defined]
+    return tree
+
+
+@pytest.fixture
+def state(monkeypatch):
+    values: dict[str, str] = {}
+    monkeypatch.setattr(command_sync.BotState, 'get_value', values.get)
+    monkeypatch.setattr(command_sync.BotState, 'set_value', values.__setitem__)
+    return values
+
+
+def test_tree_hash_is_stable_and_tracks_changes(tree):
+    before = command_sync.command_tree_hash(tree, GUILD)
+    assert before == command_sync.command_tree_hash(tree, GUILD)
+
+    @tree.command(name='pong', description='Pong', guild=GUILD)
+    async def pong(interaction: discord.Interaction):
+        pass
+
+    assert command_sync.command_tree_hash(tree, GUILD) != before
+
+
+def test_sync_runs_only_when_tree_changes(tree, state):
+    assert asyncio.run(command_sync.sync_command_tree(tree, GUILD)) is True
+    assert asyncio.run(command_sync.sync_command_tree(tree, GUILD)) is False
+    assert tree.synced == [1234]
+    assert state['command_tree_hash:1234'] == command_sync.command_tree_hash(
+        tree, GUILD
+    )
+
+
+def test_force_sync_ignores_stored_hash(tree, state):
+    asyncio.run(command_sync.sync_command_tree(tree, GUILD))
+    assert asyncio.run(command_sync.sync_command_tree(tree, GUILD, force=True))
+    assert tree.synced == [1234, 1234]
@@ -0,0 +1,99 @@
+import random
+from datetime import date
+
+from src.models import activity_calendar as calendar_module
+from src.models.activity_calendar import RECORDS_CHANNEL, ActivityCalendar
+from src.utils import day_bitmap
+from tests.conftest import FakeDBManager
+
+
+def _bitmap(indexes) -> bytes:
+    data = b''
+    for index in indexes:
+        data = day_bitmap.set_bit(data, index)
+    return data
+
+
+def test_bit_order_matches_little_endian_int_and_postgres():
+    data = _bitmap([0, 9, 20_000])
+
+    value = int.from_bytes(data, 'little')
+    assert [i for i in range(value.bit_length()) if value >> i & 1] == [0, 9, 20_000]
+    # Postgres set_bit(bytea, 9, 1) sets the lowest bit of the second byte
+    assert data[1] == 0b10
+    assert day_bitmap.has_bit(data, 9) and not day_bitmap.has_bit(data, 10)
+    assert not day_bitmap.has_bit(data, 10**6)
+
+
+def test_clearing_a_bit_never_grows_the_bitmap():
+    data = _bitmap([3])
+    assert day_bitmap.set_bit(data, 100, False) == data
+    assert not day_bitmap.has_bit(day_bitmap.set_bit(data, 3, False), 3)
+
+
+def test_run_length_matches_a_day_by_day_scan():
+    rng = random.Random(7)
+    indexes = {i for i in range(600) if rng.random() < 0.9}
+    data = _bitmap(indexes)
+
+    for end in range(0, 600, 7):
+        expected = 0
+        while end - expected in indexes:
+            expected += 1
+        assert day_bitmap.run_length_ending(data, end) == expected
+
+
+def test_run_length_across_word_boundaries():
+    data = _bitmap(range(10, 200))
+    assert day_bitmap.run_length_ending(data, 199) == 190
+    assert day_bitmap.run_length_ending(data, 63) == 54
+    assert day_bitmap.run_length_ending(data, 64) == 55
+    assert day_bitmap.run_length_ending(_bitmap(range(0, 128)), 127) == 128
+
+
+def test_count_between():
+    data = _bitmap([1, 5, 64, 65, 130])
+    assert day_bitmap.count_between(data, 0, 200) == 5
+    assert day_bitmap.count_between(data, 5, 64) == 2
+    assert day_bitmap.count_between(data, 66, 129) == 0
+    assert day_bitmap.count_between(data, 131, 400) == 0
+
+
+def test_calendar_loads_once_and_answers_from_bits(monkeypatch, fake_db):
+    days = [date(2026, 10, d) for d in (1, 2, 3, 5)]
+    fake_db.fetchone_results = [
+        {'occurred': _bitmap(day_bitmap.day_index(d) for d in days)}
+    ]
+    monkeypatch.setattr(calendar_module, 'DBManager', FakeDBManager(fake_db))
+    calendar = ActivityCalendar()
+
+    assert calendar.has_occurred(1, date(2026, 10, 2))
+    assert not calendar.has_occurred(1, date(2026, 10, 4))
+    assert calendar.run_ending(1, date(2026, 10, 3)) == 3
+    assert calendar.days_active(1, date(2026, 10, 1), date(2026, 10, 31)) == 4
+    assert calendar.stats()['misses'] == 1
+
+    # This process's own insert shows up before the NOTIFY round trip
+    calendar.mark(1, date(2026, 10, 4))
+    assert calendar.run_ending(1, date(2026, 10, 5)) == 5
+
+
+def test_calendar_drops_users_notified_by_other_processes():
+    calendar = ActivityCalendar()
+    handlers = {}
+
+    class _Listener:
+        running = True
+
+        def subscribe(self, channel, handler):
+            handlers[channel] = handler
+
+    calendar.attach(_Listener())  # type: ignore[arg-type]
+    with calendar._lock:
+        calendar._store(1, calendar_module._Calendar(b'\x01', 0.0))
+        calendar._store(2, calendar_module._Calendar(b'\x01', 0.0))
+
+    handlers[RECORDS_CHANNEL]('1')
+    assert calendar.stats()['size'] == 1
+    handlers[RECORDS_CHANNEL](None)
+    assert calendar.stats()['size'] == 0
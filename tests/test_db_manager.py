@@ -1,3 +1,195 @@
 # TODO: Review test usefulness and add more
 def test_db_bootstrap(tmp_path, monkeypatch):
     pass
+
+
+class _FakeNamedCursor:
+    def __init__(self, name, rows):
+        self.name = name
+        self._rows = list(rows)
+        self.itersize = None
+        self.executed = None
+        self.fetch_sizes: list[int] = []
+        self.closed = False
+
+    def execute(self, query, params=None):
+        self.executed = (query, params)
+
+    def fetchmany(self, size):
+        self.fetch_sizes.append(size)
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeConn:
+    def __init__(self, rows):
+        self._rows = rows
+        self.cursors: list[_FakeNamedCursor] = []
+
+    def cursor(self, name=None, **kwargs):
+        cur = _FakeNamedCursor(name, self._rows)
+        self.cursors.append(cur)
+        return cur
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def _connected_manager(rows):
+    from src.database.db_manager import DBManager
+
+    db = DBManager()
+    db._pg_conn = _FakeConn(rows)
+    db._connected = True
+    return db
+
+
+def test_stream_yields_rows_in_batches_through_named_cursor():
+    rows = [{'id': i} for i in range(5)]
+    db = _connected_manager(rows)
+
+    out = list(db.stream('SELECT * FROM activity_records', (), batch_size=2))
+
+    assert out == rows
+    cur = db._pg_conn.cursors[0]
+    assert cur.name and cur.name.startswith('stream_')
+    assert cur.itersize == 2
+    assert cur.fetch_sizes == [2, 2, 2, 2]
+    assert cur.closed is True
+
+
+def test_stream_batches_mode_yields_lists():
+    db = _connected_manager([{'id': i} for i in range(5)])
+
+    out = list(db.stream('SELECT 1', batch_size=2, batches=True))
+
+    assert [len(b) for b in out] == [2, 2, 1]
+
+
+def test_stream_early_close_closes_cursor():
+    db = _connected_manager([{'id': i} for i in range(10)])
+
+    gen = db.stream('SELECT 1', batch_size=3)
+    assert next(gen) == {'id': 0}
+    gen.close()
+
+    assert db._pg_conn.cursors[0].closed is True
+
+
+def test_stream_requires_context():
+    import pytest
+
+    from src.database.db_manager import DBManager
+
+    with pytest.raises(RuntimeError):
+        next(DBManager().stream('SELECT 1'))
+
+
+class _FakePool:
+    def __init__(self, error=None, **kwargs):
+        self.kwargs = kwargs
+        self.error = error
+        self.waited = None
+        self.returned: list = []
+
+    def wait(self, timeout):
+        self.waited = timeout
+
+    def getconn(self):
+        if self.error is not None:
+            raise self.error
+        return _FakeConn([])
+
+    def putconn(self, conn):
+        self.returned.append(conn)
+
+    def close(self):
+        pass
+
+
+def test_pool_config_reads_env():
+    from src.database.db_manager import PoolConfig
+
+    config = PoolConfig.from_env(
+        {
+            'DB_POOL_MIN_SIZE': '3',
+            'DB_POOL_MAX_SIZE': '20',
+            'DB_POOL_TIMEOUT': '2.5',
+            'DB_POOL_MAX_WAITING': '7',
+            'DB_POOL_CHECK': 'false',
+        }
+    )
+
+    assert (config.min_size, config.max_size, config.max_waiting) == (3, 20, 7)
+    assert config.timeout == 2.5
+    assert config.check is False
+    assert config.max_lifetime == PoolConfig().max_lifetime
+
+
+def test_init_pool_applies_config_and_prewarms(monkeypatch):
+    from src.database import db_manager as module
+
+    created: list[_FakePool] = []
+
+    class Pool(_FakePool):
+        check_connection = object()
+
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            created.append(self)
+
+    monkeypatch.setattr(module, 'ConnectionPool', Pool)
+    monkeypatch.setattr(module.DBManager, '_pool', None)
+    config = module.PoolConfig(min_size=4, max_size=8, timeout=1.0, max_waiting=5)
+
+    module.DBManager.init_pool('postgresql://example', config)
+
+    [pool] = created
+    assert pool.kwargs['min_size'] == 4
+    assert pool.kwargs['max_waiting'] == 5
+    assert pool.kwargs['check'] is Pool.check_connection
+    assert pool.waited is not None
+    assert module.DBManager._pool is pool
+
+
+def test_full_pool_queue_raises_busy(monkeypatch):
+    import pytest
+    from psycopg_pool import TooManyRequests
+
+    from src.database import db_manager as module
+
+    monkeypatch.setattr(
+        module.DBManager, '_pool', _FakePool(error=TooManyRequests('queue full'))
+    )
+
+    with pytest.raises(module.DatabaseBusyError):
+        with module.DBManager():
+            pass
+
+
+def test_pool_wait_is_reported_on_first_statement(monkeypatch):
+    from src.database import db_manager as module
+    from src.utils import tracing
+    from src.utils.trace_exporters import RingBufferExporter
+
+    ring = RingBufferExporter()
+    previous = tracing.get_exporters()
+    tracing.set_exporters([ring])
+    monkeypatch.setattr(module.DBManager, '_pool', _FakePool())
+    monkeypatch.setattr(module.DBManager, '_exec_pg', lambda self, q, p: 0)
+    try:
+        with module.DBManager() as db:
+            db.execute('SELECT 1')
+            db.execute('SELECT 2')
+    finally:
+        tracing.set_exporters(previous)
+
+    first, second = [s['metadata'] for s in ring.snapshot()]
+    assert 'pool_wait_ms' in first
+    assert 'pool_wait_ms' not in second
@@ -0,0 +1,74 @@
+import importlib
+import logging
+
+from src.models import guild_member as guild_member_module
+from src.models import user as user_module
+from tests.conftest import patched_dbmanager
+
+
+def test_leaderboard_is_scoped_to_guild_members(monkeypatch, fake_db):
+    fake_db.fetchall_results = [[{'display_name': 'a', 'level': 2, 'total_xp': 50}]]
+    with patched_dbmanager(monkeypatch, user_module, fake_db):
+        rows = user_module.User.leaderboard_top(10, guild_id=42)
+
+    assert rows == [{'display_name': 'a', 'level': 2, 'total_xp': 50}]
+    query = fake_db.last_query or ''
+    assert 'FROM guild_members gm JOIN users u' in query
+    assert 'WHERE gm.guild_id = %s' in query
+    assert fake_db.last_params == (42, 42, 10)
+
+
+def test_guild_leaderboard_ranks_by_xp_earned_in_that_guild(monkeypatch, fake_db):
+    with patched_dbmanager(monkeypatch, user_module, fake_db):
+        user_module.User.leaderboard_top(10, guild_id=42)
+
+    query = fake_db.last_query or ''
+    # XP earned in other guilds (users.total_xp) must not rank members here
+    assert 'u.total_xp' not in query
+    assert 'SUM(a.xp_value) AS xp' in query
+    assert 'WHERE ar.guild_id = %s GROUP BY ar.user_id' in query
+    assert 'ORDER BY total_xp DESC' in query
+
+
+def test_guild_scoping_migration_warns_when_history_is_unattributed(
+    monkeypatch, fake_db, caplog
+):
+    migration = importlib.import_module(
+        'src.database.migrations.20261019_140000_add_guild_scoping'
+    )
+    monkeypatch.delenv('GUILD_ID', raising=False)
+    fake_db.fetchone_results = [{'found': True}]
+
+    with caplog.at_level(logging.WARNING):
+        migration.up(fake_db)
+
+    assert 'GUILD_ID is not set' in caplog.text
+    assert not any('UPDATE' in sql for sql, _ in fake_db.executed)
+
+
+def test_leaderboard_without_guild_is_global(monkeypatch, fake_db):
+    with patched_dbmanager(monkeypatch, user_module, fake_db):
+        user_module.User.leaderboard_top(5)
+
+    assert 'guild_members' not in (fake_db.last_query or '')
+    assert fake_db.last_params == (5,)
+
+
+def test_guild_member_join_is_idempotent_insert(monkeypatch, fake_db):
+    with patched_dbmanager(monkeypatch, guild_member_module, fake_db):
+        guild_member_module.GuildMember.join(42, 7)
+
+    [(sql, params)] = fake_db.executed
+    assert 'ON CONFLICT DO NOTHING' in sql
+    assert params == (42, 7)
+
+
+def test_dev_guild_reads_guild_id(monkeypatch):
+    from src.utils import command_sync
+
+    monkeypatch.delenv('GUILD_ID', raising=False)
+    assert command_sync.dev_guild() is None
+
+    monkeypatch.setenv('GUILD_ID', '123')
+    guild = command_sync.dev_guild()
+    assert guild is not None and guild.id == 123
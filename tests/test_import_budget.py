@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from src.utils import tracing
+from src.utils.import_profiler import profile_imports
+from src.utils.trace_exporters import RingBufferExporter
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Everything the bot imports before it can serve its first command
+STARTUP_MODULES = ['src.bot'] + sorted(
+    f'src.cogs.{p.stem}' for p in (ROOT / 'src' / 'cogs').glob('*_cog.py')
+)
+
+# Heavy modules that must stay off the startup path (loaded lazily)
+DEFERRED_MODULES = (
+    'pendulum',
+    'django',
+    'src.achievements.rules.streaks',
+    'src.achievements.rules.diversity',
+    'src.achievements.rules.rank_up',
+)
+
+# Generous wall-clock ceiling for a cold import; CI can tighten it
+IMPORT_BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', 3000))
+
+
+def _importtime(modules: list[str]) -> dict[str, int]:
+    '''``{module: cumulative µs}`` from a fresh interpreter's -X importtime.'''
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {", ".join(modules)}'],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def test_startup_stays_within_import_budget():
+    timings = _importtime(STARTUP_MODULES)
+
+    loaded_heavy = [m for m in DEFERRED_MODULES if m in timings]
+    assert loaded_heavy == [], f'imported at startup: {loaded_heavy}'
+
+    total_ms = sum(timings[m] for m in STARTUP_MODULES if m in timings) / 1000
+    assert total_ms < IMPORT_BUDGET_MS
+
+
+def test_profile_imports_emits_nested_spans(tmp_path, monkeypatch):
+    (tmp_path / 'profiled_outer.py').write_text('import profiled_inner\n')
+    (tmp_path / 'profiled_inner.py').write_text('VALUE = 1\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    ring = RingBufferExporter()
+    previous = tracing.get_exporters()
+    tracing.set_exporters([ring])
+    try:
+        with profile_imports():
+            import profiled_outer  # noqa: F401
+    finally:
+        tracing.set_exporters(previous)
+        sys.modules.pop('profiled_outer', None)
+        sys.modules.pop('profiled_inner', None)
+
+    spans = {s['name']: s for s in ring.snapshot()}
+    assert spans['import.profiled_inner']['parent'] == 'import.profiled_outer'
+    assert type(profiled_outer.__loader__).__name__ == 'SourceFileLoader'
+
+
+def test_engine_import_does_not_register_rules():
+    timings = _importtime(['src.achievements.engine'])
+    assert 'src.achievements.rules.streaks' not in timings
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+from src.utils import tracing
+from src.utils.loop_lag import BlockingCallError, LoopLagMonitor
+from src.utils.trace_exporters import RingBufferExporter
+
+
+@pytest.fixture
+def ring():
+    previous = tracing.get_exporters()
+    exporter = RingBufferExporter()
+    tracing.set_exporters([exporter])
+    yield exporter
+    tracing.set_exporters(previous)
+
+
+def _slow_sync_query():
+    time.sleep(0.15)
+
+
+async def _handler():
+    _slow_sync_query()
+
+
+def _run(monitor: LoopLagMonitor) -> None:
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.02)
+        await _handler()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+
+
+def test_blocking_call_is_reported_with_its_stack(ring):
+    monitor = LoopLagMonitor(interval=0.01, block_threshold=0.05)
+
+    _run(monitor)
+
+    [report] = monitor.blocked_reports()
+    assert report.lag >= 0.1
+    assert '_slow_sync_query' in report.stack
+    assert monitor.stats()['blocked'] == 1
+    [span] = [s for s in ring.snapshot() if s['name'] == 'event_loop.blocked']
+    assert '_slow_sync_query' in span['metadata']['stack']
+
+
+def test_strict_mode_raises_on_blocking_call(ring):
+    monitor = LoopLagMonitor(interval=0.01, block_threshold=0.05, strict=True)
+
+    with pytest.raises(BlockingCallError, match='_slow_sync_query'):
+        _run(monitor)
+
+
+def test_offloaded_work_does_not_trip_strict_mode(ring):
+    monitor = LoopLagMonitor(interval=0.01, block_threshold=0.05, strict=True)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.to_thread(_slow_sync_query)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+    assert monitor.blocked_reports() == []
+
+
+def test_every_stall_is_reported_with_default_interval(ring):
+    monitor = LoopLagMonitor()
+    stalls = 10
+
+    async def scenario():
+        monitor.start()
+        for n in range(stalls):
+            # Vary the phase so stalls start anywhere between heartbeats
+            await asyncio.sleep(0.02 + 0.007 * n)
+            _slow_sync_query()
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+
+    reports = monitor.blocked_reports()
+    assert len(reports) == stalls
+    assert all(r.lag >= 0.15 for r in reports)
+    assert all('_slow_sync_query' in r.stack for r in reports)
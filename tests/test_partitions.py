@@ -0,0 +1,126 @@
+from datetime import date
+
+from src.database import partitions
+from tests.conftest import FakeDB
+
+
+def _created(db: FakeDB) -> list[str]:
+    return [sql.split()[5] for sql, _ in db.executed if sql.startswith('CREATE TABLE')]
+
+
+def test_month_arithmetic_and_names():
+    assert partitions.add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert partitions.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert partitions.partition_name(date(2026, 3, 1)) == 'activity_records_2026_03'
+
+
+def test_ensure_partitions_creates_missing_months_ahead(fake_db):
+    fake_db.fetchall_results = [
+        [{'name': 'activity_records_2026_10'}, {'name': 'activity_records_default'}]
+    ]
+
+    created = partitions.ensure_partitions(
+        fake_db, months_ahead=2, today=date(2026, 10, 19)
+    )
+
+    assert created == ['activity_records_2026_11', 'activity_records_2026_12']
+    assert _created(fake_db) == created
+    # Attached rather than created as PARTITION OF, which would lock out writers
+    assert fake_db.executed[-1][0] == (
+        'ALTER TABLE activity_records ATTACH PARTITION activity_records_2026_12 '
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+    )
+
+
+def test_ensure_partitions_skips_months_stuck_in_default(fake_db):
+    fake_db.fetchall_results = [[]]
+    # The default partition already holds a row for the current month
+    fake_db.fetchone_results = [{'?column?': 1}]
+
+    created = partitions.ensure_partitions(
+        fake_db, months_ahead=1, today=date(2026, 10, 19)
+    )
+
+    assert created == ['activity_records_2026_11']
+
+
+def test_archive_rolls_up_and_detaches_only_cold_months(fake_db):
+    fake_db.fetchall_results = [
+        [
+            {'name': 'activity_records_2026_01'},
+            {'name': 'activity_records_2025_12'},
+            {'name': 'activity_records_2026_09'},
+        ]
+    ]
+
+    archived = partitions.archive_partitions(
+        fake_db, retention=6, today=date(2026, 10, 19)
+    )
+
+    assert archived == ['activity_records_2025_12', 'activity_records_2026_01']
+    statements = [sql for sql, _ in fake_db.executed]
+    assert statements[0] == 'LOCK TABLE activity_records_2025_12 IN SHARE MODE'
+    assert statements[1].startswith('INSERT INTO activity_record_rollups')
+    assert 'FROM activity_records_2025_12 GROUP BY' in statements[1]
+    assert statements[2] == (
+        'ALTER TABLE activity_records DETACH PARTITION activity_records_2025_12'
+    )
+    assert fake_db.executed[1][1] == (date(2025, 12, 1),)
+
+
+def test_archive_is_off_without_retention(fake_db):
+    assert partitions.archive_partitions(fake_db, retention=0) == []
+    assert fake_db.executed == []
+
+
+def test_maintain_skips_when_another_process_holds_the_lock(fake_db):
+    fake_db.fetchone_results = [{'locked': False}]
+
+    assert partitions.maintain(fake_db, retention=3) == {
+        'created': [],
+        'archived': [],
+    }
+    assert fake_db.executed == []
+
+
+class _Transactions:
+    '''Hands out a fresh FakeDB per ``with DBManager()`` transaction.'''
+
+    def __init__(self):
+        self.opened: list[FakeDB] = []
+
+    def __call__(self):
+        self.opened.append(FakeDB())
+        return self.opened[-1]
+
+
+def test_maintain_runs_each_partition_in_its_own_transaction(fake_db, monkeypatch):
+    transactions = _Transactions()
+    monkeypatch.setattr(partitions, 'DBManager', transactions)
+    fake_db.fetchone_results = [{'locked': True}]
+    fake_db.fetchall_results = [
+        [{'name': 'activity_records_2026_10'}],
+        [{'name': 'activity_records_2026_03'}, {'name': 'activity_records_2026_10'}],
+    ]
+
+    result = partitions.maintain(fake_db, retention=6, today=date(2026, 10, 19))
+
+    assert result == {
+        'created': [
+            'activity_records_2026_11',
+            'activity_records_2026_12',
+            'activity_records_2027_01',
+        ],
+        'archived': ['activity_records_2026_03'],
+    }
+    # The lock-holding connection does no DDL itself
+    assert fake_db.executed == []
+    assert len(transactions.opened) == 4
+    for db in transactions.opened:
+        assert db.executed[0][0] == "SET LOCAL lock_timeout = '5s'"
+    archive = [sql for sql, _ in transactions.opened[-1].executed]
+    assert archive[1] == 'LOCK TABLE activity_records_2026_03 IN SHARE MODE'
+    assert archive[2].startswith('INSERT INTO activity_record_rollups')
+    assert archive[3] == (
+        'ALTER TABLE activity_records DETACH PARTITION activity_records_2026_03'
+    )
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import pytest
+
+from src.cogs import perf_cog as perf_cog_module
+from src.components.perf import perf_embed
+from src.utils.loop_lag import LoopLagMonitor
+
+
+def test_loop_lag_monitor_measures_blocking():
+    monitor = LoopLagMonitor(interval=0.01)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # block the loop
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+
+    stats = monitor.stats()
+    assert stats['max'] >= 80
+    assert not monitor.running
+
+
+def test_checkout_rate_uses_pool_counter_delta(monkeypatch):
+    clock = [100.0]
+    checkouts = [10]
+    monkeypatch.setattr(perf_cog_module.time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(
+        perf_cog_module.DBManager,
+        'pool_stats',
+        classmethod(lambda cls: {'requests_num': checkouts[0]}),
+    )
+    cog = perf_cog_module.PerfCog(bot=None)  # type: ignore[arg-type]
+
+    clock[0], checkouts[0] = 104.0, 30
+    assert cog.checkout_rate() == pytest.approx(5.0)
+    clock[0] = 106.0
+    assert cog.checkout_rate() == 0.0
+
+
+def test_perf_embed_renders_all_sections():
+    embed = perf_embed(
+        pool={'pool_size': 4, 'pool_max': 10, 'pool_available': 3},
+        checkouts_per_second=2.5,
+        latencies={
+            'record': {'count': 12, 'p50': 40.0, 'p95': 120.0, 'p99': 300.0},
+        },
+        loop_lag={'last': 1.0, 'mean': 2.0, 'max': 15.0},
+        caches={'Activity catalog': {'hit_rate': 0.995, 'size': 120}},
+    )
+
+    fields = {f.name: f.value for f in embed.fields}
+    assert 'Size: **4**/10' in fields['🗄️ Connection Pool']
+    assert 'Timeouts: **0**' in fields['🗄️ Connection Pool']
+    assert '`/record` p50 **40ms**' in fields['⏱️ Command Latency']
+    assert '`/quest` no data yet' in fields['⏱️ Command Latency']
+    assert 'Max: **15.0ms**' in fields['🔁 Event Loop Lag']
+    assert 'Activity catalog: **99.5%**' in fields['🧠 Caches']
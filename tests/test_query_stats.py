@@ -0,0 +1,147 @@
+import contextlib
+
+import pytest
+
+from src.database import db_manager as db_manager_module
+from src.database.query_stats import QueryStats, fingerprint
+
+
+def test_fingerprint_normalizes_literals_and_whitespace():
+    a = fingerprint("SELECT * FROM users\n  WHERE id = 5 AND name = 'O''Brien'")
+    b = fingerprint('select *   from users where id = %s and name = %s')
+    c = fingerprint('SELECT * FROM users WHERE id IN (1, 2, 3) -- hot path')
+
+    assert a == b
+    assert a.normalized == 'select * from users where id = ? and name = ?'
+    assert c.normalized == 'select * from users where id in (?)'
+    assert fingerprint('SELECT * FROM activities').id != a.id
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.rowcount = 0
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def execute(self, query, params=None):
+        self.conn.executed.append(query)
+        if query.startswith('EXPLAIN') and self.conn.explain_error:
+            raise self.conn.explain_error
+        if query.startswith('EXPLAIN'):
+            self._rows = [{'QUERY PLAN': 'Seq Scan on users'}]
+        else:
+            self.conn.clock[0] += self.conn.latency
+            self._rows = self.conn.rows
+            self.rowcount = len(self.conn.rows)
+
+    def fetchall(self):
+        return self._rows
+
+
+class _Conn:
+    def __init__(self, rows, latency, clock):
+        self.rows = rows
+        self.latency = latency
+        self.clock = clock
+        self.executed: list[str] = []
+        self.explain_error: Exception | None = None
+
+    def cursor(self, **kwargs):
+        return _Cursor(self)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        self.executed.append('SAVEPOINT')
+        try:
+            yield
+        except Exception:
+            self.executed.append('ROLLBACK TO SAVEPOINT')
+            raise
+        self.executed.append('RELEASE SAVEPOINT')
+
+
+@pytest.fixture
+def observed_db(monkeypatch):
+    stats = QueryStats(slow_threshold=0.5, explain_slow=True)
+    clock = [0.0]
+    monkeypatch.setattr(db_manager_module, 'query_stats', stats)
+    monkeypatch.setattr(db_manager_module.time, 'perf_counter', lambda: clock[0])
+
+    def make(rows=(), latency=0.01):
+        db = db_manager_module.DBManager()
+        db._pg_conn = _Conn(list(rows), latency, clock)
+        db._connected = True
+        return db
+
+    return make, stats
+
+
+def test_db_manager_records_per_fingerprint_stats(observed_db):
+    make, stats = observed_db
+    db = make(rows=[{'id': 1}, {'id': 2}])
+
+    db.fetchall('SELECT id FROM users WHERE id > %s', (0,))
+    db.fetchall('SELECT id FROM users  WHERE id > 10')
+    db.execute('UPDATE users SET level = 1')
+
+    top = stats.top(by='calls')
+    assert top[0]['query'] == 'select id from users where id > ?'
+    assert top[0]['calls'] == 2
+    assert top[0]['rows'] == 4
+    assert top[0]['total_time'] == pytest.approx(0.02)
+    assert stats.slow_queries() == []
+
+
+def test_slow_query_is_logged_with_plan(observed_db):
+    make, stats = observed_db
+    db = make(rows=[{'id': 1}], latency=0.8)
+
+    db.fetchone('SELECT id FROM users WHERE id = %s', (7,))
+
+    [slow] = stats.slow_queries()
+    assert slow.params == (7,)
+    assert slow.duration == pytest.approx(0.8)
+    assert slow.plan == ['Seq Scan on users']
+    assert db._pg_conn.executed[-3:] == [
+        'SAVEPOINT',
+        'EXPLAIN SELECT id FROM users WHERE id = %s',
+        'RELEASE SAVEPOINT',
+    ]
+    assert stats.get(slow.fingerprint).max_time == pytest.approx(0.8)
+
+
+def test_failed_explain_is_rolled_back_to_a_savepoint(observed_db):
+    make, stats = observed_db
+    db = make(rows=[{'id': 1}], latency=0.8)
+    db._pg_conn.explain_error = RuntimeError('boom')
+
+    db.fetchone('SELECT id FROM users WHERE id = %s', (7,))
+
+    assert db._pg_conn.executed[-3:] == [
+        'SAVEPOINT',
+        'EXPLAIN SELECT id FROM users WHERE id = %s',
+        'ROLLBACK TO SAVEPOINT',
+    ]
+    [slow] = stats.slow_queries()
+    assert slow.plan is None
+
+
+def test_slow_ddl_is_not_explained(observed_db):
+    make, stats = observed_db
+    db = make(latency=0.8)
+
+    db.execute('CREATE INDEX idx_users_level ON users (level)')
+    db.execute('DO $$ BEGIN PERFORM 1; END $$')
+
+    assert not any(q.startswith('EXPLAIN') for q in db._pg_conn.executed)
+    assert len(stats.slow_queries()) == 2
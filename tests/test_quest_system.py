@@ -1,7 +1,9 @@
+import random
 from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock
 
 import pytest
+from psycopg import errors
 
 from src.models import activity as activity_module
 from src.models import quest as quest_module
@@ -16,8 +18,10 @@ def mock_db_manager(monkeypatch):
 
     # Patch DBManager in all necessary modules
     from src.models import base as base_module
+    from src.models import quest_roll as quest_roll_module
 
     monkeypatch.setattr(quest_module, 'DBManager', lambda: mock_manager)
+    monkeypatch.setattr(quest_roll_module, 'DBManager', lambda: mock_manager)
     monkeypatch.setattr(activity_module, 'DBManager', lambda: mock_manager)
     monkeypatch.setattr(base_module, 'DBManager', lambda: mock_manager)
 
@@ -78,19 +82,69 @@ def test_quest_delete(mock_db_manager):
     assert args[1] == (quest_id,)
 
 
-def test_activity_get_random(mock_db_manager):
-    mock_rows = [
-        {'id': 1, 'name': 'A1', 'category': 'C1', 'xp_value': 10},
-        {'id': 2, 'name': 'A2', 'category': 'C1', 'xp_value': 20},
-    ]
-    mock_db_manager.fetchall.return_value = mock_rows
+def _catalog_with(monkeypatch, rows):
+    from src.models import activity_catalog as catalog_module
 
-    result = activity_module.Activity.get_random(limit=2)
+    catalog = catalog_module.ActivityCatalog()
+    monkeypatch.setattr(catalog, '_load_rows', lambda: rows)
+    monkeypatch.setattr(activity_module, 'catalog', catalog)
+    return catalog
 
-    assert len(result) == 2
-    assert result == mock_rows
-    assert mock_db_manager.fetchall.called
-    assert 'ORDER BY RANDOM()' in mock_db_manager.fetchall.call_args[0][0]
+
+_CATALOG_ROWS = [
+    {'id': i, 'name': f'A{i}', 'category': 'C1', 'xp_value': 10, 'is_archived': False}
+    for i in range(1, 21)
+] + [{'id': 99, 'name': 'Old', 'category': 'C1', 'xp_value': 5, 'is_archived': True}]
+
+
+def test_activity_get_random(mock_db_manager, monkeypatch):
+    _catalog_with(monkeypatch, _CATALOG_ROWS)
+
+    result = activity_module.Activity.get_random(limit=5, rng=random.Random(7))
+    again = activity_module.Activity.get_random(limit=5, rng=random.Random(7))
+
+    assert len({r['id'] for r in result}) == 5
+    assert result == again
+    assert all(not r['is_archived'] for r in result)
+    # Sampled in memory: the database is never asked to sort
+    assert not mock_db_manager.fetchall.called
+
+
+def test_activity_get_random_weighted(mock_db_manager, monkeypatch):
+    _catalog_with(monkeypatch, _CATALOG_ROWS)
+
+    result = activity_module.Activity.get_random(
+        limit=3,
+        weight=lambda a: 1.0 if a['id'] in {4, 8, 15} else 0.0,
+        rng=random.Random(1),
+    )
+
+    assert sorted(r['id'] for r in result) == [4, 8, 15]
+
+
+def test_quest_roll_sample_activities_flags_new(mock_db_manager, monkeypatch):
+    from src.models import quest_roll as quest_roll_module
+
+    catalog = _catalog_with(monkeypatch, _CATALOG_ROWS)
+    monkeypatch.setattr(quest_roll_module, 'catalog', catalog)
+    done = set(range(1, 19))
+    calls = []
+
+    def fake_exists_many(user_id, activity_ids):
+        calls.append(list(activity_ids))
+        return done
+
+    monkeypatch.setattr(
+        quest_roll_module.ActivityRecord, 'exists_many', fake_exists_many
+    )
+
+    picks = quest_roll_module.QuestRoll.sample_activities(
+        1, count=5, rng=random.Random(3)
+    )
+
+    assert len(calls) == 1 and 99 not in calls[0]
+    assert len(picks) == 5
+    assert all(p['is_new'] == (p['id'] not in done) for p in picks)
 
 
 def test_quest_roll_get_or_create(mock_db_manager):
@@ -175,3 +229,155 @@ def test_quest_roll_get_or_create(mock_db_manager):
 
     assert result == new_roll
     assert gen_ids.called
+
+
+def test_quest_get_active_ignores_expired(mock_db_manager):
+    quest_module.Quest.get_active(123)
+
+    assert 'deadline > NOW()' in mock_db_manager.fetchone.call_args[0][0]
+
+
+def test_quest_delete_expired_in_batches(mock_db_manager):
+    mock_db_manager.fetchall.side_effect = [
+        [{'id': 1}, {'id': 2}],
+        [{'id': 3}],
+    ]
+
+    deleted = quest_module.Quest.delete_expired(batch_size=2)
+
+    assert deleted == 3
+    assert mock_db_manager.fetchall.call_count == 2
+    sql, params = mock_db_manager.fetchall.call_args[0]
+    assert 'DELETE FROM user_quests' in sql and 'deadline <= NOW()' in sql
+    assert params == (2,)
+
+
+def test_quest_roll_pregenerate_batches(mock_db_manager, monkeypatch):
+    from src.models import quest_roll as quest_roll_module
+
+    catalog = _catalog_with(monkeypatch, _CATALOG_ROWS)
+    monkeypatch.setattr(quest_roll_module, 'catalog', catalog)
+    batches = iter([[1, 2], [3], []])
+    afters = []
+
+    def fake_users_due(after=0, limit=500):
+        afters.append(after)
+        return next(batches)
+
+    monkeypatch.setattr(quest_roll_module.QuestRoll, 'users_due', fake_users_due)
+    monkeypatch.setattr(
+        quest_roll_module.ActivityRecord,
+        'done_activity_ids_many',
+        lambda user_ids: {u: set() for u in user_ids},
+    )
+
+    # The second batch's user rolled meanwhile, so nothing is written for it
+    mock_db_manager.fetchall.side_effect = [[{'user_id': 1}, {'user_id': 2}], []]
+
+    written = quest_roll_module.QuestRoll.pregenerate(
+        batch_size=2, rng=random.Random(5)
+    )
+
+    assert written == 2
+    assert afters == [0, 2, 3]
+    assert mock_db_manager.fetchall.call_count == 2
+    sql, (user_ids, rolls) = mock_db_manager.fetchall.call_args[0]
+    assert 'ON CONFLICT (user_id)' in sql and 'RETURNING user_id' in sql
+    assert user_ids == [3]
+    assert len(rolls[0].obj) == 5
+
+
+def test_quest_accept_is_one_transaction(mock_db_manager):
+    deadline = datetime.now(timezone.utc) + timedelta(days=7)
+    mock_db_manager.fetchone.return_value = {'id': 5, 'user_id': 1}
+
+    result = quest_module.Quest.accept(1, 10, deadline, is_new_bonus=True)
+
+    assert result == {'id': 5, 'user_id': 1}
+    assert mock_db_manager.fetchone.call_count == 1
+    sql, params = mock_db_manager.fetchone.call_args[0]
+    assert 'UPDATE quest_rolls' in sql and 'INSERT INTO user_quests' in sql
+    assert 'has_accepted = FALSE' in sql
+    assert params == (1, 1, 10, deadline, True, None)
+
+
+class _QuestTable:
+    '''Just enough of user_quests to tell statement ordering apart: one row
+    per user (the UNIQUE (user_id) constraint), and each statement sees the
+    rows as they were when it started.'''
+
+    def __init__(self, quests):
+        self.quests = dict(quests)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def execute(self, sql, params=None):
+        (user_id,) = params
+        assert sql.startswith('DELETE FROM user_quests')
+        quest = self.quests.get(user_id)
+        if quest and quest['deadline'] <= datetime.now(timezone.utc):
+            del self.quests[user_id]
+
+    def fetchone(self, sql, params=None):
+        user_id, _, activity_id, deadline, is_new_bonus, guild_id = params
+        snapshot = dict(self.quests)
+        if 'DELETE FROM user_quests' in sql:
+            # A DELETE in the same WITH statement doesn't change the snapshot
+            self.quests.pop(user_id, None)
+        active = snapshot.get(user_id)
+        if active and active['deadline'] > datetime.now(timezone.utc):
+            return None
+        if user_id in snapshot:
+            raise errors.UniqueViolation()
+        self.quests[user_id] = {'activity_id': activity_id, 'deadline': deadline}
+        return {'user_id': user_id, **self.quests[user_id]}
+
+
+def test_quest_accept_replaces_unswept_expired_quest(monkeypatch):
+    now = datetime.now(timezone.utc)
+    table = _QuestTable({1: {'activity_id': 3, 'deadline': now - timedelta(hours=1)}})
+    monkeypatch.setattr(quest_module, 'DBManager', lambda: table)
+
+    deadline = now + timedelta(days=7)
+    result = quest_module.Quest.accept(1, 10, deadline)
+
+    assert result == {'user_id': 1, 'activity_id': 10, 'deadline': deadline}
+    assert table.quests[1]['activity_id'] == 10
+
+
+def test_quest_accept_keeps_active_quest(monkeypatch):
+    now = datetime.now(timezone.utc)
+    active = {'activity_id': 3, 'deadline': now + timedelta(days=1)}
+    table = _QuestTable({1: active})
+    monkeypatch.setattr(quest_module, 'DBManager', lambda: table)
+
+    assert quest_module.Quest.accept(1, 10, now + timedelta(days=7)) is None
+    assert table.quests[1] == active
+
+
+def test_quest_accept_returns_none_when_roll_taken(mock_db_manager):
+    mock_db_manager.fetchone.return_value = None
+
+    deadline = datetime.now(timezone.utc)
+    assert quest_module.Quest.accept(1, 10, deadline) is None
+
+
+def test_quest_complete_awards_in_one_statement(mock_db_manager):
+    mock_db_manager.fetchone.return_value = {
+        'id': 5,
+        'is_new_bonus': True,
+        'bonus_xp': 150,
+    }
+
+    result = quest_module.Quest.complete(1, 10)
+
+    assert result['bonus_xp'] == 150
+    assert mock_db_manager.fetchone.call_count == 1
+    sql, params = mock_db_manager.fetchone.call_args[0]
+    assert 'DELETE FROM user_quests' in sql and 'UPDATE users' in sql
+    assert 'deadline > NOW()' in sql
+    assert params == (1, 10, 50, 100, 1)
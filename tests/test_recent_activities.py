@@ -0,0 +1,75 @@
+from collections import namedtuple
+
+from src.models import recent_activities as recent_module
+from src.models.activity_catalog import ActivityCatalog
+from src.models.recent_activities import RecentActivities
+
+_Row = namedtuple('_Row', 'activity_id')
+
+
+def _seeded(monkeypatch, ids_by_user, calls=None, **kwargs) -> RecentActivities:
+    calls = [] if calls is None else calls
+
+    def fake_recent_for_user(user_id, limit, sort, compact=False):
+        calls.append(user_id)
+        return [_Row(i) for i in ids_by_user.get(user_id, [])]
+
+    monkeypatch.setattr(
+        recent_module.ActivityRecord, 'recent_for_user', fake_recent_for_user
+    )
+    return RecentActivities(**kwargs)
+
+
+def test_load_seeds_once_and_dedupes(monkeypatch):
+    calls: list[int] = []
+    cache = _seeded(monkeypatch, {1: [5, 5, 3, 9, 3]}, calls, per_user=2)
+
+    assert cache.get(1) is None
+    assert cache.load(1) == [5, 3]
+    assert cache.load(1) == [5, 3]
+    assert calls == [1]
+
+
+def test_record_moves_activity_to_front(monkeypatch):
+    cache = _seeded(monkeypatch, {1: [5, 3]}, per_user=3)
+
+    cache.record(1, 9)  # not seeded yet: ignored
+    assert 1 not in cache
+
+    cache.load(1)
+    cache.record(1, 3)
+    cache.record(1, 7)
+    cache.record(1, 8)
+
+    assert cache.get(1) == [8, 7, 3]
+
+
+def test_least_recent_user_is_evicted(monkeypatch):
+    cache = _seeded(monkeypatch, {}, max_users=2)
+
+    cache.load(1)
+    cache.load(2)
+    cache.get(1)  # touch 1 so 2 becomes least recent
+    cache.load(3)
+
+    assert len(cache) == 2
+    assert 1 in cache and 3 in cache and 2 not in cache
+
+
+def test_boost_scores_names_in_category(monkeypatch):
+    catalog = ActivityCatalog()
+    monkeypatch.setattr(
+        catalog,
+        '_load_rows',
+        lambda: [
+            {'id': 3, 'name': 'Run', 'category': 'Cardio', 'is_archived': False},
+            {'id': 5, 'name': 'Squat', 'category': 'Strength', 'is_archived': False},
+            {'id': 9, 'name': 'Bike', 'category': 'Cardio', 'is_archived': False},
+        ],
+    )
+    monkeypatch.setattr(recent_module, 'catalog', catalog)
+    cache = _seeded(monkeypatch, {1: [9, 5, 3]})
+    cache.load(1)
+
+    assert cache.boost(1, 'Cardio') == {'Bike': 3.0, 'Run': 1.0}
+    assert cache.boost(1) == {'Cardio': 3.0, 'Strength': 2.0}
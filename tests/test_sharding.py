@@ -0,0 +1,103 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.database.db_manager import PoolConfig, application_name
+from src.models.recent_activities import RECORDS_CHANNEL, RecentActivities
+from src.utils.sharding import ShardPlan, parse_shard_ids, split_shards
+
+
+def test_parse_shard_ids_accepts_ranges_and_lists():
+    assert parse_shard_ids('0-3, 6,2') == (0, 1, 2, 3, 6)
+    assert parse_shard_ids('4') == (4,)
+
+
+def test_split_shards_into_contiguous_even_ranges():
+    assert split_shards(10, 3) == [(0, 1, 2, 3), (4, 5, 6), (7, 8, 9)]
+    assert split_shards(2, 2) == [(0,), (1,)]
+    with pytest.raises(ValueError):
+        split_shards(2, 3)
+
+
+def test_plan_from_env():
+    assert ShardPlan.from_env({}) == ShardPlan()
+
+    plan = ShardPlan.from_env({'BOT_WORKERS': '2', 'SHARD_COUNT': '4'})
+    assert [p.shard_ids for p in plan.worker_plans()] == [(0, 1), (2, 3)]
+    assert [p.owns_command_sync for p in plan.worker_plans()] == [True, False]
+    assert [p.runs_global_tasks for p in plan.worker_plans()] == [True, False]
+    assert ShardPlan().runs_global_tasks
+
+    # Without SHARD_COUNT each worker runs one shard
+    assert ShardPlan.from_env({'BOT_WORKERS': '3'}).shard_count == 3
+
+    with pytest.raises(ValueError):
+        ShardPlan.from_env({'SHARD_IDS': '0-1'})
+
+
+def test_pool_is_shared_out_between_workers():
+    config = PoolConfig(min_size=2, max_size=10, max_waiting=20)
+
+    assert config.for_workers(1) is config
+    share = config.for_workers(3)
+    assert (share.min_size, share.max_size, share.max_waiting) == (1, 4, 7)
+
+
+class _FakeListener:
+    def __init__(self):
+        self.handlers = {}
+
+    def subscribe(self, channel, handler):
+        self.handlers[channel] = handler
+
+
+def test_recent_activities_drop_members_notified_by_other_processes():
+    cache = RecentActivities()
+    listener = _FakeListener()
+    cache.attach(listener)  # type: ignore[arg-type]
+    with cache._lock:
+        cache._store(1, [10])
+        cache._store(2, [20])
+
+    listener.handlers[RECORDS_CHANNEL]('1')
+    assert 1 not in cache and 2 in cache
+
+    # A reconnect may have missed notifications
+    listener.handlers[RECORDS_CHANNEL](None)
+    assert len(cache) == 0
+
+
+def test_recent_activities_ignore_echoes_of_own_inserts():
+    cache = RecentActivities()
+    listener = _FakeListener()
+    cache.attach(listener)  # type: ignore[arg-type]
+    with cache._lock:
+        cache._store(1, [10])
+    cache.record(1, 20)
+
+    listener.handlers[RECORDS_CHANNEL](f'1 INSERT {application_name()}')
+    assert cache.get(1) == [20, 10]
+
+    # Another process's insert, or our own edit, still drops the member
+    listener.handlers[RECORDS_CHANNEL]('1 INSERT lifted-leaderboard-0')
+    assert 1 not in cache
+    with cache._lock:
+        cache._store(1, [10])
+    listener.handlers[RECORDS_CHANNEL](f'1 UPDATE {application_name()}')
+    assert 1 not in cache
+
+
+def test_quest_sweep_runs_only_where_global_tasks_do():
+    from src.cogs.quest_cog import QuestCog
+
+    async def sweeping(plan):
+        cog = QuestCog(SimpleNamespace(plan=plan))
+        await cog.cog_load()
+        running = cog.sweep_quests.is_running()
+        await cog.cog_unload()
+        return running
+
+    first, second = ShardPlan(shard_count=2, workers=2).worker_plans()
+    assert asyncio.run(sweeping(first)) is True
+    assert asyncio.run(sweeping(second)) is False
@@ -0,0 +1,94 @@
+import pytest
+
+from src.database import start_db
+
+
+@pytest.fixture
+def migrations_dir(tmp_path):
+    (tmp_path / '20260101_000000_first.py').write_text(
+        'def up(db):\n    db.execute("CREATE TABLE first (id INT)")\n'
+    )
+    (tmp_path / '__init__.py').write_text('')
+    return str(tmp_path)
+
+
+@pytest.fixture
+def schema_calls(monkeypatch):
+    calls: list[object] = []
+    monkeypatch.setattr(start_db, 'init_schema_pg', calls.append)
+    return calls
+
+
+def test_fingerprint_changes_with_migrations(migrations_dir, tmp_path):
+    before = start_db.schema_fingerprint(migrations_dir)
+    assert before == start_db.schema_fingerprint(migrations_dir)
+
+    (tmp_path / '20260102_000000_second.py').write_text('def up(db):\n    pass\n')
+    assert start_db.schema_fingerprint(migrations_dir) != before
+
+
+def _stored(fingerprint, applied=('20260101_000000_first.py',)):
+    '''fetchone results for one stored_fingerprint call.'''
+    return [{'ready': True}, {'fingerprint': fingerprint, 'applied': list(applied)}]
+
+
+def test_matching_fingerprint_skips_setup(fake_db, migrations_dir, schema_calls):
+    fake_db.fetchone_results = _stored(start_db.schema_fingerprint(migrations_dir))
+
+    start_db.run(fake_db, migrations_dir)
+
+    assert schema_calls == []
+    assert fake_db.executed == []
+    assert 'FROM bot_state' in (fake_db.last_query or '')
+    assert fake_db.last_params == (start_db.FINGERPRINT_KEY,)
+
+
+def test_rolled_back_migration_invalidates_fingerprint(
+    fake_db, migrations_dir, schema_calls
+):
+    fingerprint = start_db.schema_fingerprint(migrations_dir)
+    # down() deleted the migration's row but left the stored fingerprint
+    fake_db.fetchone_results = [*_stored(fingerprint, ()), *_stored(fingerprint, ())]
+    fake_db.fetchall_results = [[], []]
+
+    start_db.run(fake_db, migrations_dir)
+
+    statements = [q for q, _ in fake_db.executed]
+    assert schema_calls == [fake_db]
+    assert 'CREATE TABLE first (id INT)' in statements
+
+
+def test_fresh_database_has_no_fingerprint(fake_db):
+    fake_db.fetchone_results = [{'ready': False}]
+
+    assert start_db.stored_fingerprint(fake_db, []) is None
+    assert 'to_regclass' in (fake_db.last_query or '')
+
+
+def test_stale_fingerprint_locks_migrates_and_records(
+    fake_db, migrations_dir, schema_calls
+):
+    fingerprint = start_db.schema_fingerprint(migrations_dir)
+    fake_db.fetchone_results = [*_stored('schema:old'), {'ready': False}]
+    # Tables listing, then applied migrations
+    fake_db.fetchall_results = [[], []]
+
+    start_db.run(fake_db, migrations_dir)
+
+    statements = [q for q, _ in fake_db.executed]
+    assert statements[0] == 'SELECT pg_advisory_xact_lock(%s)'
+    assert schema_calls == [fake_db]
+    assert 'CREATE TABLE first (id INT)' in statements
+    assert 'INSERT INTO migrations (filename) VALUES (%s)' in statements
+    assert statements[-1].startswith('INSERT INTO bot_state (key, value)')
+    assert fake_db.executed[-1][1] == (start_db.FINGERPRINT_KEY, fingerprint)
+
+
+def test_concurrent_boot_skips_after_lock(fake_db, migrations_dir, schema_calls):
+    fingerprint = start_db.schema_fingerprint(migrations_dir)
+    fake_db.fetchone_results = [{'ready': False}, *_stored(fingerprint)]
+
+    start_db.run(fake_db, migrations_dir)
+
+    assert [q for q, _ in fake_db.executed] == ['SELECT pg_advisory_xact_lock(%s)']
+    assert schema_calls == []
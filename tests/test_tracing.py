@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from src.utils import tracing
+from src.utils.trace_exporters import (
+    LatencyAggregator,
+    LatencyHistogram,
+    OtlpJsonFileExporter,
+    RingBufferExporter,
+    configure_tracing,
+    span_stats,
+)
+from src.utils.tracing import add_span_metadata, trace_span
+
+
+@pytest.fixture(autouse=True)
+def restore_tracing():
+    exporters = tracing.get_exporters()
+    yield
+    tracing.set_sample_rate(1.0)
+    tracing.set_exporters(exporters)
+
+
+def test_ring_buffer_records_span_tree():
+    ring = RingBufferExporter(size=2)
+    tracing.set_exporters([ring])
+
+    with trace_span('root'):
+        with trace_span('child', {'table': 'users'}):
+            add_span_metadata('rows', 3)
+        with trace_span('child2'):
+            pass
+
+    spans = ring.snapshot()
+    assert [s['name'] for s in spans] == ['child2', 'root']
+    assert spans[0]['parent'] == 'root'
+    assert spans[0]['trace_id'] == spans[1]['trace_id']
+
+
+def test_head_sampling_drops_whole_trace():
+    ring = RingBufferExporter()
+    tracing.set_exporters([ring])
+    tracing.set_sample_rate(0.0)
+
+    with trace_span('root') as root:
+        with trace_span('child') as child:
+            add_span_metadata('ignored', True)
+
+    assert ring.snapshot() == []
+    assert not root.sampled and child is root
+    assert root.metadata == {}
+
+
+def test_aggregator_percentiles_and_prometheus():
+    aggregator = LatencyAggregator()
+    tracing.set_exporters([aggregator])
+
+    for _ in range(3):
+        with trace_span('db.query'):
+            pass
+
+    summary = aggregator.summary()
+    assert summary['db.query']['count'] == 3
+    assert set(summary['db.query']) >= {'p50', 'p95', 'p99'}
+
+    text = aggregator.prometheus()
+    assert '# TYPE trace_span_duration_seconds summary' in text
+    assert 'trace_span_duration_seconds{span="db.query",quantile="0.99"}' in text
+    assert 'trace_span_duration_seconds_count{span="db.query"} 3' in text
+
+
+def test_histogram_percentile_within_bucket_error():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+
+    assert histogram.percentile(0.5) == pytest.approx(0.050, rel=0.1)
+    assert histogram.percentile(0.99) == pytest.approx(0.099, rel=0.1)
+    assert histogram.percentile(1.0) == pytest.approx(0.100)
+
+
+def test_otlp_exporter_writes_one_line_per_trace(tmp_path):
+    path = tmp_path / 'traces.jsonl'
+    exporter = OtlpJsonFileExporter(str(path))
+    tracing.set_exporters([exporter])
+
+    with trace_span('root', {'user_id': 7}):
+        with trace_span('child'):
+            pass
+    tracing.set_exporters([])
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 1
+    spans = json.loads(lines[0])['resourceSpans'][0]['scopeSpans'][0]['spans']
+    by_name = {s['name']: s for s in spans}
+    assert by_name['child']['parentSpanId'] == by_name['root']['spanId']
+    assert by_name['root']['attributes'] == [
+        {'key': 'user_id', 'value': {'intValue': '7'}}
+    ]
+
+
+def test_configure_tracing_from_env():
+    exporters = configure_tracing(
+        {'TRACE_EXPORTERS': 'stats, ring', 'TRACE_SAMPLE_RATE': '0.25'}
+    )
+
+    assert exporters[0] is span_stats
+    assert isinstance(exporters[1], RingBufferExporter)
+    assert tracing.get_exporters() == tuple(exporters)
+    assert tracing._sample_rate == 0.25
+
+
+def test_span_exporter_requires_export():
+    class Incomplete(tracing.SpanExporter):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()  # type: ignore[abstract]
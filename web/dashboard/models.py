@@ -82,6 +82,8 @@ class User(AbstractBaseUser):
 
 
 class Activity(models.Model):
+    # Edits here bypass the bot's activity catalog; it picks them up from the
+    # activities_changed NOTIFY sent by trg_notify_activities_changed
     name = models.TextField(unique=True)
     category = models.TextField()
     xp_value = models.IntegerField(default=0)